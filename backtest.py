@@ -0,0 +1,248 @@
+# backtest.py — přehrání historických MatchFacts + výsledků přes Flamengo strategii
+# Hit rate, ROI a kalibrace po trzích a pásmech důvěry; grid prahů přes process pool.
+#
+# Vstup (JSON list), jeden řádek = jeden odehraný zápas:
+#   {"league":"LaLiga","home":"Sevilla","away":"Getafe","ts_utc":1730186400,
+#    "seen_ts":1730172000,                      # kdy by bot zápas viděl (volitelné)
+#    "home_form10":6.5,"away_form10":4.0,"xg_sum":2.45,
+#    "pace_hint":1.06,"cards_avg":5.1,"corners_avg":9.1,"injuries_abs":1,
+#    "result":{"ht":[1,0],"ft":[2,1],"corners":11,"cards":4},
+#    "odds":{"FT_OU_2_5":1.85}}                 # skutečné kurzy (volitelné, jinak est_odds)
+#
+# Použití:
+#   python backtest.py history.json                 → report s aktuálními prahy
+#   python backtest.py history.json --grid          → sweep DEFAULT_GRID přes všechna jádra
+
+from __future__ import annotations
+import gc, itertools, json, multiprocessing as mp, os, sys, time
+from dataclasses import dataclass, asdict, astuple, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import tip_engine
+from flamengo_strategy import MatchFacts, TipCandidate, StrategyParams, propose_football_tips
+from settle import CONF_BUCKETS, Result, result_from_json, settle_market   # sdílené s ledger.py
+
+# ------- Parametry -------
+
+@dataclass(frozen=True)
+class EngineParams:
+    """Prahy z tip_engine + prahy strategie v jednom (= jeden bod gridu)."""
+    min_conf: int = tip_engine.MIN_CONF_PRIMARY
+    min_odds: float = tip_engine.MIN_ODDS
+    max_odds: float = tip_engine.MAX_ODDS
+    max_allow: float = tip_engine.MAX_ALLOW
+    window_h: int = tip_engine.KICKOFF_WINDOW_H
+    strategy: StrategyParams = StrategyParams()
+
+# Výchozí sweep (≈ 2 000 kombinací)
+DEFAULT_GRID: Dict[str, Sequence] = {
+    "min_conf": (20, 60, 70, 80, 85, 90),
+    "min_odds": (1.2, 1.3, 1.4),
+    "max_odds": (2.2, 2.9),
+    "window_h": (3, 8, 24),
+    "ht_goal_xg": (1.9, 2.1, 2.3),
+    "over25_xg": (1.7, 1.9, 2.1),
+    "btts_xg": (2.0, 2.2),
+}
+
+@dataclass
+class HistoryRow:
+    facts: MatchFacts
+    result: Result
+    seen_ts: Optional[int] = None
+    odds: Optional[Dict[str, float]] = None
+
+# =============== NAČTENÍ ===============
+def _row(r: dict) -> HistoryRow:
+    res = r.get("result") or {}
+    facts = MatchFacts(
+        sport="football",
+        league=r.get("league", ""), home=r["home"], away=r["away"],
+        ts_utc=int(r["ts_utc"]),
+        home_form10=r.get("home_form10"), away_form10=r.get("away_form10"),
+        xg_per90_sum=r.get("xg_sum"), pace_hint=r.get("pace_hint"),
+        cards_avg=r.get("cards_avg"), corners_avg=r.get("corners_avg"),
+        injuries_abs=r.get("injuries_abs"), notes="history",
+    )
+    return HistoryRow(
+        facts=facts,
+        result=result_from_json(res),
+        seen_ts=r.get("seen_ts"),
+        odds=r.get("odds"),
+    )
+
+def load_history(path: str) -> List[HistoryRow]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [_row(r) for r in json.load(f) if r.get("result")]
+
+# =============== REPLAY ===============
+def _in_window(row: HistoryRow, window_h: int) -> bool:
+    # bez seen_ts neumíme říct, kdy by bot zápas viděl → okno neřešíme
+    if row.seen_ts is None:
+        return True
+    return row.seen_ts <= row.facts.ts_utc <= row.seen_ts + window_h * 3600
+
+Proposals = List[Tuple[HistoryRow, List[TipCandidate]]]
+
+def propose_all(rows: Iterable[HistoryRow], strategy: StrategyParams) -> Proposals:
+    """Návrhy strategie pro celou historii – závisí jen na StrategyParams, lze sdílet."""
+    return [(row, propose_football_tips(row.facts, strategy)) for row in rows]
+
+def replay(rows: Iterable[HistoryRow], p: EngineParams,
+           proposals: Optional[Proposals] = None) -> List[Tuple[HistoryRow, TipCandidate]]:
+    """Stejné filtry jako tip_engine._pick_candidates (bez ověření na Tipsportu)."""
+    if proposals is None:
+        proposals = propose_all(rows, p.strategy)
+    out: List[Tuple[HistoryRow, TipCandidate]] = []
+    for row, tips in proposals:
+        if not _in_window(row, p.window_h):
+            continue
+        for t in tips:
+            if t.confidence < p.min_conf:
+                continue
+            if not tip_engine._odds_pass(t.est_odds, p.min_odds, p.max_odds, p.max_allow):
+                continue
+            out.append((row, t))
+    return out
+
+def _bucket(conf: int) -> str:
+    for lo, hi in zip(CONF_BUCKETS, CONF_BUCKETS[1:]):
+        if lo <= conf < hi:
+            return f"{lo}–{hi - 1}"
+    return "?"
+
+def _acc() -> dict:
+    return {"n": 0, "hits": 0, "staked": 0.0, "returned": 0.0, "conf_sum": 0.0, "brier": 0.0}
+
+def _add(a: dict, conf: int, won: bool, odds: Optional[float]):
+    a["n"] += 1
+    a["hits"] += int(won)
+    a["conf_sum"] += conf
+    a["brier"] += (conf / 100.0 - float(won)) ** 2
+    if odds:
+        a["staked"] += 1.0
+        a["returned"] += odds if won else 0.0
+
+def _finish(a: dict) -> dict:
+    n = a["n"]
+    return {
+        "n": n,
+        "hit_rate": round(a["hits"] / n, 4) if n else None,
+        "roi": round((a["returned"] - a["staked"]) / a["staked"], 4) if a["staked"] else None,
+        "avg_conf": round(a["conf_sum"] / n / 100.0, 4) if n else None,   # kalibrace: vs. hit_rate
+        "brier": round(a["brier"] / n, 4) if n else None,
+    }
+
+def evaluate(rows: Iterable[HistoryRow], p: EngineParams = EngineParams(),
+             proposals: Optional[Proposals] = None) -> dict:
+    """Report: celkem, po trzích a po pásmech důvěry."""
+    total = _acc()
+    by_market: Dict[str, dict] = {}
+    by_bucket: Dict[str, dict] = {}
+    for row, t in replay(rows, p, proposals):
+        won = settle_market(t.market_code, row.result)
+        if won is None:
+            continue
+        odds = (row.odds or {}).get(t.market_code) or t.est_odds
+        _add(total, t.confidence, won, odds)
+        _add(by_market.setdefault(t.market_code, _acc()), t.confidence, won, odds)
+        _add(by_bucket.setdefault(_bucket(t.confidence), _acc()), t.confidence, won, odds)
+    return {
+        "total": _finish(total),
+        "by_market": {k: _finish(v) for k, v in sorted(by_market.items())},
+        "by_conf": {k: _finish(v) for k, v in sorted(by_bucket.items())},
+    }
+
+# =============== GRID SWEEP ===============
+_ENGINE_FIELDS = {"min_conf", "min_odds", "max_odds", "max_allow", "window_h"}
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[EngineParams]:
+    """Kartézský součin; klíče mimo EngineParams jdou do StrategyParams."""
+    keys = list(grid)
+    out: List[EngineParams] = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        eng = {k: v for k, v in zip(keys, values) if k in _ENGINE_FIELDS}
+        strat = {k: v for k, v in zip(keys, values) if k not in _ENGINE_FIELDS}
+        out.append(EngineParams(**eng, strategy=replace(StrategyParams(), **strat)))
+    return out
+
+# Historie pro workery: nastaví se PŘED vytvořením poolu. Při "fork" ji workery zdědí
+# (copy-on-write, žádné pickle/kopie na worker); při "spawn" si ji každý načte z cesty.
+_ROWS: List[HistoryRow] = []
+
+def _init_worker(path: Optional[str]):
+    global _ROWS
+    if not _ROWS and path:
+        _ROWS = load_history(path)
+
+def _eval_chunk(params: List[EngineParams]) -> List[Tuple[dict, dict]]:
+    # chunk má většinou jednu sadu StrategyParams → strategie běží jednou, filtry N×
+    cache: Dict[StrategyParams, Proposals] = {}
+    out: List[Tuple[dict, dict]] = []
+    for p in params:
+        if p.strategy not in cache:
+            cache[p.strategy] = propose_all(_ROWS, p.strategy)
+        out.append((asdict(p), evaluate(_ROWS, p, cache[p.strategy])["total"]))
+    return out
+
+def sweep(rows: List[HistoryRow], grid: Dict[str, Sequence] = DEFAULT_GRID,
+          workers: Optional[int] = None, path: Optional[str] = None) -> List[Tuple[dict, dict]]:
+    """
+    Projde grid přes process pool. Vrací [(parametry, souhrn)] seřazené podle ROI ↓.
+    path = zdroj historie pro platformy bez fork (Windows/macOS spawn).
+    """
+    global _ROWS
+    combos = sorted(expand_grid(grid), key=lambda p: astuple(p.strategy))
+    workers = workers or os.cpu_count() or 1
+    _ROWS = rows
+
+    methods = mp.get_all_start_methods()
+    if "fork" in methods:
+        ctx = mp.get_context("fork")
+        init_path = None
+        gc.freeze()   # ať GC po forku nešahá na sdílené objekty (méně COW kopií)
+    else:
+        if not path:
+            raise ValueError("Bez fork je potřeba předat path k historii.")
+        ctx = mp.get_context("spawn")
+        init_path = path
+
+    # větší chunky = méně IPC; výsledky jsou malé dicty
+    size = max(1, len(combos) // (workers * 8))
+    chunks = [combos[i:i + size] for i in range(0, len(combos), size)]
+    results: List[Tuple[dict, dict]] = []
+    try:
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(init_path,)) as pool:
+            for part in pool.imap_unordered(_eval_chunk, chunks):
+                results.extend(part)
+    finally:
+        if init_path is None:
+            gc.unfreeze()
+
+    results.sort(key=lambda pr: (pr[1]["roi"] if pr[1]["roi"] is not None else -9e9,
+                                 pr[1]["n"]), reverse=True)
+    return results
+
+# =============== CLI ===============
+def main(argv: List[str]) -> int:
+    if not argv:
+        print("usage: python backtest.py history.json [--grid] [--top N]")
+        return 2
+    path = argv[0]
+    rows = load_history(path)
+    top = int(argv[argv.index("--top") + 1]) if "--top" in argv else 10
+
+    if "--grid" not in argv:
+        print(json.dumps(evaluate(rows), ensure_ascii=False, indent=2))
+        return 0
+
+    t0 = time.perf_counter()
+    res = sweep(rows, path=path)
+    dt = time.perf_counter() - t0
+    print(f"{len(res)} kombinací × {len(rows)} zápasů za {dt:.1f} s")
+    for params, summary in res[:top]:
+        print(json.dumps({"params": params, "total": summary}, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,174 @@
+# breaker.py — circuit breaker pro každý zdroj (host): podíl chyb + latence → zavřít / otevřít / zkusit
+# Blokovaný nebo spadlý zdroj jinak při každém skenu spálí celý timeout i retry s backoffem.
+# fetch.get_text se před požadavkem zeptá allow(); otevřený breaker odmítne hned (None bez sítě).
+# Po COOLDOWN projde jediný zkušební požadavek (half-open): úspěch breaker zavře, chyba ho otevře
+# znovu s dvojnásobným cooldownem (max COOLDOWN_MAX). Pomalá odpověď (> SLOW_S) se počítá jako chyba.
+#
+#   BREAKER_WINDOW=20  BREAKER_MIN_CALLS=5  BREAKER_FAIL_RATE=0.5  BREAKER_SLOW_S=8
+#   BREAKER_COOLDOWN_S=60  BREAKER_COOLDOWN_MAX_S=600
+#
+#   python breaker.py     – simulace: spadlý host, cooldown, zotavení
+
+from __future__ import annotations
+import os, threading, time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+FAIL_RATE = float(os.getenv("BREAKER_FAIL_RATE", "0.5"))
+SLOW_S = float(os.getenv("BREAKER_SLOW_S", "8"))
+COOLDOWN_S = float(os.getenv("BREAKER_COOLDOWN_S", "60"))
+COOLDOWN_MAX_S = float(os.getenv("BREAKER_COOLDOWN_MAX_S", "600"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+_STATE_NO = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+@dataclass
+class Breaker:
+    name: str
+    calls: Deque[Tuple[bool, float]] = field(default_factory=lambda: deque(maxlen=WINDOW))
+    state: str = CLOSED
+    open_until: float = 0.0                     # time.monotonic()
+    cooldown: float = COOLDOWN_S
+    probing: float = 0.0                        # start zkušebního požadavku (0 = žádný)
+    rejected: int = 0
+    opened: int = 0
+    last_error: str = ""
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def allow(self) -> bool:
+        """Smí požadavek ven? V half-open jen jeden zkušební najednou."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == OPEN and now >= self.open_until:
+                self.state = HALF_OPEN
+                self.probing = 0.0
+            # zkouška, která se nikdy nezapsala (uťal ji rozpočet), po 2×SLOW_S propadne
+            if self.state == HALF_OPEN and (not self.probing or now - self.probing > 2 * SLOW_S):
+                self.probing = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool, latency: float, error: str = ""):
+        ok = ok and latency <= SLOW_S
+        with self._lock:
+            self.calls.append((ok, latency))
+            if not ok:
+                self.last_error = error or (f"pomalé {latency:.1f} s" if latency > SLOW_S else "chyba")
+            if self.state == HALF_OPEN:
+                self.probing = 0.0
+                if ok:
+                    self.state, self.cooldown = CLOSED, COOLDOWN_S
+                    self.calls.clear()
+                else:
+                    self._open(min(self.cooldown * 2, COOLDOWN_MAX_S))
+            elif self.state == CLOSED and len(self.calls) >= MIN_CALLS and self.failure_rate() >= FAIL_RATE:
+                self._open(self.cooldown)
+
+    def _open(self, cooldown: float):
+        self.state, self.cooldown = OPEN, cooldown
+        self.open_until = time.monotonic() + cooldown
+        self.opened += 1
+
+    def failure_rate(self) -> float:
+        return sum(1 for ok, _ in self.calls if not ok) / len(self.calls) if self.calls else 0.0
+
+    def latency(self) -> float:
+        """Medián latence z okna (s)."""
+        lat = sorted(l for _, l in self.calls)
+        return lat[len(lat) // 2] if lat else 0.0
+
+    def health(self) -> int:
+        """0–100: úspěšnost snížená latencí; otevřený breaker = 0."""
+        if self.state == OPEN:
+            return 0
+        return round(100 * (1 - self.failure_rate()) * max(0.0, 1 - self.latency() / (2 * SLOW_S)))
+
+_lock = threading.Lock()
+_BREAKERS: Dict[str, Breaker] = {}
+
+def get(name: str) -> Breaker:
+    b = _BREAKERS.get(name)
+    if b is None:
+        with _lock:
+            b = _BREAKERS.setdefault(name, Breaker(name))
+    return b
+
+def host(url: str) -> str:
+    h = urlsplit(url).hostname or url
+    return h[4:] if h.startswith("www.") else h
+
+def for_url(url: str) -> Breaker:
+    return get(host(url))
+
+def all_breakers() -> List[Breaker]:
+    return sorted(_BREAKERS.values(), key=lambda b: b.name)
+
+def reset():
+    with _lock:
+        _BREAKERS.clear()
+
+# =============== VÝSTUP ===============
+def format_states() -> str:
+    """Pro /debug: jeden řádek na zdroj."""
+    if not _BREAKERS:
+        return "Breakery: zatím žádné požadavky"
+    lines = ["Breakery (zdroj: stav, chyby, latence, zdraví):"]
+    icon = {CLOSED: "🟢", HALF_OPEN: "🟡", OPEN: "🔴"}
+    for b in all_breakers():
+        extra = ""
+        if b.state == OPEN:
+            extra = f", znovu za {max(0, b.open_until - time.monotonic()):.0f} s"
+        if b.state != CLOSED and b.last_error:
+            extra += f" ({b.last_error})"
+        lines.append(f"  {icon[b.state]} {b.name}: {b.state}, {b.failure_rate():.0%} z {len(b.calls)}, "
+                     f"{b.latency():.2f} s, {b.health()}/100, odmítnuto {b.rejected}{extra}")
+    return "\n".join(lines)
+
+def prometheus() -> str:
+    """Text exposition formát pro /metrics."""
+    out = [
+        "# TYPE flamengo_breaker_state gauge",
+        "# TYPE flamengo_breaker_failure_rate gauge",
+        "# TYPE flamengo_breaker_latency_seconds gauge",
+        "# TYPE flamengo_breaker_health gauge",
+        "# TYPE flamengo_breaker_rejected_total counter",
+        "# TYPE flamengo_breaker_opened_total counter",
+    ]
+    for b in all_breakers():
+        lbl = f'{{source="{b.name}"}}'
+        out += [f"flamengo_breaker_state{lbl} {_STATE_NO[b.state]}",
+                f"flamengo_breaker_failure_rate{lbl} {b.failure_rate():.3f}",
+                f"flamengo_breaker_latency_seconds{lbl} {b.latency():.3f}",
+                f"flamengo_breaker_health{lbl} {b.health()}",
+                f"flamengo_breaker_rejected_total{lbl} {b.rejected}",
+                f"flamengo_breaker_opened_total{lbl} {b.opened}"]
+    return "\n".join(out) + "\n"
+
+# =============== SIMULACE ===============
+def _bench(scans: int = 30) -> None:
+    """Host padá na 1,5 s timeoutu; porovnání času skenů s breakerem a bez něj."""
+    reset()
+    get("example.org").cooldown = 0.05
+    down = set(range(5, 20))                    # skeny, kdy je host dole
+    cost = {"bez": 0.0, "s": 0.0}
+    for i in range(scans):
+        fail = i in down
+        cost["bez"] += 1.5 * 4 if fail else 0.2     # timeout × (1 + 3 retry)
+        b = get("example.org")
+        if b.allow():
+            cost["s"] += 1.5 * 4 if fail else 0.2
+            b.record(not fail, 1.5 if fail else 0.2, "timeout" if fail else "")
+        time.sleep(0.02)
+    print(f"{scans} skenů, host dole v {len(down)}: bez breakeru {cost['bez']:.0f} s sítě, "
+          f"s breakerem {cost['s']:.0f} s")
+    print(format_states())
+
+if __name__ == "__main__":
+    _bench()
@@ -0,0 +1,130 @@
+# cassette.py — HTTP record/replay na úrovni transportu (requests adapter)
+# Record:  každá odpověď (URL, status, hlavičky, tělo, doba) → gzip JSON-lines kazeta.
+# Replay:  odpovědi se servírují z kazety bez sítě, s reálnou / pevnou / nulovou latencí.
+#
+# Zapíná se přes prostředí, platí pro všechny scrapery (jdou přes fetch.session()):
+#   HTTP_MODE=record|replay   HTTP_CASSETTE=cesta.jsonl.gz
+#   HTTP_REPLAY_LATENCY=0 | real | <sekundy>     (default 0)
+
+from __future__ import annotations
+import base64, gzip, json, os, threading, time
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+MODE = os.getenv("HTTP_MODE", "").strip().lower()              # "", "record", "replay"
+CASSETTE = os.getenv("HTTP_CASSETTE", "http_cassette.jsonl.gz")
+REPLAY_LATENCY = os.getenv("HTTP_REPLAY_LATENCY", "0").strip().lower()
+
+Key = Tuple[str, str]   # (metoda, URL)
+
+def _entry(resp: requests.Response, elapsed: float) -> dict:
+    return {
+        "method": resp.request.method,
+        "url": resp.request.url,
+        "status": resp.status_code,
+        "headers": dict(resp.headers),
+        "body": base64.b64encode(resp.content).decode("ascii"),
+        "elapsed": round(elapsed, 4),
+    }
+
+def load(path: str) -> Dict[Key, List[dict]]:
+    """Kazeta → {(metoda, URL): [záznamy v pořadí nahrání]}."""
+    out: Dict[Key, List[dict]] = {}
+    if not os.path.exists(path):
+        return out
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                e = json.loads(line)
+                out.setdefault((e["method"], e["url"]), []).append(e)
+    return out
+
+class RecordingAdapter(HTTPAdapter):
+    """Běžný HTTPAdapter (pool, retry), který navíc každou odpověď připíše do kazety."""
+
+    def __init__(self, path: str = CASSETTE, **kw):
+        super().__init__(**kw)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, request, **kw):
+        t0 = time.perf_counter()
+        resp = super().send(request, **kw)
+        # čte resp.content → tělo zůstává dostupné volajícímu; doba včetně stažení těla
+        entry = _entry(resp, time.perf_counter() - t0)
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            # append = nový gzip člen; gzip.open čte zřetězené členy jako jeden proud
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+        return resp
+
+class ReplayAdapter(BaseAdapter):
+    """Odpovědi jen z kazety. Opakovaný dotaz na stejnou URL jde záznamy popořadě, pak drží poslední."""
+
+    def __init__(self, path: str = CASSETTE, latency: str = REPLAY_LATENCY):
+        super().__init__()
+        self.entries = load(path)
+        self.latency = latency
+        self._pos: Dict[Key, int] = {}
+        self._lock = threading.Lock()
+
+    def _delay(self, e: dict) -> float:
+        if self.latency in ("", "0", "none"):
+            return 0.0
+        if self.latency == "real":
+            return float(e.get("elapsed") or 0.0)
+        try:
+            return float(self.latency)
+        except ValueError:
+            return 0.0
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = (request.method, request.url)
+        with self._lock:
+            arr = self.entries.get(key)
+            if not arr:
+                raise requests.ConnectionError(f"replay: {request.method} {request.url} není v kazetě",
+                                               request=request)
+            i = self._pos.get(key, 0)
+            self._pos[key] = min(i + 1, len(arr) - 1)
+            e = arr[i]
+
+        delay = self._delay(e)
+        if delay:
+            time.sleep(delay)
+
+        resp = requests.Response()
+        resp.status_code = int(e["status"])
+        resp.headers = CaseInsensitiveDict(e.get("headers") or {})
+        # tělo je v kazetě už dekomprimované → hlavičky o kompresi by requests zmátly
+        resp.headers.pop("Content-Encoding", None)
+        resp._content = base64.b64decode(e.get("body") or "")
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "REPLAY"
+        resp.elapsed = timedelta(seconds=delay)
+        return resp
+
+    def close(self):
+        pass
+
+def install(session: requests.Session, adapter_kw: Optional[dict] = None,
+            mode: Optional[str] = None, path: Optional[str] = None) -> requests.Session:
+    """Podle HTTP_MODE namountuje record/replay adapter na session (jinak ji nechá být)."""
+    mode = MODE if mode is None else mode
+    path = path or CASSETTE
+    if mode == "record":
+        for prefix in ("https://", "http://"):
+            session.mount(prefix, RecordingAdapter(path, **(adapter_kw or {})))
+    elif mode == "replay":
+        adapter = ReplayAdapter(path)
+        for prefix in ("https://", "http://"):
+            session.mount(prefix, adapter)
+    return session
@@ -0,0 +1,203 @@
+# combo.py — skládání AKO tiketů (2–6 nohou) branch-and-bound prohledáváním
+# Cíl: max. společná pravděpodobnost ("prob") nebo očekávaná hodnota ("ev") při celkovém
+# kurzu v pásmu [min_odds, max_odds]; dvě nohy ze stejného zápasu se nekombinují
+# (jsou korelované a sázkovka je stejně nepřijme). Vše v logaritmech → součty místo součinů.
+#
+# Ořezávání (nohy seřazené tak, aby nejlepší doplnění byl prefix zbytku):
+#   • prob: cena nohy c = −log p ≥ 0, zisk kurzu g = log kurz > 0. Chybějící kurz R stojí
+#     aspoň R · min(c/g) přes zbytek, chybějící počet nohou aspoň součet nejlevnějších.
+#   • ev:   e = log(p·kurz); horní mez = aktuální + nejlepší přípustný počet dalších e.
+#   • kurz: nad max_odds se nedá vrátit, pod min_odds se nedostane ani s nejvyššími kurzy → řez.
+#
+# Benchmark proti hrubé síle:  python combo.py [počet_nohou] [max_nohou]
+
+from __future__ import annotations
+import heapq, math, sys, time
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from flamengo_strategy import MatchFacts, TipCandidate
+from staking import model_probs
+from team_registry import key_id
+
+# ------- Parametry -------
+MIN_LEGS = 2
+MAX_LEGS = 6
+MIN_ODDS = 3.0
+MAX_ODDS = 15.0
+TOP_K = 5
+TIME_BUDGET_S = 1.0
+_CHECK_EVERY = 1024          # jak často hlídat časový rozpočet (uzly)
+
+@dataclass(frozen=True)
+class Leg:
+    match_id: int
+    p: float
+    odds: float
+    label: str = ""
+    ref: object = field(default=None, compare=False, repr=False)
+
+@dataclass
+class Ticket:
+    legs: List[Leg]
+    prob: float
+    odds: float
+
+    @property
+    def ev(self) -> float:
+        return self.prob * self.odds
+
+@dataclass
+class SearchResult:
+    tickets: List[Ticket]
+    nodes: int
+    complete: bool             # False = vypršel časový rozpočet (výsledek je nejlepší nalezený)
+    elapsed: float
+
+def legs_from_candidates(pairs: Sequence[Tuple[MatchFacts, TipCandidate]]) -> List[Leg]:
+    """(zápas, tip) z tip_engine → nohy; p z modelu (staking.model_probs), bez kurzu se vynechá."""
+    probs = model_probs(pairs)
+    ids: dict = {}
+    out: List[Leg] = []
+    for (m, t), p in zip(pairs, probs):
+        if not t.est_odds or t.est_odds <= 1.0 or not 0.0 < p < 1.0:
+            continue
+        mid = ids.setdefault((key_id(m.home), key_id(m.away), int(m.ts_utc)), len(ids))
+        out.append(Leg(mid, float(p), float(t.est_odds), f"{m.home} – {m.away}: {t.selection}", t))
+    return out
+
+def _ticket(legs: Sequence[Leg]) -> Ticket:
+    return Ticket(list(legs), math.prod(l.p for l in legs), math.prod(l.odds for l in legs))
+
+def build_tickets(legs: Sequence[Leg], objective: str = "prob", min_legs: int = MIN_LEGS,
+                  max_legs: int = MAX_LEGS, min_odds: float = MIN_ODDS, max_odds: float = MAX_ODDS,
+                  top_k: int = TOP_K, time_budget: float = TIME_BUDGET_S) -> SearchResult:
+    """Top-k tiketů podle objective ("prob" | "ev"), nejlepší první."""
+    if objective not in ("prob", "ev"):
+        raise ValueError(f"objective: {objective}")
+    t_start = time.perf_counter()
+    deadline = t_start + time_budget
+
+    lp = np.log([l.p for l in legs])
+    lo = np.log([l.odds for l in legs])
+    val = lp if objective == "prob" else lp + lo
+    order = np.argsort(-val, kind="stable")            # nejlepší noha první
+    legs = [legs[i] for i in order]
+    lp, lo, val = lp[order], lo[order], val[order]
+    n = len(legs)
+
+    # prefixové součty a suffixová maxima/minima pro meze
+    vsum = np.concatenate([[0.0], np.cumsum(val)])
+    lo_max = np.append(np.maximum.accumulate(lo[::-1])[::-1], -np.inf)
+    ratio = np.divide(-lp, lo, out=np.full(n, np.inf), where=lo > 0)
+    ratio_min = np.append(np.minimum.accumulate(ratio[::-1])[::-1], np.inf)
+    n_pos = int((val > 0).sum())                        # ev: kladné nohy jsou prefix
+    L_min, L_max = math.log(min_odds), math.log(max_odds)
+
+    heap: List[Tuple[float, int, Tuple[int, ...]]] = []    # (skóre, pořadí, indexy) – min-heap
+    seq = 0
+    nodes = 0
+    complete = True
+    chosen: List[int] = []
+    used = set()
+
+    def bound(i: int, cur: float, cur_lo: float, depth: int) -> float:
+        need = max(0, min_legs - depth)
+        slots = max_legs - depth
+        if need > n - i:
+            return -math.inf
+        if cur_lo + slots * lo_max[i] < L_min:
+            return -math.inf
+        if objective == "prob":
+            cost_odds = max(0.0, L_min - cur_lo) * ratio_min[i]
+            cost_legs = -(vsum[i + need] - vsum[i])
+            return cur - max(cost_odds, cost_legs)
+        j = min(max(need, n_pos - i), slots, n - i)
+        return cur + (vsum[i + j] - vsum[i])
+
+    def dfs(i: int, cur: float, cur_lo: float):
+        nonlocal seq, nodes, complete
+        nodes += 1
+        if nodes % _CHECK_EVERY == 0 and time.perf_counter() > deadline:
+            complete = False
+        if not complete:
+            return
+        depth = len(chosen)
+        if depth >= min_legs and L_min <= cur_lo <= L_max:
+            item = (cur, seq, tuple(chosen))
+            seq += 1
+            if len(heap) < top_k:
+                heapq.heappush(heap, item)
+            elif cur > heap[0][0]:
+                heapq.heapreplace(heap, item)
+        if depth >= max_legs:
+            return
+        for k in range(i, n):
+            if len(heap) >= top_k and bound(k, cur, cur_lo, depth) <= heap[0][0]:
+                # nohy jsou seřazené → mez pro další k už je jen horší (prob i ev)
+                break
+            if legs[k].match_id in used or cur_lo + lo[k] > L_max:
+                continue
+            chosen.append(k)
+            used.add(legs[k].match_id)
+            dfs(k + 1, cur + val[k], cur_lo + lo[k])
+            used.discard(legs[k].match_id)
+            chosen.pop()
+            if not complete:
+                return
+
+    dfs(0, 0.0, 0.0)
+    best = sorted(heap, key=lambda x: (-x[0], x[1]))
+    return SearchResult([_ticket([legs[k] for k in idx]) for _, _, idx in best],
+                        nodes, complete, time.perf_counter() - t_start)
+
+def brute_force(legs: Sequence[Leg], objective: str = "prob", min_legs: int = MIN_LEGS,
+                max_legs: int = MAX_LEGS, min_odds: float = MIN_ODDS, max_odds: float = MAX_ODDS,
+                top_k: int = TOP_K) -> List[Ticket]:
+    """Referenční výčet všech kombinací (jen pro malé pooly / benchmark)."""
+    out = []
+    for r in range(min_legs, max_legs + 1):
+        for combo in combinations(legs, r):
+            if len({l.match_id for l in combo}) < r:
+                continue
+            t = _ticket(combo)
+            if min_odds <= t.odds <= max_odds:
+                out.append(t)
+    out.sort(key=lambda t: -(t.prob if objective == "prob" else t.ev))
+    return out[:top_k]
+
+def format_ticket(t: Ticket) -> str:
+    lines = [f"• {l.label} @ {l.odds:.2f} ({l.p * 100:.0f} %)" for l in t.legs]
+    return "\n".join(lines) + f"\n= kurz {t.odds:.2f}, šance {t.prob * 100:.1f} %, EV {t.ev:.2f}"
+
+# =============== BENCHMARK ===============
+def _random_legs(n: int, seed: int = 3) -> List[Leg]:
+    rng = np.random.default_rng(seed)
+    p = rng.uniform(0.45, 0.88, n)
+    odds = np.round(1.0 / p * rng.uniform(0.88, 1.08, n), 2)
+    mid = rng.integers(0, max(1, int(n * 0.6)), n)
+    return [Leg(int(m), float(a), float(b), f"#{i}") for i, (m, a, b) in enumerate(zip(mid, p, odds))]
+
+def _bench(n: int = 24, max_legs: int = 5) -> None:
+    legs = _random_legs(n)
+    for obj in ("prob", "ev"):
+        t0 = time.perf_counter()
+        ref = brute_force(legs, obj, max_legs=max_legs)
+        bf = time.perf_counter() - t0
+        res = build_tickets(legs, obj, max_legs=max_legs, time_budget=60)
+        key = (lambda t: t.prob) if obj == "prob" else (lambda t: t.ev)
+        same = all(abs(key(a) - key(b)) < 1e-12 for a, b in zip(ref, res.tickets)) and len(ref) == len(res.tickets)
+        print(f"{obj:4s} n={n} ≤{max_legs} nohou: hrubá síla {bf * 1000:8.1f} ms, "
+              f"B&B {res.elapsed * 1000:7.1f} ms ({res.nodes} uzlů), shoda top-{TOP_K}: {same}")
+    big = _random_legs(100, seed=9)
+    for obj in ("prob", "ev"):
+        res = build_tickets(big, obj, max_legs=6)
+        print(f"{obj:4s} n=100 ≤6 nohou: {res.elapsed * 1000:.1f} ms, {res.nodes} uzlů, "
+              f"úplné={res.complete}, nejlepší: kurz {res.tickets[0].odds:.2f} "
+              f"p={res.tickets[0].prob:.3f} EV={res.tickets[0].ev:.3f}" if res.tickets else "žádný tiket")
+
+if __name__ == "__main__":
+    _bench(*(int(a) for a in sys.argv[1:3]))
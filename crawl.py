@@ -0,0 +1,74 @@
+# crawl.py — procházení katalogu po stránkách (stránkování + podstránky lig)
+# Generátor vrací vždy jednu naparsovanou stránku; další se stáhne až když si o ni
+# konzument řekne → v paměti je jen aktuální stránka (+ množina navštívených URL).
+
+from __future__ import annotations
+import os, re
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse, urldefrag
+
+from bs4 import BeautifulSoup
+
+from fetch import get_text, TIMEOUT
+
+CRAWL_MODE = os.getenv("CRAWL_MODE", "0") == "1"           # 1 = plný katalog místo 1 stránky
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "60"))  # pojistka proti nekonečnému stránkování
+
+_RX_NEXT_TEXT = re.compile(r"^\s*(další|načíst další|zobrazit další|více|next|older|›|»|>)\s*$", re.I)
+_RX_PAGE = re.compile(r"[?&](page|p|strana|offset)=\d+", re.I)
+
+def _same_scope(url: str, scope: str) -> bool:
+    # po segmentech cesty: /kurzy/fotbal-16 nepustí /kurzy/fotbal-160
+    u, s = urlparse(url), urlparse(scope)
+    path, root = u.path.rstrip("/"), s.path.rstrip("/")
+    return u.netloc == s.netloc and (path == root or path.startswith(root + "/"))
+
+def follow_links(soup: BeautifulSoup, page_url: str, scope: str,
+                 subpages: bool = True) -> List[str]:
+    """
+    Odkazy k dalšímu procházení: rel=next, „Další/Načíst další“, ?page=N
+    a (subpages=True) podstránky pod cestou scope (např. /kurzy/fotbal-16/anglie-…).
+    """
+    out: List[str] = []
+    for a in soup.find_all("a", href=True):
+        href = urldefrag(urljoin(page_url, a["href"]))[0]
+        if not href.startswith("http") or not _same_scope(href, scope):
+            continue
+        rel = a.get("rel") or []
+        if "next" in rel or _RX_NEXT_TEXT.match(a.get_text(" ", strip=True) or "") or _RX_PAGE.search(href):
+            out.append(href)
+        elif subpages and urlparse(href).path.rstrip("/") != urlparse(scope).path.rstrip("/"):
+            # podstránka ligy – jen o úroveň níž, ať nelezeme do detailů zápasů
+            rest = urlparse(href).path[len(urlparse(scope).path.rstrip("/")):].strip("/")
+            if rest and "/" not in rest:
+                out.append(href)
+    return out
+
+def crawl_pages(start_urls: Iterable[str], scope: Optional[str] = None,
+                max_pages: int = CRAWL_MAX_PAGES, subpages: bool = True,
+                fetch=None) -> Iterator[Tuple[str, BeautifulSoup]]:
+    """
+    BFS přes katalog: (url, soup) jednu stránku po druhé. Odkazy na další stránky se
+    vytahují až po zpracování stránky konzumentem (po návratu z yield).
+    fetch(url) → html|None; default fetch.get_text (sdílený pool, cache, replay).
+    """
+    fetch = fetch or (lambda u: get_text(u, timeout=TIMEOUT))
+    queue = deque(start_urls)
+    seen = set(queue)
+    scope = scope or (queue[0] if queue else "")
+    pages = 0
+    while queue and pages < max_pages:
+        url = queue.popleft()
+        html = fetch(url)
+        pages += 1
+        if not html:
+            continue
+        soup = BeautifulSoup(html, "html.parser")
+        del html
+        yield url, soup
+        for link in follow_links(soup, url, scope, subpages):
+            if link not in seen:
+                seen.add(link)
+                queue.append(link)
+        soup.decompose()
@@ -0,0 +1,100 @@
+# deadline.py — časový rozpočet příkazu, který se propisuje až do jednotlivých HTTP požadavků
+# Handler otevře `with budget(3.0) as b:` a všechno pod ním (zdroje, fetch, retry, fallback)
+# vidí přes contextvar, kolik času zbývá. fetch.get_text podle toho zkrátí timeout a retry,
+# a když čas došel, požadavek vůbec nezačne. attempt() zabalí jeden zdroj: co se nestihlo,
+# skončí v b.skipped a handler odpoví tím, co už má.
+# Bez otevřeného rozpočtu se nic nemění (pozadí, CLI, benchmarky).
+#
+#   COMMAND_BUDGET_S=3
+
+from __future__ import annotations
+import contextvars, os, time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Tuple, TypeVar
+
+COMMAND_BUDGET_S = float(os.getenv("COMMAND_BUDGET_S", "3"))
+MIN_FETCH_S = 0.25              # pod tohle už požadavek nemá smysl začínat
+
+T = TypeVar("T")
+
+@dataclass
+class Budget:
+    until: float                                # time.monotonic()
+    skipped: List[str] = field(default_factory=list)
+    cut: int = 0                                # požadavky zkrácené / přeskočené kvůli času
+
+    def remaining(self) -> float:
+        return max(0.0, self.until - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() < MIN_FETCH_S
+
+    def skip(self, name: str):
+        if name not in self.skipped:
+            self.skipped.append(name)
+
+_CUR: contextvars.ContextVar[Optional[Budget]] = contextvars.ContextVar("deadline", default=None)
+
+def current() -> Optional[Budget]:
+    return _CUR.get()
+
+@contextmanager
+def budget(seconds: float = COMMAND_BUDGET_S) -> Iterator[Budget]:
+    """Rozpočet pro blok; vnořený nikdy neprodlouží vnější a sdílí s ním seznam přeskočených."""
+    outer = _CUR.get()
+    until = time.monotonic() + seconds
+    b = Budget(min(until, outer.until), outer.skipped) if outer else Budget(until)
+    token = _CUR.set(b)
+    try:
+        yield b
+    finally:
+        _CUR.reset(token)
+
+def timeout(default: Tuple[float, float]) -> Optional[Tuple[float, float]]:
+    """(connect, read) oříznuté na zbývající čas; None = čas došel. Bez rozpočtu default."""
+    b = _CUR.get()
+    if b is None:
+        return default
+    rem = b.remaining()
+    if rem < MIN_FETCH_S:
+        b.cut += 1
+        return None
+    return (min(default[0], rem), min(default[1], rem))
+
+def attempt(name: str, fn: Callable[..., T], *args, default: T = None, **kw) -> T:
+    """
+    Jeden zdroj pod rozpočtem: po vypršení se už nespouští, a když mu uvnitř
+    uťal čas některý požadavek, je v b.skipped (výsledek může být neúplný).
+    Výjimka zdroje = default (jako dosavadní try/except kolem zdrojů).
+    """
+    b = _CUR.get()
+    if b is not None and b.expired:
+        b.skip(name)
+        return default
+    cut0 = b.cut if b is not None else 0
+    try:
+        return fn(*args, **kw)
+    except Exception:
+        return default
+    finally:
+        if b is not None and b.cut > cut0:
+            b.skip(name)
+
+def bind(fn: Callable[..., T]) -> Callable[..., T]:
+    """Pro ThreadPoolExecutor: vlákno převezme aktuální rozpočet (contextvars se samy nepřenáší)."""
+    b = _CUR.get()
+
+    def run(*args, **kw):
+        token = _CUR.set(b)
+        try:
+            return fn(*args, **kw)
+        finally:
+            _CUR.reset(token)
+    return run
+
+def skipped_note(b: Budget) -> str:
+    if not b.skipped:
+        return ""
+    return "⏱ Časový limit – nestihl jsem: " + ", ".join(b.skipped)
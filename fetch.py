@@ -0,0 +1,151 @@
+# fetch.py — sdílené HTTP spojení (connection pool) + krátká cache odpovědí pro scrapery
+# Jeden requests.Session pro celý proces: keep-alive spojení se recyklují mezi sporty
+# i mezi /tip příkazy; stejná URL během HTTP_CACHE_TTL_S se nestahuje znovu.
+# Přes tuhle session jdou všechny scrapery (picks, sources, scraper) → record/replay viz cassette.py.
+# Pod časovým rozpočtem (deadline.py) se timeout ořízne na zbytek a retry s backoffem
+# dělá get_text sám (session bez urllib3 retry), jen dokud se další pokus vejde.
+# Každý host má circuit breaker (breaker.py): otevřený = None hned, bez sítě a bez retry.
+
+from __future__ import annotations
+import os, threading, time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import breaker
+import cassette
+import deadline
+
+UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+      "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+TIMEOUT = (7, 14)
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))          # spojení na host
+CACHE_TTL_S = float(os.getenv("HTTP_CACHE_TTL_S", "60"))    # 0 = bez cache
+
+HEADERS = {
+    "User-Agent": UA,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "cs-CZ,cs;q=0.9,en-US;q=0.8",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+    "Referer": "https://www.google.com/",
+}
+
+RETRIES = 3
+BACKOFF_S = 0.6
+RETRY_STATUS = (429, 500, 502, 503, 504)
+FAIL_STATUS = RETRY_STATUS + (403,)      # pro breaker: blokace / výpadek, ne „stránka neexistuje“
+
+_lock = threading.Lock()
+_sessions: Dict[bool, requests.Session] = {}
+_cache: Dict[str, Tuple[float, str]] = {}
+
+def _adapter_kw(retries: bool = True) -> dict:
+    retry = Retry(total=RETRIES if retries else 0, backoff_factor=BACKOFF_S,
+                  status_forcelist=list(RETRY_STATUS) if retries else None)
+    return {"pool_connections": 8, "pool_maxsize": POOL_SIZE, "max_retries": retry}
+
+def session(retries: bool = True) -> requests.Session:
+    """Sdílená session (thread-safe pro paralelní GET přes pool); retries=False pro rozpočet."""
+    with _lock:
+        s = _sessions.get(retries)
+        if s is None:
+            s = requests.Session()
+            s.headers.update(HEADERS)
+            s.mount("https://", HTTPAdapter(**_adapter_kw(retries)))
+            s.mount("http://", HTTPAdapter(**_adapter_kw(retries)))
+            cassette.install(s, _adapter_kw(retries))     # HTTP_MODE=record|replay
+            _sessions[retries] = s
+        return s
+
+def _record(br: breaker.Breaker, t0: float, r: Optional[requests.Response], error: str = "",
+            valid: Optional[Callable[[str], bool]] = None) -> bool:
+    """Výsledek pokusu do breakeru; False = chyba (i 200 se stránkou blokace)."""
+    ok = r is not None and r.status_code not in FAIL_STATUS
+    if ok and valid is not None and r.status_code == 200 and not valid(r.text):
+        ok, error = False, "blokace"
+    br.record(ok, time.monotonic() - t0, error or (f"HTTP {r.status_code}" if r is not None and not ok else ""))
+    return ok
+
+def _get_budgeted(url: str, timeout, headers: Optional[dict], br: breaker.Breaker,
+                  valid: Optional[Callable[[str], bool]] = None) -> Optional[requests.Response]:
+    """GET s retry/backoff řízeným zbytkem rozpočtu; None = čas došel nebo chyba."""
+    b = deadline.current()
+    for n in range(RETRIES + 1):
+        t = deadline.timeout(timeout if isinstance(timeout, tuple) else (timeout, timeout))
+        if t is None:
+            return None
+        if n and not br.allow():            # po chybách se breaker mohl mezitím otevřít
+            return None
+        t0 = time.monotonic()
+        try:
+            r = session(retries=False).get(url, timeout=t, headers=headers)
+        except requests.Timeout:
+            _record(br, t0, None, "timeout")
+            b.cut += 1
+            return None
+        except Exception as e:
+            r = None
+            _record(br, t0, None, type(e).__name__)
+        else:
+            if not _record(br, t0, r, valid=valid) and r.status_code == 200:
+                return None
+        if r is not None and r.status_code not in RETRY_STATUS:
+            return r
+        pause = BACKOFF_S * (2 ** n)
+        if n == RETRIES or b.remaining() < pause + deadline.MIN_FETCH_S:
+            if n < RETRIES:
+                b.cut += 1
+            return r
+        time.sleep(pause)
+    return None
+
+def get_text(url: str, timeout=TIMEOUT, ttl: Optional[float] = None,
+             headers: Optional[dict] = None, valid: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+    """
+    GET → text (status 200), jinak None. Výsledek se cachuje na ttl sekund
+    (default CACHE_TTL_S), takže souběžné skeny stejné kategorie stahují jednou.
+    valid(text) = False (např. Cloudflare challenge) → None, necachuje se, breaker = chyba.
+    """
+    ttl = CACHE_TTL_S if ttl is None else ttl
+    now = time.monotonic()
+    if ttl > 0:
+        hit = _cache.get(url)
+        if hit and now - hit[0] < ttl:
+            return hit[1]
+    br = breaker.for_url(url)
+    if not br.allow():
+        return None
+    try:
+        if deadline.current() is not None:
+            r = _get_budgeted(url, timeout, headers, br, valid)
+            if r is None:
+                return None
+        else:
+            t0 = time.monotonic()
+            try:
+                r = session().get(url, timeout=timeout, headers=headers)
+            except Exception as e:
+                _record(br, t0, None, type(e).__name__)
+                raise
+            if not _record(br, t0, r, valid=valid):
+                return None
+        if r.status_code != 200:
+            return None
+        text = r.text
+    except Exception:
+        return None
+    if ttl > 0:
+        with _lock:
+            _cache[url] = (time.monotonic(), text)
+            # úklid prošlých záznamů, ať cache neroste s každou novou URL
+            if len(_cache) > 256:
+                for k in [k for k, (ts, _) in _cache.items() if now - ts >= ttl]:
+                    _cache.pop(k, None)
+    return text
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
@@ -27,6 +27,18 @@ class TipCandidate:
     confidence: int          # 0–100
     est_odds: Optional[float] = None
 
+@dataclass(frozen=True)
+class StrategyParams:
+    """Prahy pro propose_football_tips (defaulty = ruční ladění)."""
+    ht_goal_xg: float = 2.1       # HT gól + Over 1.5
+    over25_xg: float = 1.9        # Over 2.5
+    btts_xg: float = 2.2          # BTTS
+    form_gap: float = 2.5         # týmový over favorita
+    corners_min: float = 9.0      # rohy
+    cards_min: float = 4.8        # karty
+
+DEFAULT_PARAMS = StrategyParams()
+
 def clamp(x, lo=0, hi=100): return max(lo, min(hi, x))
 
 def football_confidence(f: MatchFacts) -> int:
@@ -44,35 +56,36 @@ def football_confidence(f: MatchFacts) -> int:
         base -= min(8, f.injuries_abs * 2)
     return int(clamp(base))
 
-def propose_football_tips(f: MatchFacts) -> list[TipCandidate]:
+def propose_football_tips(f: MatchFacts, params: StrategyParams = DEFAULT_PARAMS) -> list[TipCandidate]:
+    p = params
     conf = football_confidence(f)
     tips: list[TipCandidate] = []
 
     # Bezpečí – góly (over) a HT gól
-    if f.xg_per90_sum and f.xg_per90_sum >= 2.1:
+    if f.xg_per90_sum and f.xg_per90_sum >= p.ht_goal_xg:
         tips.append(TipCandidate("HT_GOAL_YES", "ANO",
                     "Vysoké xG → gól do poločasu často padá.", min(94, conf+6), 1.40))
         tips.append(TipCandidate("FT_OU_1_5", "Over 1.5",
                     "Oba týmy ofenzivní; chceme jistotu.", min(92, conf+4), 1.30))
-    if f.xg_per90_sum and f.xg_per90_sum >= 1.9:
+    if f.xg_per90_sum and f.xg_per90_sum >= p.over25_xg:
         tips.append(TipCandidate("FT_OU_2_5", "Over 2.5",
                     "Dost šancí → 3 góly reálné.", conf, 1.80))
 
     # BTTS
-    if f.xg_per90_sum and f.xg_per90_sum >= 2.2:
+    if f.xg_per90_sum and f.xg_per90_sum >= p.btts_xg:
         tips.append(TipCandidate("BTTS_YES", "ANO",
                     "Obě strany mají xG nad průměrem.", max(70, conf-5), 1.7))
 
     # Týmové overy favorita (jen lehce)
-    if f.home_form10 and f.away_form10 and (f.home_form10 - f.away_form10) >= 2.5:
+    if f.home_form10 and f.away_form10 and (f.home_form10 - f.away_form10) >= p.form_gap:
         tips.append(TipCandidate("HOME_OVER_1_5", "Domácí Over 1.5",
                     "Forma + domácí prostředí.", max(78, conf-2), 1.8))
 
     # Rohy a karty – podle průměrů
-    if f.corners_avg and f.corners_avg >= 9.0:
+    if f.corners_avg and f.corners_avg >= p.corners_min:
         tips.append(TipCandidate("CORNERS_OVER", "Over (např. 9.5)",
                     "Zápas na rohy bohatý, trend potvrzuje průměr.", max(74, conf-6), 1.8))
-    if f.cards_avg and f.cards_avg >= 4.8:
+    if f.cards_avg and f.cards_avg >= p.cards_min:
         tips.append(TipCandidate("CARDS_OVER", "Over (např. 4.5)",
                     "Tvrdší liga/soupeři, více faulů.", max(72, conf-8), 1.9))
 
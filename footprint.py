@@ -0,0 +1,159 @@
+# footprint.py — paměť a latence HTTP vrstvy: jeden ASGI server (web.py) vs. původní sestava
+# Původní sestava = PTB run_webhook (tornado) + Flask keep_alive ve vlákně. V produkci oba
+# chtěly stejný PORT a kolidovaly; tady dostane Flask PORT+1, aby šla vůbec změřit.
+# Každá varianta běží ve vlastním procesu proti stubu Bot API (loadtest.BotApiStub);
+# měří se RSS po startu a po zátěži, počet vláken a latence přes jedno keep-alive spojení
+# (health + webhook POST /status) i s novým spojením na každý požadavek.
+#
+# Flask už v requirements.txt není (keep_alive.py je pryč); pro legacy variantu je extra
+# requirements-footprint.txt. ASGI varianta potřebuje jen uvicorn z requirements.txt.
+#
+#   pip install -r requirements.txt -r requirements-footprint.txt
+#   python footprint.py --requests 500 [--port 18090] [--only asgi|legacy]
+
+from __future__ import annotations
+import argparse, asyncio, http.client, importlib.util, json, os, subprocess, sys, threading, time
+from typing import Dict, List, Optional, Tuple
+
+from loadtest import SECRET, STUB_HOST, TOKEN, BotApiStub, _fmt, _update, pct
+from web import rss_bytes
+
+# =============== VARIANTY (běží v podprocesu) ===============
+def _bot_app():
+    os.environ.setdefault("PUSH_INTERVAL_S", "0")
+    import main
+    stub = BotApiStub().start()
+    return main, main.build_app(token=TOKEN, base_url=f"http://{STUB_HOST}:{stub.port}/bot")
+
+def _child_asgi(port: int):
+    import web
+    main, app = _bot_app()
+    web.serve(web.WebApp(app, main.STORE, "/hook", webhook_url=f"http://{STUB_HOST}:{port}/hook",
+                         secret_token=SECRET), host=STUB_HOST, port=port)
+
+def _child_legacy(port: int):
+    from flask import Flask
+    _, app = _bot_app()
+
+    flask_app = Flask("keep_alive")                # totéž, co dělal keep_alive.py
+    flask_app.get("/")(lambda: "flamengo-bot alive")
+    threading.Thread(target=lambda: flask_app.run(host=STUB_HOST, port=port + 1), daemon=True).start()
+
+    async def run():
+        await app.initialize()
+        await app.start()
+        await app.updater.start_webhook(listen=STUB_HOST, port=port, url_path="hook",
+                                        webhook_url=f"http://{STUB_HOST}:{port}/hook", secret_token=SECRET)
+        await asyncio.Event().wait()
+    asyncio.run(run())
+
+NEEDS = {"asgi": "uvicorn", "legacy": "flask"}
+
+# =============== MĚŘENÍ ===============
+def _threads(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            return next(int(l.split()[1]) for l in f if l.startswith("Threads:"))
+    except (OSError, StopIteration):
+        return 0
+
+def _wait_up(port: int, path: str, timeout: float = 30.0) -> bool:
+    until = time.time() + timeout
+    while time.time() < until:
+        try:
+            c = http.client.HTTPConnection(STUB_HOST, port, timeout=1)
+            c.request("GET", path)
+            if c.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.1)
+    return False
+
+def _requests(port: int, method: str, path: str, n: int, body_fn=None,
+              keepalive: bool = True) -> List[float]:
+    out = []
+    conn = http.client.HTTPConnection(STUB_HOST, port, timeout=10)
+    for i in range(n):
+        if not keepalive:
+            conn.close()
+            conn = http.client.HTTPConnection(STUB_HOST, port, timeout=10)
+        body = json.dumps(body_fn(i)).encode() if body_fn else None
+        headers = {"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": SECRET} if body else {}
+        t0 = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        r = conn.getresponse()
+        r.read()
+        out.append(time.perf_counter() - t0)
+    conn.close()
+    return out
+
+def measure(kind: str, port: int, n: int) -> Tuple[Dict[str, float], Dict[str, List[float]]]:
+    proc = subprocess.Popen([sys.executable, __file__, "--child", kind, "--port", str(port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    health_port = port + 1 if kind == "legacy" else port
+    try:
+        if not _wait_up(health_port, "/"):
+            raise RuntimeError(f"{kind}: server nenastartoval")
+        time.sleep(1.0)
+        mem = {"rss_start_mb": rss_bytes(str(proc.pid)) / 1e6, "threads": _threads(proc.pid)}
+        lat = {
+            "health keep-alive": _requests(health_port, "GET", "/", n),
+            "health nové spojení": _requests(health_port, "GET", "/", max(1, n // 5), keepalive=False),
+            "webhook keep-alive": _requests(port, "POST", "/hook", n, lambda i: _update(900000 + i, "status")),
+        }
+        time.sleep(1.0)
+        mem["rss_end_mb"] = rss_bytes(str(proc.pid)) / 1e6
+        mem["threads_end"] = _threads(proc.pid)
+        return mem, lat
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Paměť a latence: ASGI server vs. run_webhook + Flask.")
+    ap.add_argument("--requests", type=int, default=500, help="požadavků na měření")
+    ap.add_argument("--port", type=int, default=18090)
+    ap.add_argument("--only", choices=("asgi", "legacy"))
+    ap.add_argument("--child", choices=("asgi", "legacy"), help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    if args.child:
+        (_child_asgi if args.child == "asgi" else _child_legacy)(args.port)
+        return 0
+
+    results = {}
+    for kind in ([args.only] if args.only else ["legacy", "asgi"]):
+        if importlib.util.find_spec(NEEDS[kind]) is None:
+            print(f"{kind}: chybí {NEEDS[kind]} (pip install -r requirements.txt -r requirements-footprint.txt)")
+            continue
+        try:
+            mem, lat = measure(kind, args.port, args.requests)
+        except Exception as e:
+            print(f"{kind}: {e}")
+            continue
+        results[kind] = mem, lat
+        print(f"\n▶ {kind}: RSS {mem['rss_start_mb']:.1f} → {mem['rss_end_mb']:.1f} MB, "
+              f"vláken {mem['threads']} → {mem['threads_end']}")
+        for name, values in lat.items():
+            print(_fmt(name, values))
+    if len(results) == 2:
+        _compare(results["legacy"], results["asgi"])
+    return 0 if results and (args.only or len(results) == 2) else 1
+
+def _compare(legacy, asgi):
+    """Souhrn: paměť a vlákna + p50/p95 každého měření, legacy → asgi."""
+    (m0, l0), (m1, l1) = legacy, asgi
+    print("\n▶ legacy → asgi")
+    print(f"  RSS po zátěži {m0['rss_end_mb']:.1f} → {m1['rss_end_mb']:.1f} MB "
+          f"({m1['rss_end_mb'] - m0['rss_end_mb']:+.1f}), vláken {m0['threads_end']} → {m1['threads_end']}")
+    for name in l0:
+        a = [x * 1000 for x in l0[name]]
+        b = [x * 1000 for x in l1[name]]
+        print(f"  {name:22s} p50 {pct(a, 50):6.2f} → {pct(b, 50):6.2f} ms   "
+              f"p95 {pct(a, 95):6.2f} → {pct(b, 95):6.2f} ms")
+
+if __name__ == "__main__":
+    raise SystemExit(main_cli())
@@ -0,0 +1,183 @@
+# goal_model.py — Poisson / Dixon-Coles model gólů (vektorově přes NumPy)
+# Útok/obrana týmů → očekávané góly → matice skóre pro všechny zápasy naráz
+# → pravděpodobnosti HT Over 0.5, Over 1.5/2.5, BTTS.
+#
+# Benchmark:  python goal_model.py [počet_zápasů]   (default 10 000)
+
+from __future__ import annotations
+import sys, time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from analyzer import TeamStats
+from flamengo_strategy import MatchFacts
+
+# ------- Parametry -------
+@dataclass(frozen=True)
+class ModelParams:
+    max_goals: int = 10        # matice 0..max_goals × 0..max_goals
+    ht_share: float = 0.45     # podíl gólů, které padnou v 1. poločase
+    home_adv: float = 1.10     # násobek λ domácích
+    league_avg: float = 1.35   # průměr gólů jednoho týmu za zápas (normalizace útok×obrana)
+    rho: float = -0.05         # Dixon-Coles korekce nízkých skóre (0 = čistý Poisson)
+
+DEFAULT_PARAMS = ModelParams()
+CACHE_BYTES = 64 * 1024 * 1024 # strop cache matic v bajtech (dávka 10 000 zápasů ≈ 10 MB)
+
+# =============== λ (OČEKÁVANÉ GÓLY) ===============
+def expected_goals(home_att, home_def, away_att, away_def,
+                   params: ModelParams = DEFAULT_PARAMS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    att = vstřelené góly/zápas, def = obdržené góly/zápas (pole nebo skaláry).
+    λ_dom = att_dom × def_host / průměr × výhoda domácích, λ_host obdobně.
+    """
+    ha, hd = np.asarray(home_att, float), np.asarray(home_def, float)
+    aa, ad = np.asarray(away_att, float), np.asarray(away_def, float)
+    lam_h = ha * ad / params.league_avg * params.home_adv
+    lam_a = aa * hd / params.league_avg
+    return np.clip(lam_h, 0.05, 6.0), np.clip(lam_a, 0.05, 6.0)
+
+def lambdas_from_facts(facts: Iterable[MatchFacts], default_xg: float = 2.6) -> Tuple[np.ndarray, np.ndarray]:
+    """MatchFacts nemají útok/obranu zvlášť → rozdělíme xG součet podle formy."""
+    xg, share = [], []
+    for f in facts:
+        xg.append(f.xg_per90_sum if f.xg_per90_sum else default_xg)
+        if f.home_form10 is not None and f.away_form10 is not None:
+            share.append(0.5 + max(-0.15, min(0.15, (f.home_form10 - f.away_form10) * 0.03)))
+        else:
+            share.append(0.53)   # mírná výhoda domácích
+    xg_a, sh_a = np.asarray(xg, float), np.asarray(share, float)
+    return xg_a * sh_a, xg_a * (1.0 - sh_a)
+
+def lambdas_from_stats(pairs: Iterable[Tuple[TeamStats, TeamStats]],
+                       params: ModelParams = DEFAULT_PARAMS) -> Tuple[np.ndarray, np.ndarray]:
+    """(domácí, hosté) TeamStats z analyzer → λ přes gf_pg / ga_pg."""
+    rows = [(h.gf_pg, h.ga_pg, a.gf_pg, a.ga_pg) for h, a in pairs]
+    arr = np.asarray(rows, float).reshape(-1, 4)
+    return expected_goals(arr[:, 0], arr[:, 1], arr[:, 2], arr[:, 3], params)
+
+# =============== MATICE SKÓRE ===============
+def poisson_pmf(lam: np.ndarray, max_goals: int) -> np.ndarray:
+    """(n,) → (n, max_goals+1); rekurence p_k = p_{k-1}·λ/k přes cumprod (bez faktoriálů)."""
+    lam = np.asarray(lam, float).reshape(-1, 1)
+    k = np.arange(1, max_goals + 1, dtype=float)
+    steps = np.concatenate([np.ones_like(lam), lam / k], axis=1)
+    return np.exp(-lam) * np.cumprod(steps, axis=1)
+
+def _dixon_coles(m: np.ndarray, lam_h: np.ndarray, lam_a: np.ndarray, rho: float) -> np.ndarray:
+    if not rho:
+        return m
+    m[:, 0, 0] *= 1.0 - lam_h * lam_a * rho
+    m[:, 0, 1] *= 1.0 + lam_h * rho
+    m[:, 1, 0] *= 1.0 + lam_a * rho
+    m[:, 1, 1] *= 1.0 - rho
+    np.clip(m, 0.0, None, out=m)
+    return m
+
+def _build(lam_h: np.ndarray, lam_a: np.ndarray, params: ModelParams) -> np.ndarray:
+    ph = poisson_pmf(lam_h, params.max_goals)
+    pa = poisson_pmf(lam_a, params.max_goals)
+    m = ph[:, :, None] * pa[:, None, :]                    # (n, G, G), řádky = domácí
+    m = _dixon_coles(m, lam_h, lam_a, params.rho)
+    m /= m.sum(axis=(1, 2), keepdims=True)                 # useknutý chvost + DC → renormalizace
+    return m
+
+_CACHE: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_CACHE_NBYTES = 0
+
+def score_matrix(lam_h, lam_a, params: ModelParams = DEFAULT_PARAMS) -> np.ndarray:
+    """
+    Matice P(domácí=i, hosté=j) pro všechny zápasy naráz, tvar (n, G, G).
+    Cache podle (parametry, λ): opakovaný dotaz nad stejnou dávkou matice nepočítá znovu.
+    LRU do CACHE_BYTES (počítá se velikost matic, ne počet dávek); větší dávka se nekešuje.
+    Vrácené pole je jen pro čtení (sdílí se přes cache).
+    """
+    global _CACHE_NBYTES
+    lh = np.ascontiguousarray(lam_h, dtype=float).reshape(-1)
+    la = np.ascontiguousarray(lam_a, dtype=float).reshape(-1)
+    key = (params, lh.tobytes(), la.tobytes())
+    hit = _CACHE.get(key)
+    if hit is not None:
+        _CACHE.move_to_end(key)
+        return hit
+    m = _build(lh, la, params)
+    m.setflags(write=False)
+    if m.nbytes > CACHE_BYTES:
+        return m
+    _CACHE[key] = m
+    _CACHE_NBYTES += m.nbytes
+    while _CACHE_NBYTES > CACHE_BYTES:
+        _CACHE_NBYTES -= _CACHE.popitem(last=False)[1].nbytes
+    return m
+
+def clear_cache():
+    global _CACHE_NBYTES
+    _CACHE.clear()
+    _CACHE_NBYTES = 0
+
+# =============== TRHY ===============
+def _totals(g: int) -> np.ndarray:
+    i = np.arange(g)
+    return i[:, None] + i[None, :]
+
+def match_probabilities(lam_h, lam_a, params: ModelParams = DEFAULT_PARAMS) -> Dict[str, np.ndarray]:
+    """
+    Pravděpodobnosti (pole délky n):
+      HT_O05  – gól v 1. poločase,  FT_O15 / FT_O25 – počet gólů v zápase,
+      BTTS    – oba týmy skórují,   LAM_H / LAM_A – očekávané góly.
+    """
+    lh = np.asarray(lam_h, float).reshape(-1)
+    la = np.asarray(lam_a, float).reshape(-1)
+    ft = score_matrix(lh, la, params)
+    ht = score_matrix(lh * params.ht_share, la * params.ht_share, params)
+
+    tot = _totals(params.max_goals + 1)
+    under15 = ft[:, tot <= 1].sum(axis=1)
+    under25 = ft[:, tot <= 2].sum(axis=1)
+    no_home = ft[:, 0, :].sum(axis=1)
+    no_away = ft[:, :, 0].sum(axis=1)
+    return {
+        "HT_O05": 1.0 - ht[:, 0, 0],
+        "FT_O15": 1.0 - under15,
+        "FT_O25": 1.0 - under25,
+        "BTTS": 1.0 - no_home - no_away + ft[:, 0, 0],
+        "LAM_H": lh,
+        "LAM_A": la,
+    }
+
+def prob_to_conf(p) -> np.ndarray:
+    """Pravděpodobnost → důvěra 0–100 (int), stejná škála jako TipCandidate.confidence."""
+    return np.clip(np.rint(np.asarray(p, float) * 100.0), 0, 100).astype(int)
+
+def facts_probabilities(facts: List[MatchFacts], params: ModelParams = DEFAULT_PARAMS) -> Dict[str, np.ndarray]:
+    """Zkratka: MatchFacts → match_probabilities."""
+    lh, la = lambdas_from_facts(facts)
+    return match_probabilities(lh, la, params)
+
+def conf_over05_1H(home: TeamStats, away: TeamStats, params: ModelParams = DEFAULT_PARAMS) -> int:
+    """Modelová obdoba analyzer.conf_over05_1H pro jeden zápas."""
+    lh, la = lambdas_from_stats([(home, away)], params)
+    return int(prob_to_conf(match_probabilities(lh, la, params)["HT_O05"])[0])
+
+# =============== BENCHMARK ===============
+def _bench(n: int = 10_000, params: ModelParams = DEFAULT_PARAMS) -> None:
+    rng = np.random.default_rng(7)
+    lh, la = expected_goals(rng.uniform(0.6, 2.4, n), rng.uniform(0.6, 2.0, n),
+                            rng.uniform(0.5, 2.2, n), rng.uniform(0.6, 2.2, n), params)
+    clear_cache()
+    t0 = time.perf_counter()
+    probs = match_probabilities(lh, la, params)
+    cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    match_probabilities(lh, la, params)
+    warm = time.perf_counter() - t0
+    print(f"{n} zápasů, matice {params.max_goals + 1}×{params.max_goals + 1}: "
+          f"{cold * 1000:.1f} ms (cold), {warm * 1000:.1f} ms (cache)")
+    for k in ("HT_O05", "FT_O15", "FT_O25", "BTTS"):
+        print(f"  {k:7s} průměr {probs[k].mean():.3f}")
+
+if __name__ == "__main__":
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
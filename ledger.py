@@ -0,0 +1,263 @@
+# ledger.py — záznam odeslaných tipů, vyhodnocení a rychlé /stats (SQLite)
+# tips        – jeden řádek na tip (zápas × trh), append-only
+# deliveries  – kdy a komu tip odešel, append-only
+# settlements – výsledek tipu (výhra/prohra/nelze), zapisuje se jednou
+# rollup      – předpočítané součty (celkem / trh / liga / pásmo důvěry), aktualizují se
+#               ve stejné transakci jako settlement → /stats čte pár desítek řádků, ne historii.
+#
+# Týmy se v tips ukládají jako slug názvu (team_registry.slug), ne jako ID z registru:
+# ID jsou jen cache pro porovnávání v paměti, ledger musí přežít i nový registr.
+# settle() páruje přes slug výsledku + slugy aliasů, které registr zná; nové ID nezakládá.
+#
+# Vyhodnocení běží samo: bot (post_init) každých LEDGER_SETTLE_S načte LEDGER_RESULTS_PATH, když
+# se soubor změnil, a settle() zapíše jen dosud otevřené tipy (opakování nic nezdvojí).
+# Bez bota stejně dobře cron:  */15 * * * *  python ledger.py settle /data/vysledky.json
+#
+#   LEDGER_PATH=ledger.sqlite3   LEDGER_RESULTS_PATH=vysledky.json   LEDGER_SETTLE_S=900
+#
+#   python ledger.py settle historie.json     (formát jako backtest.py: home, away, ts_utc, result)
+#   python ledger.py stats [market|league|band]
+
+from __future__ import annotations
+import asyncio, logging, os, sqlite3, sys, threading, time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from settle import CONF_BUCKETS, Result, load_results, market_code, settle_market
+from team_registry import match_slugs, slug_variants
+
+log = logging.getLogger("kiki-ledger")
+
+DB_PATH = os.getenv("LEDGER_PATH", "ledger.sqlite3")
+RESULTS_PATH = os.getenv("LEDGER_RESULTS_PATH", "").strip()
+SETTLE_S = float(os.getenv("LEDGER_SETTLE_S", "900"))
+MATCH_TOL_S = 2 * 3600          # tolerance výkopu při párování s výsledkem
+DIMS = ("total", "market", "league", "band")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tips (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    match TEXT NOT NULL,
+    home TEXT NOT NULL,                  -- slug domácích
+    away TEXT NOT NULL,                  -- slug hostů
+    kickoff INTEGER NOT NULL,
+    league TEXT NOT NULL,
+    market TEXT NOT NULL,
+    code TEXT,
+    confidence INTEGER NOT NULL,
+    odds REAL,
+    UNIQUE (home, away, kickoff, market)
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    tip_id INTEGER NOT NULL REFERENCES tips(id),
+    chat INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    PRIMARY KEY (tip_id, chat)
+);
+CREATE TABLE IF NOT EXISTS settlements (
+    tip_id INTEGER PRIMARY KEY REFERENCES tips(id),
+    settled REAL NOT NULL,
+    won INTEGER                      -- 1/0, NULL = nelze vyhodnotit
+);
+CREATE TABLE IF NOT EXISTS rollup (
+    dim TEXT NOT NULL,
+    key TEXT NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    staked REAL NOT NULL DEFAULT 0,
+    returned REAL NOT NULL DEFAULT 0,
+    conf_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (dim, key)
+);
+"""
+
+def conf_band(conf: int) -> str:
+    for lo, hi in zip(CONF_BUCKETS, CONF_BUCKETS[1:]):
+        if lo <= conf < hi:
+            return f"{lo}–{hi - 1}"
+    return "?"
+
+class Ledger:
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._db.executescript(_SCHEMA)
+
+    def _migrate(self):
+        """Starší schéma s home_id/away_id (ID registru) → slugy dopočtené z textu zápasu."""
+        cols = [r[1] for r in self._db.execute("PRAGMA table_info(tips)")]
+        if "home_id" not in cols:
+            return
+        old = self._db.execute("SELECT id, created, match, kickoff, league, market, code, confidence, odds"
+                               " FROM tips").fetchall()
+        self._db.execute("BEGIN")
+        self._db.execute("ALTER TABLE tips RENAME TO tips_old")
+        self._db.execute(_SCHEMA.split(";")[0])            # jen CREATE TABLE tips
+        self._db.executemany(
+            "INSERT OR IGNORE INTO tips (id, created, match, home, away, kickoff, league, market, code,"
+            " confidence, odds) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+            [(i, c, m, *match_slugs(m), ko, lg, mk, code, conf, odds)
+             for i, c, m, ko, lg, mk, code, conf, odds in old])
+        self._db.execute("DROP TABLE tips_old")
+        self._db.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # ---------- zápis ----------
+    def record(self, tips: Iterable, chat: int, ts: Optional[float] = None) -> int:
+        """Odeslané tipy (picks.Tip / sources.Tip) → tips + deliveries. Vrací počet nových doručení."""
+        ts = time.time() if ts is None else ts
+        rows = []
+        for t in tips:
+            ko = getattr(t, "kickoff", None)
+            if ko is None:
+                continue
+            h, a = match_slugs(t.match)
+            market = getattr(t, "market", "")
+            rows.append((ts, t.match, h, a, int(ko.timestamp()), getattr(t, "league", "") or "",
+                         market, market_code(market), int(t.confidence or 0), getattr(t, "odds", None)))
+        if not rows:
+            return 0
+        with self._lock:
+            cur = self._db.cursor()
+            cur.execute("BEGIN")
+            cur.executemany(
+                "INSERT OR IGNORE INTO tips (created, match, home, away, kickoff, league, market, code,"
+                " confidence, odds) VALUES (?,?,?,?,?,?,?,?,?,?)", rows)
+            before = self._db.total_changes
+            cur.executemany(
+                "INSERT OR IGNORE INTO deliveries (tip_id, chat, ts) SELECT id, ?, ? FROM tips"
+                " WHERE home=? AND away=? AND kickoff=? AND market=?",
+                [(chat, ts, r[2], r[3], r[4], r[6]) for r in rows])
+            added = self._db.total_changes - before
+            cur.execute("COMMIT")
+        return added
+
+    def settle(self, results: Iterable[Tuple[str, str, int, Result]], now: Optional[float] = None) -> int:
+        """
+        Hromadné vyhodnocení: (domácí, hosté, výkop ts, Result). Každý nevyhodnocený tip
+        zápasu (výkop ± MATCH_TOL_S) dostane settlement a rollupy se přičtou v jedné transakci.
+        """
+        now = time.time() if now is None else now
+        settled = 0
+        with self._lock:
+            cur = self._db.cursor()
+            cur.execute("BEGIN")
+            for home, away, ko, res in results:
+                hs, as_ = slug_variants(home), slug_variants(away)
+                open_tips = cur.execute(
+                    "SELECT t.id, t.code, t.league, t.confidence, t.odds FROM tips t"
+                    " LEFT JOIN settlements s ON s.tip_id = t.id"
+                    f" WHERE t.home IN ({','.join('?' * len(hs))}) AND t.away IN ({','.join('?' * len(as_))})"
+                    " AND t.kickoff BETWEEN ? AND ? AND s.tip_id IS NULL",
+                    (*hs, *as_, ko - MATCH_TOL_S, ko + MATCH_TOL_S)).fetchall()
+                for tip_id, code, league, conf, odds in open_tips:
+                    won = settle_market(code, res) if code else None
+                    cur.execute("INSERT INTO settlements (tip_id, settled, won) VALUES (?,?,?)",
+                                (tip_id, now, None if won is None else int(won)))
+                    settled += 1
+                    if won is None:
+                        continue
+                    staked = 1.0 if odds else 0.0
+                    returned = float(odds) if odds and won else 0.0
+                    for dim, key in (("total", ""), ("market", code), ("league", league),
+                                     ("band", conf_band(conf))):
+                        cur.execute(
+                            "INSERT INTO rollup (dim, key, n, hits, staked, returned, conf_sum)"
+                            " VALUES (?,?,1,?,?,?,?) ON CONFLICT (dim, key) DO UPDATE SET"
+                            " n=n+1, hits=hits+excluded.hits, staked=staked+excluded.staked,"
+                            " returned=returned+excluded.returned, conf_sum=conf_sum+excluded.conf_sum",
+                            (dim, key, int(won), staked, returned, conf))
+            cur.execute("COMMIT")
+        return settled
+
+    def settle_history(self, rows: Iterable) -> int:
+        """backtest.HistoryRow (facts + result) → settle()."""
+        return self.settle((r.facts.home, r.facts.away, r.facts.ts_utc, r.result) for r in rows)
+
+    # ---------- čtení ----------
+    def stats(self, dim: str = "market") -> List[dict]:
+        """Rollup jedné dimenze: n, hit_rate, roi, avg_conf; seřazeno podle n ↓."""
+        if dim not in DIMS:
+            raise ValueError(f"dim: {dim}")
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, n, hits, staked, returned, conf_sum FROM rollup WHERE dim=? ORDER BY n DESC, key",
+                (dim,)).fetchall()
+        return [{
+            "key": key, "n": n,
+            "hit_rate": hits / n if n else None,
+            "roi": (ret - st) / st if st else None,
+            "avg_conf": conf / n / 100.0 if n else None,
+        } for key, n, hits, st, ret, conf in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            q = lambda sql: self._db.execute(sql).fetchone()[0]
+            return {"tips": q("SELECT COUNT(*) FROM tips"),
+                    "deliveries": q("SELECT COUNT(*) FROM deliveries"),
+                    "settled": q("SELECT COUNT(*) FROM settlements")}
+
+_LEDGER: Optional[Ledger] = None
+
+def ledger() -> Ledger:
+    global _LEDGER
+    if _LEDGER is None:
+        _LEDGER = Ledger()
+    return _LEDGER
+
+async def run(path: str = RESULTS_PATH, interval: float = SETTLE_S):
+    """Periodické vyhodnocení (asyncio task z post_init); nezměněný soubor (mtime) se nečte."""
+    if not path:
+        return
+    stamp: Tuple[float, int] = (0.0, -1)
+    while True:
+        try:
+            st = os.stat(path)
+            if (st.st_mtime, st.st_size) != stamp:
+                n = await asyncio.to_thread(lambda: ledger().settle(load_results(path)))
+                stamp = (st.st_mtime, st.st_size)
+                if n:
+                    log.info("ledger: vyhodnoceno %d tipů z %s", n, path)
+        except Exception as e:
+            log.warning("ledger settle: %s", e)
+        await asyncio.sleep(interval)
+
+def format_stats(dim: str = "market", limit: int = 12) -> str:
+    lg = ledger()
+    total = lg.stats("total")
+    c = lg.counts()
+    head = f"📒 Odesláno {c['tips']} tipů ({c['deliveries']} doručení), vyhodnoceno {c['settled']}"
+    if not total:
+        return head + "\nZatím nic vyhodnoceného."
+    lines = [head, _fmt_row("Celkem", total[0]), ""]
+    lines += [_fmt_row(r["key"] or "—", r) for r in lg.stats(dim)[:limit]]
+    return "\n".join(lines)
+
+def _fmt_row(label: str, r: dict) -> str:
+    roi = f"{r['roi'] * 100:+.1f} %" if r["roi"] is not None else "—"
+    return f"• {label}: {r['n']}× | úspěšnost {r['hit_rate'] * 100:.0f} % | ROI {roi} | ø důvěra {r['avg_conf'] * 100:.0f} %"
+
+def main(argv: List[str]) -> int:
+    if len(argv) >= 2 and argv[0] == "settle":
+        n = ledger().settle(load_results(argv[1]))
+        print(f"vyhodnoceno {n} tipů")
+        return 0
+    if argv and argv[0] == "stats":
+        dim = argv[1] if len(argv) > 1 else "market"
+        t0 = time.perf_counter()
+        text = format_stats(dim)
+        print(text)
+        print(f"({(time.perf_counter() - t0) * 1000:.2f} ms)")
+        return 0
+    print("python ledger.py settle <historie.json> | stats [market|league|band]")
+    return 2
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,273 @@
+# live.py — živé sledování tipnutých zápasů v 1. poločase („Gól do poločasu“)
+# Feed vrací jen události změněné od posledního kurzoru (since=…); tracker si drží
+# tipnuté zápasy podle ID týmů, takže jedno kolo stojí O(počet změn), ne O(sledovaných).
+# Šance na gól ve zbytku poločasu: λ z předzápasové důvěry (p = 1 − e^−λ), zbývá
+# P = 1 − e^(−λ · zbývající/45). Upozornění jdou přes bot.send_message do chatů, kam tip odešel.
+#
+#   LIVE_FEED_PATH=live.json   – soubor {"cursor": N, "events": [{…, "v": N}]}
+#   LIVE_FEED_URL=http://…     – HTTP feed, GET ?since=<kurzor> → stejný formát
+#   LIVE_POLL_S=20
+#
+# Ukázka se stub serverem:  python live.py [počet_zápasů]
+
+from __future__ import annotations
+import asyncio, json, logging, math, os, sys, threading, time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from fetch import session, TIMEOUT
+from team_registry import REGISTRY, MatchKey, match_key
+
+log = logging.getLogger("kiki-live")
+
+FEED_PATH = os.getenv("LIVE_FEED_PATH", "").strip()
+FEED_URL = os.getenv("LIVE_FEED_URL", "").strip()
+POLL_S = float(os.getenv("LIVE_POLL_S", "20"))
+
+HALF_MIN = 45
+STOPPAGE_MIN = 2              # průměrná nastavená doba 1. poločasu
+ALERT_LEVELS = (50, 25)       # upozornit, když šance klesne pod tyto hodnoty (%)
+TRACK_BEFORE_S = 10 * 60      # začni se ptát feedu 10 min před výkopem
+TRACK_AFTER_S = 75 * 60       # … a přestaň po konci poločasu (+ rezerva)
+_HT_MARKET = ("poločas", "HT")
+
+@dataclass
+class LiveEvent:
+    id: str
+    home: str
+    away: str
+    status: str               # NS | 1H | HT | 2H | FT
+    minute: int = 0
+    home_goals: int = 0
+    away_goals: int = 0
+    ht_home: Optional[int] = None
+    ht_away: Optional[int] = None
+
+    @classmethod
+    def from_json(cls, d: dict) -> "LiveEvent":
+        return cls(str(d.get("id", "")), d.get("home", ""), d.get("away", ""),
+                   str(d.get("status", "NS")).upper(), int(d.get("minute") or 0),
+                   int(d.get("home_goals") or 0), int(d.get("away_goals") or 0),
+                   d.get("ht_home"), d.get("ht_away"))
+
+# =============== FEEDY ===============
+class FileFeed:
+    """Lokální JSON soubor (testy / ruční feed). Nezměněný soubor (mtime) = nic k parsování."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stamp: Tuple[float, int] = (0.0, -1)
+
+    def changes(self, since: int) -> Tuple[List[LiveEvent], int]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return [], since
+        stamp = (st.st_mtime, st.st_size)
+        if stamp == self._stamp:
+            return [], since
+        self._stamp = stamp
+        with open(self.path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        cursor = int(raw.get("cursor") or 0)
+        evs = [LiveEvent.from_json(e) for e in raw.get("events") or [] if int(e.get("v") or cursor) > since]
+        return evs, max(since, cursor)
+
+class HttpFeed:
+    """HTTP feed s kurzorem: server vrací jen události změněné od `since`."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def changes(self, since: int) -> Tuple[List[LiveEvent], int]:
+        r = session().get(self.url, params={"since": since}, timeout=TIMEOUT)
+        r.raise_for_status()
+        raw = r.json()
+        evs = [LiveEvent.from_json(e) for e in raw.get("events") or []]
+        return evs, max(since, int(raw.get("cursor") or since))
+
+def feed_from_env():
+    if FEED_URL:
+        return HttpFeed(FEED_URL)
+    if FEED_PATH:
+        return FileFeed(FEED_PATH)
+    return None
+
+# =============== TRACKER ===============
+def _chance(lam: float, minute: int) -> float:
+    left = max(0, HALF_MIN - minute) + STOPPAGE_MIN
+    return 1.0 - math.exp(-lam * left / (HALF_MIN + STOPPAGE_MIN))
+
+@dataclass
+class Tracked:
+    match: str
+    kickoff: float
+    lam: float
+    chats: Set[int] = field(default_factory=set)
+    level: int = 0            # kolik ALERT_LEVELS už bylo ohlášeno
+
+class Tracker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: Dict[MatchKey, Tracked] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def track(self, tip, chat: int) -> bool:
+        """Zaregistruje odeslaný tip (jen trhy na gól v 1. poločase)."""
+        market = getattr(tip, "market", "")
+        ko = getattr(tip, "kickoff", None)
+        if ko is None or not any(m in market for m in _HT_MARKET):
+            return False
+        p = min(max(int(getattr(tip, "confidence", 0) or 0), 1), 99) / 100.0
+        key = match_key(getattr(tip, "match", ""))
+        now = time.time()
+        with self._lock:
+            for k in [k for k, t in self._items.items() if now > t.kickoff + TRACK_AFTER_S]:
+                del self._items[k]
+            t = self._items.get(key)
+            if t is None:
+                t = self._items[key] = Tracked(tip.match, ko.timestamp(), -math.log(1.0 - p))
+            t.chats.add(chat)
+        return True
+
+    def active(self, now: Optional[float] = None) -> bool:
+        """Běží (nebo za chvíli začne) aspoň jeden sledovaný poločas?"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return any(t.kickoff - TRACK_BEFORE_S <= now <= t.kickoff + TRACK_AFTER_S
+                       for t in self._items.values())
+
+    def apply(self, events: List[LiveEvent]) -> List[Tuple[int, str]]:
+        """Změněné události → [(chat, text)]; nesledované zápasy stojí jeden lookup."""
+        out: List[Tuple[int, str]] = []
+        with self._lock:
+            for ev in events:
+                h, a = REGISTRY.key_id(ev.home), REGISTRY.key_id(ev.away)
+                if not h or not a:
+                    continue
+                t = self._items.get((h, a))
+                if t is None:
+                    continue
+                text, done = self._step(t, ev)
+                if text:
+                    out.extend((c, text) for c in sorted(t.chats))
+                if done:
+                    del self._items[(h, a)]
+        return out
+
+    def _step(self, t: Tracked, ev: LiveEvent) -> Tuple[Optional[str], bool]:
+        goals = ev.home_goals + ev.away_goals
+        if ev.status == "1H":
+            if goals:
+                return f"✅ <b>{t.match}</b>: gól do poločasu padl ({ev.minute}′, {ev.home_goals}:{ev.away_goals})", True
+            chance = _chance(t.lam, ev.minute) * 100
+            text = None
+            while t.level < len(ALERT_LEVELS) and chance < ALERT_LEVELS[t.level]:
+                t.level += 1
+                text = (f"⏳ <b>{t.match}</b>: {ev.minute}′ 0:0 – šance na gól do poločasu "
+                        f"už jen {chance:.0f} %")
+            return text, False
+        if ev.status in ("HT", "2H", "FT"):
+            if ev.status == "HT":
+                hh, ha = ev.home_goals, ev.away_goals
+            elif ev.ht_home is not None and ev.ht_away is not None:
+                hh, ha = int(ev.ht_home), int(ev.ht_away)
+            else:
+                return None, True
+            if hh + ha:
+                return f"✅ <b>{t.match}</b>: gól do poločasu padl (poločas {hh}:{ha})", True
+            return f"❌ <b>{t.match}</b>: poločas 0:0 – tip nevyšel", True
+        return None, False
+
+TRACKER = Tracker()
+
+# =============== SMYČKA ===============
+async def run(bot, tracker: Tracker = TRACKER, feed=None, interval: float = POLL_S):
+    """Polling ve smyčce (asyncio task z post_init). Bez aktivních zápasů se feed nevolá."""
+    feed = feed or feed_from_env()
+    if feed is None:
+        return
+    cursor = 0
+    while True:
+        if tracker.active():
+            try:
+                events, cursor = await asyncio.to_thread(feed.changes, cursor)
+            except Exception as e:
+                log.warning("live feed: %s", e)
+                events = []
+            for chat, text in tracker.apply(events):
+                try:
+                    await bot.send_message(chat_id=chat, text=text, parse_mode="HTML")
+                except Exception as e:
+                    log.warning("live alert %s: %s", chat, e)
+        await asyncio.sleep(interval)
+
+# =============== UKÁZKA (stub feed) ===============
+def _demo(n: int = 2000, tracked: int = 20, ticks: int = 50) -> None:
+    """Stub HTTP feed s n zápasy, každé kolo se změní ~2 %; sleduje se `tracked` z nich."""
+    import random
+    from datetime import datetime
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from types import SimpleNamespace
+    from urllib.parse import parse_qs, urlparse
+
+    rnd = random.Random(7)
+    events = [{"id": str(i), "home": f"Demo Home {i}", "away": f"Demo Away {i}", "status": "1H",
+               "minute": 0, "home_goals": 0, "away_goals": 0, "v": 1} for i in range(n)]
+    state = {"cursor": 1}
+
+    def tick():
+        state["cursor"] += 1
+        for e in rnd.sample(events, max(1, n // 50)):
+            if e["status"] != "1H":
+                continue
+            e["minute"] = min(45, e["minute"] + rnd.randint(3, 9))
+            if rnd.random() < 0.12:
+                e["home_goals"] += 1
+            if e["minute"] >= 45:
+                e["status"] = "HT"
+            e["v"] = state["cursor"]
+
+    class H(BaseHTTPRequestHandler):
+        def do_GET(self):
+            since = int(parse_qs(urlparse(self.path).query).get("since", ["0"])[0])
+            body = json.dumps({"cursor": state["cursor"],
+                               "events": [e for e in events if e["v"] > since]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *a):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), H)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    feed = HttpFeed(f"http://127.0.0.1:{srv.server_address[1]}/live")
+
+    tr = Tracker()
+    ko = datetime.fromtimestamp(time.time())
+    for e in rnd.sample(events, tracked):
+        tr.track(SimpleNamespace(match=f"{e['home']} – {e['away']}", market="Gól v 1. poločase: ANO (Over 0.5 HT)",
+                                 confidence=80, kickoff=ko), chat=1)
+
+    cursor, seen, alerts = 0, 0, 0
+    t0 = time.perf_counter()
+    evs, cursor = feed.changes(cursor)                 # první kolo = plný snímek
+    full = len(evs)
+    for _ in range(ticks):
+        tick()
+        evs, cursor = feed.changes(cursor)
+        seen += len(evs)
+        alerts += len(tr.apply(evs))
+    dt = time.perf_counter() - t0
+    print(f"{n} zápasů v feedu, sledováno {tracked}: úvodní snímek {full} událostí, pak "
+          f"{seen / ticks:.1f} změn/kolo; {alerts} upozornění, zbývá sledovat {len(tr)}; "
+          f"{dt / (ticks + 1) * 1000:.1f} ms/kolo")
+    srv.shutdown()
+
+if __name__ == "__main__":
+    _demo(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
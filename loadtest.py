@@ -0,0 +1,290 @@
+# loadtest.py — zátěžový test webhooku simulovaným Telegram provozem
+# Bot (main.build_app) běží za produkčním ASGI serverem (web.WebApp pod uvicornem, stejně
+# jako web.serve) ve stejné smyčce jako měření lagu; Bot API i scrapované weby nahrazují
+# lokální stub servery. Generátor posílá /tip, /tip2, /tip3, /tip24, /debug
+# v zadaném poměru a rychlosti; latence = od POSTu updatu po příchod sendMessage do stubu.
+#
+#   python loadtest.py --rate 20 --duration 30 --site-latency 0.3 \
+#                      --mix tip=5,tip2=2,tip3=2,tip24=1,debug=0.2
+#
+# Výstup: p50/p95/p99 latence handleru a POSTu webhooku, propustnost, lag event loopu.
+
+from __future__ import annotations
+import argparse, asyncio, json, os, random, threading, time
+from urllib.parse import parse_qsl
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+STUB_HOST = "127.0.0.1"
+TOKEN = "123456:LOADTEST"
+SECRET = "loadtest-secret"
+
+# =============== STATISTIKA ===============
+def pct(values: List[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    v = sorted(values)
+    k = min(len(v) - 1, max(0, int(round(p / 100.0 * (len(v) - 1)))))
+    return v[k]
+
+def _fmt(name: str, values: List[float]) -> str:
+    if not values:
+        return f"{name:22s} n=0"
+    ms = [x * 1000 for x in values]
+    return (f"{name:22s} n={len(ms):5d}  p50={pct(ms, 50):8.1f} ms  p95={pct(ms, 95):8.1f} ms  "
+            f"p99={pct(ms, 99):8.1f} ms  max={max(ms):8.1f} ms")
+
+# =============== STUB: BOT API ===============
+def _params(ctype: str, raw: bytes) -> dict:
+    """PTB posílá parametry jako form-urlencoded; JSON bereme taky."""
+    if not raw:
+        return {}
+    if "json" in ctype:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {}
+    return dict(parse_qsl(raw.decode("utf-8", "replace")))
+
+class BotApiStub:
+    """Odpovídá na volání Bot API; u sendMessage/editMessageText si zapíše čas pro chat."""
+
+    def __init__(self, port: int = 0):
+        self.replies: Dict[int, float] = {}          # chat_id → čas první odpovědi
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        stub = self
+
+        class H(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                n = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(n) if n else b""
+                method = self.path.rsplit("/", 1)[-1]
+                data = _params(self.headers.get("Content-Type") or "", raw)
+                body = json.dumps({"ok": True, "result": stub.result(method, data)}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST
+
+            def log_message(self, *a):
+                pass
+
+        self.server = ThreadingHTTPServer((STUB_HOST, port), H)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+
+    def result(self, method: str, data: dict):
+        now = time.perf_counter()
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        if method == "getMe":
+            return {"id": 123456, "is_bot": True, "first_name": "Kiki", "username": "kiki_loadtest_bot",
+                    "can_join_groups": True, "can_read_all_group_messages": False,
+                    "supports_inline_queries": False}
+        if method in ("sendMessage", "editMessageText"):
+            chat = int(data.get("chat_id") or 0)
+            with self._lock:
+                self.replies.setdefault(chat, now)
+            return {"message_id": random.randint(1, 1 << 30), "date": int(time.time()),
+                    "chat": {"id": chat, "type": "private"}, "text": data.get("text", "")[:32]}
+        return True
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+# =============== STUB: SCRAPOVANÉ WEBY ===============
+def _catalog_html(n: int = 40) -> bytes:
+    ko = datetime.now() + timedelta(hours=2)
+    rows = "".join(
+        f"<div class='ev'><div><span>{(ko.hour + i % 20) % 24:02d}:{ko.minute:02d}</span> "
+        f"Home{i} – Away{i}</div></div>" for i in range(n))
+    matches = "".join(
+        f"<div class='match'><span class='team home'>Home{i}</span><span class='team away'>Away{i}</span>"
+        f"<span class='competition'>Liga</span><span class='time'>{(ko.hour + i % 20) % 24:02d}:00</span></div>"
+        for i in range(n))
+    table = "".join(f"<tr><td>{(ko.hour + i % 20) % 24:02d}:30 Home{i} - Away{i}</td></tr>" for i in range(n))
+    return (f"<html><body><h2>Premier League</h2>{rows}"
+            f"<div id='content'><div class='matches'><h2>Dnes</h2>{matches}</div></div>"
+            f"<table>{table}</table></body></html>").encode()
+
+class SiteStub:
+    """Jeden server pro Tipsport / Eurofotbal / FootyStats; každá odpověď čeká `latency` s."""
+
+    def __init__(self, latency: float = 0.3, port: int = 0):
+        self.hits = 0
+        page = _catalog_html()
+        stub = self
+
+        class H(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.hits += 1
+                time.sleep(latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(page)))
+                self.end_headers()
+                self.wfile.write(page)
+
+            def log_message(self, *a):
+                pass
+
+        self.server = ThreadingHTTPServer((STUB_HOST, port), H)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.base = f"http://{STUB_HOST}:{self.port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+# =============== GENERÁTOR ===============
+def _update(uid: int, cmd: str) -> dict:
+    text = "/" + cmd
+    return {
+        "update_id": uid,
+        "message": {
+            "message_id": uid, "date": int(time.time()),
+            "chat": {"id": uid, "type": "private", "first_name": "Load"},
+            "from": {"id": uid, "is_bot": False, "first_name": "Load"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}],
+        },
+    }
+
+def _parse_mix(mix: str) -> List[Tuple[str, float]]:
+    out = []
+    for part in mix.split(","):
+        if "=" in part:
+            k, w = part.split("=", 1)
+            out.append((k.strip().lstrip("/"), float(w)))
+    return out
+
+async def _drive(url: str, rate: float, duration: float, mix: List[Tuple[str, float]],
+                 sent: Dict[int, Tuple[str, float]], post_lat: List[float], errors: List[str]):
+    import httpx
+    cmds, weights = zip(*mix)
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        async def one(uid: int, cmd: str):
+            t0 = time.perf_counter()
+            sent[uid] = (cmd, t0)
+            try:
+                r = await client.post(url, json=_update(uid, cmd),
+                                      headers={"X-Telegram-Bot-Api-Secret-Token": SECRET})
+                post_lat.append(time.perf_counter() - t0)
+                if r.status_code != 200:
+                    errors.append(f"HTTP {r.status_code}")
+            except Exception as e:
+                errors.append(type(e).__name__)
+
+        tasks = []
+        start = time.perf_counter()
+        uid = 1000
+        while time.perf_counter() - start < duration:
+            uid += 1
+            tasks.append(asyncio.create_task(one(uid, random.choices(cmds, weights)[0])))
+            # Poissonův příchod (exponenciální mezery) – realističtější než pevný takt
+            await asyncio.sleep(random.expovariate(rate))
+        await asyncio.gather(*tasks)
+
+def _drive_thread(*args):
+    asyncio.run(_drive(*args))
+
+async def _loop_lag(samples: List[float], stop: asyncio.Event, interval: float = 0.05):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - t0 - interval))
+
+# =============== BĚH ===============
+async def run(args) -> int:
+    bot_api = BotApiStub().start()
+    site = SiteStub(args.site_latency).start()
+
+    # weby → stub (před importem main, URL se čtou při importu)
+    os.environ["TIPSPORT_URL_FOOT"] = f"{site.base}/kurzy/fotbal-16"
+    import main, sources, urls, web
+    sources.EUROFOTBAL_URL = f"{site.base}/zapasy/"
+    sources.FOOTYSTATS_URL = f"{site.base}/tomorrow/"
+    for k in list(urls.URL_MAP):
+        urls.URL_MAP[k] = f"{site.base}/kurzy/{k}"
+
+    app = main.build_app(token=TOKEN, base_url=f"http://{STUB_HOST}:{bot_api.port}/bot")
+    # lifespan WebApp spustí PTB a nastaví webhook (drop_pending_updates) jako v produkci
+    srv = web.server(web.WebApp(app, main.STORE, "/hook", webhook_url=f"http://{STUB_HOST}:{args.port}/hook",
+                                secret_token=SECRET), host=STUB_HOST, port=args.port)
+    srv_task = asyncio.create_task(srv.serve())
+    while not srv.started:
+        if srv_task.done():
+            srv_task.result()
+            raise RuntimeError("web server nenastartoval")
+        await asyncio.sleep(0.05)
+
+    lag: List[float] = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_loop_lag(lag, stop))
+
+    sent: Dict[int, Tuple[str, float]] = {}
+    post_lat: List[float] = []
+    errors: List[str] = []
+    mix = _parse_mix(args.mix)
+    print(f"▶ {args.rate}/s po {args.duration}s, mix {args.mix}, latence webů {args.site_latency}s")
+    t0 = time.perf_counter()
+    driver = threading.Thread(target=_drive_thread, daemon=True,
+                              args=(f"http://{STUB_HOST}:{args.port}/hook", args.rate, args.duration,
+                                    mix, sent, post_lat, errors))
+    driver.start()
+    while driver.is_alive():
+        await asyncio.sleep(0.2)
+
+    # dobíhající odpovědi
+    deadline = time.perf_counter() + args.drain
+    while time.perf_counter() < deadline and len(bot_api.replies) < len(sent):
+        await asyncio.sleep(0.2)
+    wall = time.perf_counter() - t0
+
+    stop.set()
+    await lag_task
+    srv.should_exit = True                  # lifespan shutdown zastaví i PTB
+    await srv_task
+
+    by_cmd: Dict[str, List[float]] = {}
+    for uid, (cmd, ts) in sent.items():
+        done = bot_api.replies.get(uid)
+        if done is not None:
+            by_cmd.setdefault(cmd, []).append(done - ts)
+    handled = sum(len(v) for v in by_cmd.values())
+
+    print(f"\nodesláno {len(sent)}, zodpovězeno {handled}, bez odpovědi {len(sent) - handled}, "
+          f"chyby POST {len(errors)}")
+    print(f"propustnost {handled / wall:.1f} odpovědí/s (okno {wall:.1f} s), "
+          f"dotazů na weby {site.hits}")
+    print(_fmt("webhook POST", post_lat))
+    print(_fmt("handler (vše)", [x for v in by_cmd.values() for x in v]))
+    for cmd in sorted(by_cmd):
+        print(_fmt(f"  /{cmd}", by_cmd[cmd]))
+    print(_fmt("event-loop lag", lag))
+    return 0
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Zátěžový test webhooku Flamengo bota.")
+    ap.add_argument("--rate", type=float, default=10.0, help="updatů za sekundu")
+    ap.add_argument("--duration", type=float, default=20.0, help="délka zátěže (s)")
+    ap.add_argument("--mix", default="tip=5,tip2=2,tip3=2,tip24=1,debug=0.2")
+    ap.add_argument("--site-latency", type=float, default=0.3, help="latence stubu webů (s)")
+    ap.add_argument("--port", type=int, default=18080, help="port webhooku bota")
+    ap.add_argument("--drain", type=float, default=30.0, help="jak dlouho čekat na zbylé odpovědi (s)")
+    return asyncio.run(run(ap.parse_args(argv)))
+
+if __name__ == "__main__":
+    raise SystemExit(main_cli())
@@ -3,21 +3,41 @@
 # Autor: Kiki pro Honzu ❤️
 
 import os
+import time
+import asyncio
+import contextvars
+import functools
 import logging
+from itertools import islice
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Tuple, Set
+from typing import Optional, Dict, List, Tuple, Set
 
 from telegram import Update
 from telegram.ext import (
     Application,
+    CallbackQueryHandler,
     CommandHandler,
     MessageHandler,
     ContextTypes,
     filters,
 )
 
-from picks import find_first_half_goal_candidates   # rychlý modul
+from picks import find_first_half_goal_candidates, iter_first_half_goal_candidates  # rychlý modul
+from crawl import CRAWL_MODE
 from sources import analyze_sources                 # širší sken (/tip24)
+from multisport import scan_all_sports, sport_emoji # všechny sporty (/multi)
+from tip_store import TipStore                      # indexy kandidátů (okno/důvěra)
+import pager                                        # listování výsledků (inline tlačítka)
+from team_registry import match_key                 # kanonická ID týmů (anti-dup)
+import live                                         # živé sledování 1. poločasu
+import ledger                                       # záznam odeslaných tipů + /stats
+import page_cache                                   # cache naparsovaných stránek (/debug)
+import web                                          # ASGI server: webhook + read API
+import deadline                                     # časový rozpočet příkazů
+import shm_catalog                                  # sdílený katalog pro víc procesů
+import prefs                                        # předvolby chatů + rozesílání
+import breaker                                      # circuit breakery zdrojů (/debug)
+import workqueue                                    # sdílená crawl fronta (/debug)
 
 # ----------------------
 # LOGGING
@@ -40,9 +60,12 @@ SECRET_TOKEN = os.getenv("TELEGRAM_SECRET", "").strip()
 PORT = int(os.getenv("PORT", "10000"))
 
 TZ = timezone(timedelta(hours=1))
+STORE_TTL_S = int(os.getenv("STORE_TTL_S", "120"))   # jak dlouho platí načtení kandidátů
+STORE_RETRY_S = int(os.getenv("STORE_RETRY_S", "30")) # po neúplném skenu (rozpočet) další pokus
+RENDER_BUCKET_S = 60                                  # okno /tip se počítá po minutách
 
 # ======================
-#   RUNTIME ANTI-DUP (na den)
+#   RUNTIME ANTI-DUP (na den, pro každý chat zvlášť)
 # ======================
 _SENT: dict = {"date": None, "keys": set()}  # type: ignore[assignment]
 
@@ -52,14 +75,19 @@ def _maybe_reset_daily():
         _SENT["date"] = today
         _SENT["keys"] = set()  # type: ignore[assignment]
 
-def _seen(key: str) -> bool:
+def _seen(key: tuple) -> bool:
     _maybe_reset_daily()
-    s: Set[str] = _SENT["keys"]  # type: ignore[assignment]
+    s: Set[tuple] = _SENT["keys"]  # type: ignore[assignment]
     if key in s:
         return True
     s.add(key)
     return False
 
+def _was_sent(key: tuple) -> bool:
+    """Jako _seen, ale bez označení (plánování rozesílání před odesláním)."""
+    _maybe_reset_daily()
+    return key in _SENT["keys"]  # type: ignore[operator]
+
 # ======================
 #   HELPERS
 # ======================
@@ -68,41 +96,136 @@ def _fmt_ko(dt: Optional[datetime]) -> str:
     """Výkop v CZ čase."""
     return dt.astimezone(TZ).strftime("%d.%m. %H:%M") if dt else "neznámé"
 
-def _filter_by_window_and_conf(
-    tips: List,
-    start_dt: datetime,
-    end_dt: datetime,
-    min_conf: int = 90,
-) -> List:
-    out = []
-    for t in tips:
-        ko = getattr(t, "kickoff", None)
-        conf = int(getattr(t, "confidence", 0) or 0)
-        if conf < min_conf:
-            continue
-        if ko is None:
-            continue
-        ko_cz = ko.astimezone(TZ)
-        if start_dt <= ko_cz < end_dt:
-            out.append(t)
-    # seřaď po filtru (vyšší důvěra, dřívější KO)
-    out.sort(key=lambda x: (-int(getattr(x, "confidence", 0) or 0),
-                            getattr(x, "kickoff").timestamp() if getattr(x, "kickoff", None) else 1e15))
-    return out
-
-def _render_lines(tips: List) -> str:
-    lines = []
-    for i, t in enumerate(tips, 1):
-        ko = f"🕒 <b>{_fmt_ko(getattr(t, 'kickoff', None))}</b>"
-        kurz = f" @ {t.odds:.2f}" if getattr(t, "odds", None) else ""
-        link = f"\n🔗 {getattr(t, 'url')}" if getattr(t, 'url', None) else ""
-        lines.append(
-            f"#{i} ⚽ <b>{t.match}</b> ({t.league}) — {ko}\n"
-            f"   <b>{t.market}{kurz}</b>\n"
-            f"   Důvěra: <b>{t.confidence}%</b> | Okno: <b>{t.window}</b>\n"
-            f"   {t.reason}{link}"
-        )
-    return "\n\n".join(lines)
+# ======================
+#   TIP STORE (kandidáti + indexy)
+# ======================
+# CATALOG_MODE=reader|writer: dotazy jdou přímo do mmap katalogu (shm_catalog.CatalogStore);
+# skenuje jen refresher (reader) nebo task shm_catalog.run v tomto procesu (writer), ne _refresh_store
+CATALOG = shm_catalog.reader() if shm_catalog.MODE in ("reader", "writer") else None
+STORE = shm_catalog.CatalogStore(CATALOG, "picks") if CATALOG is not None else TipStore()
+
+def _complete() -> bool:
+    """Doběhl sken celý? (pod rozpočtem nesměl být žádný požadavek uťatý)"""
+    b = deadline.current()
+    return b is None or b.cut == 0
+
+async def _off_loop(fn, *args, **kw):
+    """
+    Blokující sken mimo event loop (vlákno), v kopii kontextu → vidí rozpočet příkazu
+    (deadline) a zápisy do něj (cut, skipped) jdou do téhož Budget objektu.
+    """
+    ctx = contextvars.copy_context()
+    return await asyncio.to_thread(ctx.run, functools.partial(fn, *args, **kw))
+
+def _store_due(force: bool = False) -> bool:
+    ttl = STORE_TTL_S if STORE.complete else min(STORE_TTL_S, STORE_RETRY_S)
+    return force or time.time() - STORE.updated_at > ttl
+
+def _refresh_store(force: bool = False):
+    """
+    Načte kandidáty z picks jen když jsou data starší než STORE_TTL_S; mění jen rozdíl.
+    Neúplný sken (vypršel rozpočet) jen přidává a znovu se zkusí po STORE_RETRY_S
+    (ne při každém příkazu); tipy, které dlouho žádný sken neviděl, odebere i tak.
+    S katalogem jen přemapuje novou generaci – skenuje refresher, ne tento proces.
+    """
+    if CATALOG is not None:
+        if CATALOG.refresh():
+            log.info("katalog v%d (%d tipů)", CATALOG.generation, len(STORE))
+        return STORE
+    if _store_due(force):
+        if CRAWL_MODE:
+            # celý katalog; tipy jsou v indexech hned, jak přijde jejich stránka
+            added, removed = STORE.sync_stream(iter_first_half_goal_candidates(hours_window=36), prune=_complete)
+        else:
+            # vezmeme širší sadu, picks.py už umí hours_window (pojistka 36 h)
+            base = find_first_half_goal_candidates(limit=48, hours_window=36) or []
+            added, removed = STORE.sync(base, prune=_complete())
+        log.info("store refresh: +%d −%d (celkem %d, v%d)", added, removed, len(STORE), STORE.version)
+    return STORE
+
+_REFRESH: Optional[asyncio.Task] = None
+STORE_POLL_S = 0.1                                    # jak často příkaz kouká, jestli už sken něco přinesl
+
+def _refresh_done(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        log.warning("store refresh: %s", task.exception())
+
+def _store_refresh() -> Optional[asyncio.Task]:
+    """
+    Single-flight refresh store na pozadí: běží nejvýš jeden a souběžné příkazy i push smyčka
+    ho sdílí. Startuje v prázdném kontextu – rozpočet příkazu, který ho spustil, na sken
+    nepřechází (doběhne celý, i když příkaz mezitím odpoví). None = store je čerstvý.
+    """
+    global _REFRESH
+    if _REFRESH is not None and not _REFRESH.done():
+        return _REFRESH
+    if CATALOG is not None or not _store_due():
+        _refresh_store()                              # katalog: jen přemapování, žádný sken
+        return None
+    _REFRESH = asyncio.get_running_loop().create_task(asyncio.to_thread(_refresh_store),
+                                                      context=contextvars.Context())
+    _REFRESH.add_done_callback(_refresh_done)
+    return _REFRESH
+
+def _render_tip(t) -> str:
+    """HTML jednoho tipu bez pořadového čísla (to se doplní až při skládání zprávy)."""
+    ko = f"🕒 <b>{_fmt_ko(getattr(t, 'kickoff', None))}</b>"
+    kurz = f" @ {t.odds:.2f}" if getattr(t, "odds", None) else ""
+    link = f"\n🔗 {getattr(t, 'url')}" if getattr(t, 'url', None) else ""
+    return (
+        f"{sport_emoji(getattr(t, 'sport', 'fotbal'))} <b>{t.match}</b> ({t.league}) — {ko}\n"
+        f"   <b>{t.market}{kurz}</b>\n"
+        f"   Důvěra: <b>{t.confidence}%</b> | Okno: <b>{t.window}</b>\n"
+        f"   {t.reason}{link}"
+    )
+
+def _join_rendered(bodies: List[str], start: int = 1) -> str:
+    return "\n\n".join(f"#{i} {b}" for i, b in enumerate(bodies, start))
+
+def _render_lines(tips: List, start: int = 1) -> str:
+    return _join_rendered([_render_tip(t) for t in tips], start)
+
+DupKey = Tuple[int, int, int]                         # (ID domácích, ID hostů, výkop v minutách)
+
+def _dup_key(t) -> DupKey:
+    ko = getattr(t, "kickoff", None)
+    h, a = match_key(getattr(t, "match", ""))
+    return (h, a, int(ko.timestamp() // 60) if ko else 0)
+
+# ======================
+#   RENDER CACHE (okno × minuta × verze dat)
+# ======================
+# hodnota = [(anti-dup klíč, vyrenderovaný tip, tip)] v pořadí důvěra ↓, výkop ↑
+_RENDERED: Dict[Tuple[str, int, int, int], List[Tuple[DupKey, str, object]]] = {}
+
+def _window_rendered(window_label: str, hours_from: int, hours_to: int,
+                     min_conf: int = 90) -> List[Tuple[DupKey, str, object]]:
+    """
+    Seřazený a vyrenderovaný seznam pro okno. Burst stejných příkazů v jedné minutě
+    nad stejnou verzí store = jeden dotaz do indexu a jeden render.
+    """
+    bucket = int(time.time() // RENDER_BUCKET_S)
+    key = (window_label, bucket, STORE.version, min_conf)
+    hit = _RENDERED.get(key)
+    if hit is not None:
+        return hit
+
+    now = datetime.fromtimestamp(bucket * RENDER_BUCKET_S, TZ)
+    tips = STORE.query(now + timedelta(hours=hours_from), now + timedelta(hours=hours_to), min_conf=min_conf)
+    rendered = [(_dup_key(t), _render_tip(t), t) for t in tips]
+
+    # starší minuty / verze už nikdo nepotřebuje
+    for k in [k for k in _RENDERED if k[1] != bucket or k[2] != STORE.version]:
+        _RENDERED.pop(k, None)
+    _RENDERED[key] = rendered
+    return rendered
+
+def _record(tips: List, chat: int):
+    """Odeslané tipy do ledgeru; chyba zápisu nesmí shodit odpověď."""
+    try:
+        ledger.ledger().record(tips, chat)
+    except Exception as e:
+        log.warning("ledger: %s", e)
 
 async def _run_tip_window(
     update: Update,
@@ -111,36 +234,48 @@ async def _run_tip_window(
     hours_to: int,
     limit: int = 5,
 ):
-    """Společná obsluha pro /tip, /tip2, /tip3."""
-    now = datetime.now(TZ)
-    start_dt = now + timedelta(hours=hours_from)
-    end_dt = now + timedelta(hours=hours_to)
-
-    try:
-        # vezmeme širší sadu, picks.py už umí hours_window (pojistka 36 h)
-        base = find_first_half_goal_candidates(limit=48, hours_window=36) or []
-    except Exception as e:
-        log.exception("picks failed: %s", e)
+    """
+    Společná obsluha pro /tip, /tip2, /tip3. Refresh store běží na pozadí (_store_refresh);
+    odpověď jde z toho, co store už má, jakmile v okně je co poslat, sken doběhl nebo
+    vypršel rozpočet příkazu – celý crawl se nečeká.
+    """
+    chat = update.effective_chat.id if update.effective_chat else 0
+    p = prefs.store().get(chat)
+    with deadline.budget() as b:
+        task = _store_refresh()
+        while True:
+            # seřazeno důvěra ↓, výkop ↑; sdílené napříč chaty se stejnou min. důvěrou (render cache)
+            rendered = _window_rendered(window_label, hours_from, hours_to, min_conf=p.min_conf)
+            # ligy/trhy z předvoleb + anti-dup (ID týmů + výkop) – per chat nad cachovaným seznamem
+            picked = list(islice(((key, body, tip) for key, body, tip in rendered
+                                  if p.accepts(tip) and not _was_sent((chat, *key))), limit))
+            if picked or task is None or task.done() or b.expired:
+                break
+            await asyncio.wait({task}, timeout=min(STORE_POLL_S, b.remaining()))
+    failed = task is not None and task.done() and not task.cancelled() and task.exception() is not None
+    if failed and not picked:
         await update.message.reply_text("⚠️ Přerušení při čtení zdrojů.")
         return
+    if task is not None and not task.done() and not picked:
+        b.skip("Tipsport (sken ještě běží)")
+    note = deadline.skipped_note(b)
 
-    tips = _filter_by_window_and_conf(base, start_dt, end_dt, min_conf=90)
-
-    # anti-dup (match+kickoff v CZ)
-    fresh = []
-    for t in tips:
-        ko = getattr(t, "kickoff", None)
-        key = f"{getattr(t,'match','')}|{ko.astimezone(TZ).strftime('%Y-%m-%d %H:%M') if ko else ''}"
-        if not _seen(key):
-            fresh.append(t)
-        if len(fresh) >= limit:
-            break
+    # mezi posledním dotazem a tímhle není await → nic z picked mezitím neodešlo
+    fresh = [body for _, body, _ in picked]
+    sent = [tip for _, _, tip in picked]
+    for key, _, _ in picked:
+        _seen((chat, *key))
 
     if not fresh:
-        await update.message.reply_html(f"⚠️ V okně „<b>{window_label}</b>“ jsem nic vhodného nenašla.")
+        await update.message.reply_html(f"⚠️ V okně „<b>{window_label}</b>“ jsem nic vhodného nenašla."
+                                        + (f"\n{note}" if note else ""))
         return
 
-    await update.message.reply_html(f"🔥 <b>Flamengo – Gól do poločasu</b> ({window_label})\n\n" + _render_lines(fresh))
+    await update.message.reply_html(f"🔥 <b>Flamengo – Gól do poločasu</b> ({window_label})\n\n"
+                                    + _join_rendered(fresh) + (f"\n\n{note}" if note else ""))
+    for tip in sent:
+        live.TRACKER.track(tip, chat)     # během 1. poločasu přijdou živá upozornění
+    _record(sent, chat)
 
 # ======================
 #   COMMAND HANDLERY
@@ -154,6 +289,9 @@ async def start_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "/tip2 = 8–12 h\n"
         "/tip3 = 12–24 h\n"
         "/tip24 = širší sken (více zdrojů)\n"
+        "/multi = všechny sporty (24 h)\n"
+        "/prefs = předvolby (ligy, trhy, důvěra, okna, rozesílání)\n"
+        "/stats = úspěšnost odeslaných tipů (market|league|band)\n"
         "/debug = diagnostika zdrojů\n\n"
         "🔥 Bot je připravený na Flamengo strategii."
     )
@@ -173,31 +311,112 @@ async def tip2_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def tip3_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await _run_tip_window(update, "12–24 h", 12, 24, limit=5)
 
-async def tip24_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Širší sken z více zdrojů (TOP 5)."""
+# /prefs → ukázat / změnit předvolby chatu
+async def prefs_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    chat = update.effective_chat.id if update.effective_chat else 0
+    store = prefs.store()
     try:
-        tips = analyze_sources(limit=5) or []
-    except Exception as e:
-        log.exception("sources analyze failed: %s", e)
-        tips = []
+        p = prefs.apply_command(store.get(chat), list(context.args or []))
+    except ValueError as e:
+        await update.message.reply_text(f"⚠️ {e}\n\n{prefs.USAGE}")
+        return
+    if context.args:
+        store.set(chat, p)
+    await update.message.reply_text(prefs.describe(p))
+
+TIP24_SCAN_LIMIT = 60   # kolik výsledků skenu držet pro listování
 
+def _page_message(token: str, scan: "pager.Scan", view: "pager.View"):
+    tips, total = pager.page(scan, view)
     if not tips:
-        tips = find_first_half_goal_candidates(limit=8, hours_window=36) or []
+        body = "⚠️ S tímto filtrem nic není."
+    else:
+        body = _render_lines(tips, start=view.offset + 1)
+    shown = f"{view.offset + 1}–{view.offset + len(tips)} z {total}" if tips else "0"
+    text = f"{scan.title} ({shown})\n\n{body}"
+    return text, pager.keyboard(token, scan, view, total)
+
+async def tip24_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Širší sken z více zdrojů (TOP 5 + listování tlačítky). Celé pod rozpočtem
+    COMMAND_BUDGET_S: co se nestihne (zdroj i fallback), je vyjmenované pod výsledky.
+    """
+    with deadline.budget() as b:
+        snap = CATALOG.snapshot() if CATALOG is not None else None
+        if snap is not None:
+            # pořadí jako z analyze_sources (refresher ho zachoval); worker sám neskenuje
+            tips = snap.all("sources", TIP24_SCAN_LIMIT) or snap.all("picks", TIP24_SCAN_LIMIT)
+        else:
+            tips = await _off_loop(deadline.attempt, "rozšířené zdroje", analyze_sources,
+                                   limit=TIP24_SCAN_LIMIT) or []
+            if not tips:
+                tips = await _off_loop(deadline.attempt, "Tipsport", find_first_half_goal_candidates,
+                                       limit=TIP24_SCAN_LIMIT, hours_window=36) or []
+    note = deadline.skipped_note(b)
+
+    if not tips:
+        await update.message.reply_text("⚠️ Teď nic kvalitního nenašlo ani rozšířené skenování."
+                                        + (f"\n{note}" if note else ""))
+        return
+
+    title = "🔍 <b>Flamengo /tip24 – rozšířený sken</b>"
+    token = pager.put(tips, title + (f"\n{note}" if note else ""))
+    scan = pager.get(token)
+    text, kb = _page_message(token, scan, pager.View())
+    await update.message.reply_html(text, reply_markup=kb)
+    _record(pager.page(scan, pager.View())[0], update.effective_chat.id if update.effective_chat else 0)
+
+async def page_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Tlačítka pod /tip24: další stránka / filtr ligy / jen ≥95 % – jen řez z paměti."""
+    q = update.callback_query
+    parsed = pager.decode(q.data or "")
+    scan = pager.get(parsed[0]) if parsed else None
+    if scan is None:
+        await q.answer("⏳ Výsledky vypršely, spusť /tip24 znovu.", show_alert=False)
+        await q.edit_message_reply_markup(reply_markup=None)
+        return
+    await q.answer()
+    text, kb = _page_message(parsed[0], scan, parsed[1])
+    await q.edit_message_text(text, parse_mode="HTML", reply_markup=kb)
+    _record(pager.page(scan, parsed[1])[0], update.effective_chat.id if update.effective_chat else 0)
+
+async def stats_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/stats [market|league|band] – úspěšnost a ROI odeslaných tipů z rollupů ledgeru."""
+    dim = (context.args[0].lower() if context.args else "market")
+    if dim not in ledger.DIMS or dim == "total":
+        dim = "market"
+    try:
+        text = ledger.format_stats(dim)
+    except Exception as e:
+        log.exception("stats failed: %s", e)
+        text = "⚠️ Statistiky teď nejdou načíst."
+    await update.message.reply_text(text)
+
+async def multi_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Sken všech sportů z urls.URL_MAP naráz (TOP 10), pod rozpočtem COMMAND_BUDGET_S."""
+    with deadline.budget() as b:
+        try:
+            tips = await _off_loop(scan_all_sports, limit=10, hours_window=24) or []
+        except Exception as e:
+            log.exception("multisport failed: %s", e)
+            tips = []
+    note = deadline.skipped_note(b)
 
     if not tips:
-        await update.message.reply_text("⚠️ Teď nic kvalitního nenašlo ani rozšířené skenování.")
+        await update.message.reply_text("⚠️ Ve všech sportech teď nic nenašlo." + (f"\n{note}" if note else ""))
         return
 
-    await update.message.reply_html("🔍 <b>Flamengo /tip24 – rozšířený sken (TOP 5)</b>\n\n" + _render_lines(tips[:5]))
+    await update.message.reply_html("🌍 <b>Flamengo /multi – všechny sporty (TOP 10)</b>\n\n" + _render_lines(tips)
+                                    + (f"\n\n{note}" if note else ""))
 
 async def debug_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
-        src = analyze_sources(limit=8) or []
+        src = await _off_loop(analyze_sources, limit=8) or []
     except Exception as e:
         log.exception("sources failed in debug: %s", e)
         src = []
     try:
-        fast = find_first_half_goal_candidates(limit=12, hours_window=36) or []
+        fast = await _off_loop(find_first_half_goal_candidates, limit=12, hours_window=36) or []
     except Exception as e:
         log.exception("picks failed in debug: %s", e)
         fast = []
@@ -207,6 +426,9 @@ async def debug_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "🛠 DEBUG\n"
         f"- sources.py (rozšířené zdroje): {len(src)} tipů\n"
         f"- picks.py (rychlý sken): {len(fast)} tipů\n"
+        f"- {page_cache.format_stats()}\n"
+        f"- {breaker.format_states()}\n"
+        + (f"- {workqueue.format_stats()}\n" if workqueue.ENABLED else "") +
         f"- Now: {now}\n"
         "Pozn.: Anti-dup blokuje opakování v rámci dne."
     )
@@ -229,14 +451,80 @@ async def on_error(update: object, context: ContextTypes.DEFAULT_TYPE):
 #   APLIKACE
 # ======================
 
-def build_app() -> Application:
-    app = Application.builder().token(TOKEN).build()
+async def _push_loop(bot, interval: float = prefs.PUSH_INTERVAL_S):
+    """
+    Rozesílání podle předvoleb: jeden refresh → index profilů → seznam pro každý chat
+    s /prefs on. Chaty jdou v pořadí nejbližšího výkopu, uvnitř zprávy výkop ↑.
+    """
+    while True:
+        try:
+            ix = prefs.store().index()
+            if len(ix):
+                task = _store_refresh()
+                if task is not None:
+                    await asyncio.wait({task})   # sdílí běžící sken s příkazy, chybu zaloguje callback
+                now = datetime.now(TZ)
+                tips = STORE.query(now, now + timedelta(hours=prefs.MAX_HOURS + 1), min_conf=ix.floor)
+                plan = prefs.deliveries(prefs.store(), tips, lambda c, t: _was_sent((c, *_dup_key(t))),
+                                        now.timestamp())
+                for chat, sent in plan:
+                    try:
+                        await bot.send_message(chat_id=chat, parse_mode="HTML",
+                                               text="🔔 <b>Tipy podle předvoleb</b>\n\n" + _render_lines(sent))
+                    except Exception as e:
+                        log.warning("push %s: %s", chat, e)
+                        continue            # neoznačeno ani nezapočítáno → zkusí se příště
+                    prefs.delivered(prefs.store(), chat, sent)
+                    for tip in sent:
+                        _seen((chat, *_dup_key(tip)))
+                        live.TRACKER.track(tip, chat)
+                    _record(sent, chat)
+        except Exception as e:
+            log.warning("push: %s", e)
+        await asyncio.sleep(interval)
+
+def _is_owner() -> bool:
+    """Víc workerů nad katalogem: smyčky s odesíláním a set_webhook jen v jednom z nich."""
+    return CATALOG is None or shm_catalog.claim_owner()
+
+async def _post_init(app: Application):
+    if shm_catalog.MODE == "writer":
+        app.bot_data["catalog_task"] = asyncio.create_task(shm_catalog.run())
+        log.info("Katalog publikuje do %s (každých %ss)", shm_catalog.PATH, shm_catalog.REFRESH_S)
+    if not _is_owner():
+        log.info("Worker bez vlastnictví: jen webhook a read API (rozesílání běží jinde)")
+        return
+    if live.feed_from_env() is not None:
+        app.bot_data["live_task"] = asyncio.create_task(live.run(app.bot))
+        log.info("Live tracker běží (poll %ss)", live.POLL_S)
+    if prefs.PUSH_INTERVAL_S > 0:
+        app.bot_data["push_task"] = asyncio.create_task(_push_loop(app.bot))
+    if ledger.RESULTS_PATH:
+        app.bot_data["settle_task"] = asyncio.create_task(ledger.run())
+        log.info("Ledger vyhodnocuje z %s (každých %ss)", ledger.RESULTS_PATH, ledger.SETTLE_S)
+
+async def _post_stop(app: Application):
+    for name in ("live_task", "catalog_task", "push_task", "settle_task"):
+        task = app.bot_data.pop(name, None)
+        if task is not None:
+            task.cancel()
+
+def build_app(token: Optional[str] = None, base_url: Optional[str] = None) -> Application:
+    """base_url = jiný Bot API server (lokální stub pro loadtest.py)."""
+    builder = Application.builder().token(token or TOKEN).post_init(_post_init).post_stop(_post_stop)
+    if base_url:
+        builder = builder.base_url(base_url)
+    app = builder.build()
     app.add_handler(CommandHandler("start", start_cmd))
     app.add_handler(CommandHandler("status", status_cmd))
     app.add_handler(CommandHandler("tip", tip_cmd))
     app.add_handler(CommandHandler("tip2", tip2_cmd))
     app.add_handler(CommandHandler("tip3", tip3_cmd))
     app.add_handler(CommandHandler("tip24", tip24_cmd))
+    app.add_handler(CallbackQueryHandler(page_cb, pattern=rf"^{pager.PREFIX}\|"))
+    app.add_handler(CommandHandler("multi", multi_cmd))
+    app.add_handler(CommandHandler("prefs", prefs_cmd))
+    app.add_handler(CommandHandler("stats", stats_cmd))
     app.add_handler(CommandHandler("debug", debug_cmd))
     app.add_handler(MessageHandler(filters.ALL, echo_all))
     app.add_error_handler(on_error)
@@ -246,18 +534,24 @@ def build_app() -> Application:
 #   MAIN
 # ======================
 
-def main():
-    app = build_app()
-    log.info("Starting webhook on %s", PUBLIC_URL + SECRET_PATH)
-    app.run_webhook(
-        listen="0.0.0.0",
-        port=PORT,
-        url_path=SECRET_PATH.lstrip("/"),
-        webhook_url=f"{PUBLIC_URL}{SECRET_PATH}",
+def asgi() -> web.WebApp:
+    """
+    ASGI factory – jeden proces (main) i víc workerů:
+      CATALOG_MODE=reader uvicorn main:asgi --factory --workers 4 --port $PORT
+    Webhook u Telegramu nastaví jen vlastník (shm_catalog.claim_owner), ostatní ho jen přijímají.
+    """
+    owner = _is_owner()
+    return web.WebApp(
+        build_app(), STORE, SECRET_PATH,
+        webhook_url=f"{PUBLIC_URL}{SECRET_PATH}" if owner else "",
         secret_token=SECRET_TOKEN if SECRET_TOKEN else None,
         allowed_updates=["message", "edited_message", "callback_query"],
-        drop_pending_updates=True,
     )
 
+def main():
+    log.info("Starting webhook on %s", PUBLIC_URL + SECRET_PATH)
+    # jediný ASGI server místo run_webhook + Flask keep_alive: webhook, health, metriky, read API (web.py)
+    web.serve(asgi(), port=PORT)
+
 if __name__ == "__main__":
     main()
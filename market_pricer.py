@@ -0,0 +1,230 @@
+# market_pricer.py — ocenění všech MarketDef z jedné sdružené distribuce skóre na zápas
+# Sdružená distribuce P(h1, a1, h2, a2) = góly domácích/hostů v 1. a 2. poločase (nezávislé
+# Poissony z goal_model λ). Každý trh = váhová maska nad touto mřížkou; všechny masky jsou
+# složené do jedné matice, takže ocenění všech trhů pro všechny zápasy = jedno maticové
+# násobení. Nový trh = nový řádek masky, ne další průchod daty.
+#
+# Benchmark:  python market_pricer.py [počet_zápasů]
+
+from __future__ import annotations
+import re, sys, time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from flamengo_strategy import MatchFacts
+from goal_model import DEFAULT_PARAMS as GOAL_PARAMS, lambdas_from_facts, poisson_pmf
+from markets import MARKETS_BY_SPORT
+
+# ------- Parametry -------
+HALF_GOALS = 6             # 0..6 gólů na tým a poločas → mřížka 7^4 = 2 401 buněk
+CORNERS_LINE = 9.5
+CARDS_LINE = 4.5
+CORNERS_1H_LINE = 4.5
+CARDS_1H_LINE = 1.5
+
+# kódy strategie, které se liší od registru markets.py
+ALIASES: Dict[str, str] = {"HT_GOAL_YES": "1H_GOAL_YES"}
+
+Grid = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]   # h1, a1, h2, a2 (broadcast)
+Rule = Callable[[Grid], Tuple[np.ndarray, Optional[np.ndarray]]]  # → (výhra, prohra|None)
+
+# =============== PRAVIDLA TRHŮ ===============
+def _res(h: np.ndarray, a: np.ndarray, sign: str) -> np.ndarray:
+    return {"1": h > a, "X": h == a, "2": h < a}[sign]
+
+def _asian(diff: np.ndarray, line: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Asijský handicap z pohledu sázeného týmu (diff = jeho góly − soupeřovy).
+    Čtvrtinové linie = půl sázky na každou sousední; vrací váhy výhry a prohry (push = zbytek).
+    """
+    if abs(line * 2 - round(line * 2)) > 1e-9:            # ±0.25 / ±0.75
+        lo, hi = line - 0.25, line + 0.25
+        w1, l1 = _asian(diff, lo)
+        w2, l2 = _asian(diff, hi)
+        return (w1 + w2) / 2.0, (l1 + l2) / 2.0
+    x = diff + line
+    return (x > 0).astype(float), (x < 0).astype(float)
+
+_FIXED: Dict[str, Rule] = {
+    "1H_GOAL_YES": lambda g: (g[0] + g[1] > 0, None),
+    "2H_GOAL_YES": lambda g: (g[2] + g[3] > 0, None),
+    "BTTS_YES": lambda g: ((g[0] + g[2] > 0) & (g[1] + g[3] > 0), None),
+    "BTTS_1H_YES": lambda g: ((g[0] > 0) & (g[1] > 0), None),
+    "GOAL_BOTH_HALVES": lambda g: ((g[0] + g[1] > 0) & (g[2] + g[3] > 0), None),
+    "HOME_SCORES_BOTH_HALVES": lambda g: ((g[0] > 0) & (g[2] > 0), None),
+    "AWAY_SCORES_BOTH_HALVES": lambda g: ((g[1] > 0) & (g[3] > 0), None),
+    "1X2_HOME": lambda g: (_res(g[0] + g[2], g[1] + g[3], "1"), None),
+    "1X2_DRAW": lambda g: (_res(g[0] + g[2], g[1] + g[3], "X"), None),
+    "1X2_AWAY": lambda g: (_res(g[0] + g[2], g[1] + g[3], "2"), None),
+}
+
+# Parametrické kódy: FT_OU_2_5, 1H_OU_1_5, 2H_OU_0_5, HOME_OVER_1_5, EXACT_2_1, HTFT_X1,
+# ASIAN_HOME_0, ASIAN_AWAY_+0_25, …
+_RX_OU = re.compile(r"^(FT|1H|2H)_OU_(\d+)_(\d+)$")
+_RX_TEAM = re.compile(r"^(HOME|AWAY)_OVER_(\d+)_(\d+)$")
+_RX_EXACT = re.compile(r"^EXACT_(\d+)_(\d+)$")
+_RX_HTFT = re.compile(r"^HTFT_([1X2])([1X2])$")
+_RX_ASIAN = re.compile(r"^ASIAN_(HOME|AWAY)_([+-]?\d+(?:_\d+)?)$")
+
+def _period(g: Grid, period: str) -> Tuple[np.ndarray, np.ndarray]:
+    if period == "1H":
+        return g[0], g[1]
+    if period == "2H":
+        return g[2], g[3]
+    return g[0] + g[2], g[1] + g[3]
+
+def rule_for(code: str) -> Optional[Rule]:
+    """Pravidlo pro kód trhu; None = trh nejde odvodit ze skóre (rohy, karty, …)."""
+    code = ALIASES.get(code, code)
+    if code in _FIXED:
+        return _FIXED[code]
+    m = _RX_OU.match(code)
+    if m:
+        per, line = m.group(1), float(f"{m.group(2)}.{m.group(3)}")
+        return lambda g: (sum(_period(g, per)) > line, None)
+    m = _RX_TEAM.match(code)
+    if m:
+        side, line = m.group(1), float(f"{m.group(2)}.{m.group(3)}")
+        return lambda g: (_period(g, "FT")[0 if side == "HOME" else 1] > line, None)
+    m = _RX_EXACT.match(code)
+    if m:
+        h, a = int(m.group(1)), int(m.group(2))
+        return lambda g: ((g[0] + g[2] == h) & (g[1] + g[3] == a), None)
+    m = _RX_HTFT.match(code)
+    if m:
+        x, y = m.group(1), m.group(2)
+        return lambda g: (_res(g[0], g[1], x) & _res(g[0] + g[2], g[1] + g[3], y), None)
+    m = _RX_ASIAN.match(code)
+    if m:
+        side, line = m.group(1), float(m.group(2).replace("_", "."))
+        def rule(g: Grid, side=side, line=line):
+            h, a = _period(g, "FT")
+            return _asian(h - a if side == "HOME" else a - h, line)
+        return rule
+    return None
+
+# Počítané trhy mimo góly: Poisson z průměru (sloupec v MatchFacts, podíl 1H, linie)
+_COUNT_MARKETS: Dict[str, Tuple[str, float, float]] = {
+    "CORNERS_OVER": ("corners_avg", 1.0, CORNERS_LINE),
+    "CARDS_OVER": ("cards_avg", 1.0, CARDS_LINE),
+    "1H_CORNERS_OVER": ("corners_avg", 0.45, CORNERS_1H_LINE),
+    "1H_CARDS_OVER": ("cards_avg", 0.42, CARDS_1H_LINE),
+}
+
+# =============== PRICER ===============
+@dataclass
+class PricedBatch:
+    codes: List[str]
+    probs: np.ndarray          # (n_zápasů, n_trhů), NaN = nelze ocenit
+
+    def get(self, code: str) -> np.ndarray:
+        return self.probs[:, self.codes.index(ALIASES.get(code, code))]
+
+    def row(self, i: int) -> Dict[str, float]:
+        return {c: float(p) for c, p in zip(self.codes, self.probs[i]) if not np.isnan(p)}
+
+class MarketPricer:
+    """Masky pro všechny kódy se staví jednou; price() je pak jedno násobení na dávku."""
+
+    def __init__(self, codes: Optional[Sequence[str]] = None, sport: str = "fotbal",
+                 half_goals: int = HALF_GOALS, ht_share: float = GOAL_PARAMS.ht_share):
+        self.codes = list(codes) if codes is not None else [m.code for m in MARKETS_BY_SPORT.get(sport, [])]
+        self.g = half_goals + 1
+        self.ht_share = ht_share
+
+        i = np.arange(self.g)
+        grid: Grid = (i[:, None, None, None], i[None, :, None, None],
+                      i[None, None, :, None], i[None, None, None, :])
+        cells = self.g ** 4
+        self._goal_idx: List[int] = []
+        self._count_idx: List[int] = []
+        win_rows, lose_rows, has_lose = [], [], []
+        for k, code in enumerate(self.codes):
+            rule = rule_for(code)
+            if rule is None:
+                if code in _COUNT_MARKETS:
+                    self._count_idx.append(k)
+                continue
+            w, l = rule(grid)
+            win_rows.append(np.broadcast_to(w, (self.g,) * 4).reshape(cells).astype(float))
+            lose_rows.append(np.zeros(cells) if l is None
+                             else np.broadcast_to(l, (self.g,) * 4).reshape(cells).astype(float))
+            has_lose.append(l is not None)
+            self._goal_idx.append(k)
+        self._win = np.array(win_rows).T if win_rows else np.zeros((cells, 0))     # (cells, m)
+        self._lose = np.array(lose_rows).T if lose_rows else np.zeros((cells, 0))
+        self._has_lose = np.array(has_lose, dtype=bool)
+
+    def joint(self, lam_h, lam_a) -> np.ndarray:
+        """(n, G, G, G, G) = P(h1, a1, h2, a2) pro všechny zápasy."""
+        lh = np.asarray(lam_h, float).reshape(-1)
+        la = np.asarray(lam_a, float).reshape(-1)
+        s1, s2 = self.ht_share, 1.0 - self.ht_share
+        mx = self.g - 1
+        ph1, pa1 = poisson_pmf(lh * s1, mx), poisson_pmf(la * s1, mx)
+        ph2, pa2 = poisson_pmf(lh * s2, mx), poisson_pmf(la * s2, mx)
+        first = ph1[:, :, None] * pa1[:, None, :]
+        second = ph2[:, :, None] * pa2[:, None, :]
+        j = first[:, :, :, None, None] * second[:, None, None, :, :]
+        j /= j.sum(axis=(1, 2, 3, 4), keepdims=True)
+        return j
+
+    def price(self, lam_h, lam_a, corners_avg=None, cards_avg=None) -> PricedBatch:
+        j = self.joint(lam_h, lam_a)
+        n = j.shape[0]
+        flat = j.reshape(n, -1)
+        out = np.full((n, len(self.codes)), np.nan)
+
+        if self._goal_idx:
+            win = flat @ self._win
+            lose = flat @ self._lose
+            # handicap: férová pravděpodobnost bez pushe = výhra / (výhra + prohra)
+            denom = np.where(self._has_lose, win + lose, 1.0)
+            out[:, self._goal_idx] = np.divide(win, denom, out=np.zeros_like(win), where=denom > 0)
+
+        avgs = {"corners_avg": corners_avg, "cards_avg": cards_avg}
+        for k in self._count_idx:
+            col, share, line = _COUNT_MARKETS[self.codes[k]]
+            if avgs[col] is None:
+                continue
+            lam = np.asarray(avgs[col], float).reshape(-1) * share
+            ok = ~np.isnan(lam)
+            cdf = poisson_pmf(np.where(ok, lam, 0.0), int(line)).sum(axis=1)
+            out[:, k] = np.where(ok, 1.0 - cdf, np.nan)
+        return PricedBatch(self.codes, out)
+
+    def price_facts(self, facts: List[MatchFacts]) -> PricedBatch:
+        lh, la = lambdas_from_facts(facts)
+        corners = np.array([f.corners_avg if f.corners_avg else np.nan for f in facts], float)
+        cards = np.array([f.cards_avg if f.cards_avg else np.nan for f in facts], float)
+        return self.price(lh, la, corners, cards)
+
+_DEFAULT: Optional[MarketPricer] = None
+
+def default_pricer() -> MarketPricer:
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = MarketPricer()
+    return _DEFAULT
+
+def price_facts(facts: List[MatchFacts]) -> PricedBatch:
+    """Všechny registrované fotbalové trhy pro dávku MatchFacts."""
+    return default_pricer().price_facts(facts)
+
+# =============== BENCHMARK ===============
+def _bench(n: int = 2_000) -> None:
+    rng = np.random.default_rng(11)
+    lh, la = rng.uniform(0.5, 2.4, n), rng.uniform(0.4, 2.0, n)
+    t0 = time.perf_counter()
+    pr = MarketPricer()
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batch = pr.price(lh, la, rng.uniform(7, 12, n), rng.uniform(3, 6, n))
+    dt = time.perf_counter() - t0
+    priced = int((~np.isnan(batch.probs[0])).sum())
+    print(f"masky {build * 1000:.1f} ms; {n} zápasů × {priced}/{len(pr.codes)} trhů: {dt * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
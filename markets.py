@@ -129,6 +129,47 @@ FOOTBALL_MARKETS: List[MarketDef] = [
     ),
 ]
 
+# --- Další gólové trhy (oceňuje je market_pricer z matice skóre) ---
+FOOTBALL_MARKETS += [
+    MarketDef("1X2_HOME", "Výsledek zápasu – domácí", "Výsledek zápasu 1",
+              P(r"^v[yý]sledek z[aá]pasu\W*1\b"), group="výsledek"),
+    MarketDef("1X2_DRAW", "Výsledek zápasu – remíza", "Výsledek zápasu 0",
+              P(r"^v[yý]sledek z[aá]pasu\W*(0|x|rem[ií]za)\b"), group="výsledek"),
+    MarketDef("1X2_AWAY", "Výsledek zápasu – hosté", "Výsledek zápasu 2",
+              P(r"^v[yý]sledek z[aá]pasu\W*2\b"), group="výsledek"),
+    MarketDef("FT_OU_3_5", "Počet gólů Over 3.5", "Počet gólů v zápase Over 3.5",
+              P(r"\b(over|více)\s*3[.,]?5\b"), group="góly"),
+    MarketDef("1H_OU_1_5", "Góly 1. poločas Over 1.5", "Počet gólů v 1. poločasu Over 1.5",
+              P(r"(1\.\s*polo[cč]as|prvn[íi]\s*polo[cč]as).*(over|více)\s*1[.,]?5"), group="poločas"),
+    MarketDef("2H_GOAL_YES", "Gól ve 2. poločase – ANO", "Padne gól ve 2. poločase – ANO",
+              P(r"g[oó]l ve 2\.? polo[cč]ase.*ano"), group="poločas"),
+    MarketDef("BTTS_1H_YES", "Každý tým dá v 1. poločasu – ANO", "Každý tým dá v 1. poločasu – ANO",
+              P(r"ka[zž]d[yý] t[yý]m d[aá] v 1\.? polo[cč]as.*ano"), group="poločas"),
+    MarketDef("GOAL_BOTH_HALVES", "Gól v obou poločasech – ANO",
+              "V každém poločase padne 1 a více gólů – ANO",
+              P(r"v ka[zž]d[eé]m polo[cč]ase padne.*ano"), group="poločas"),
+    MarketDef("HOME_SCORES_BOTH_HALVES", "Domácí dají gól v obou poločasech",
+              "Tým dá gól v obou poločasech – domácí",
+              P(r"t[yý]m d[aá] g[oó]l v obou polo[cč]asech.*(dom[aá]c[ií]|home)"), group="týmové góly"),
+    MarketDef("AWAY_SCORES_BOTH_HALVES", "Hosté dají gól v obou poločasech",
+              "Tým dá gól v obou poločasech – hosté",
+              P(r"t[yý]m d[aá] g[oó]l v obou polo[cč]asech.*(host[eé]|away)"), group="týmové góly"),
+]
+
+# Přesný výsledek (0:0 … 4:4) a poločas/zápas (1/1 … 2/2) – generované kódy EXACT_h_a, HTFT_xy
+FOOTBALL_MARKETS += [
+    MarketDef(f"EXACT_{h}_{a}", f"Přesný výsledek {h}:{a}", f"Přesný výsledek zápasu {h}:{a}",
+              P(rf"p[rř]esn[yý] v[yý]sledek z[aá]pasu.*\b{h}\s*[:-]\s*{a}\b"), group="přesný výsledek")
+    for h in range(5) for a in range(5)
+]
+FOOTBALL_MARKETS += [
+    MarketDef(f"HTFT_{x}{y}", f"Poločas/zápas {x}/{y}",
+              f"Výsledek 1. poločasu a výsledek zápasu {x}/{y}",
+              P(rf"v[yý]sledek 1\.? polo[cč]asu a v[yý]sledek z[aá]pasu.*\b{x}\s*/\s*{y}\b"),
+              group="poločas/zápas")
+    for x in "1X2" for y in "1X2"
+]
+
 # === Registry / helpery ===
 MARKETS_BY_SPORT: Dict[str, List[MarketDef]] = {
     "fotbal": FOOTBALL_MARKETS,
@@ -0,0 +1,117 @@
+# multisport.py — souběžný sken všech kategorií z urls.URL_MAP (fotbal, hokej, tenis, …)
+# Každý sport = plugin (parser řádků + skórování). Stahuje se paralelně přes sdílený pool
+# a cache z fetch.py (dnes + zítra pro každý sport), výsledek je jeden společný žebříček.
+# Sporty bez vlastního modelu sází na favorita podle vypsaných kurzů: favorit = kratší
+# kurz, důvěra = jeho férová pravděpodobnost (1/kurz normovaná přes všechny výsledky, bez
+# marže). Řádek bez kurzů do žebříčku nejde – pevná důvěra na sport by řadila jen podle sportu.
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fetch import get_text, TIMEOUT
+from picks import (Tip, Row, TZ, _catalog_url, _dedup_keep_best,
+                   _football_tips)
+from urls import URL_MAP
+import deadline
+from parse_pool import tipsport_rows, tipsport_odds_rows   # parse v procesním poolu (fallback v procesu)
+
+# (home, away, league, kickoff, kurzy 1[, X], 2)
+OddsRow = Tuple[str, str, str, datetime, Tuple[float, ...]]
+
+@dataclass(frozen=True)
+class SportPlugin:
+    key: str                                           # klíč z urls.URL_MAP
+    emoji: str
+    parse: Callable[[str, datetime], list]             # html, základní datum → řádky
+    score: Callable[[list, str], List[Tip]]            # řádky, URL → tipy s důvěrou
+
+def favourite(home: str, away: str, odds: Tuple[float, ...],
+              three_way: bool = False) -> Optional[Tuple[str, float, float]]:
+    """
+    (favorit, jeho kurz, férová pravděpodobnost) z kurzů 1, 2 (nebo 1, X, 2 při three_way).
+    None = kurzy chybí nebo je nejkratší remíza.
+    """
+    if three_way and len(odds) >= 3:
+        prices, names = odds[:3], (home, None, away)
+    elif len(odds) >= 2:
+        prices, names = odds[:2], (home, away)
+    else:
+        return None
+    i = min(range(len(prices)), key=prices.__getitem__)
+    if names[i] is None:
+        return None
+    return names[i], prices[i], (1.0 / prices[i]) / sum(1.0 / o for o in prices)
+
+def _favourite_scorer(sport: str, market: str, window: str, three_way: bool = False):
+    """Sporty bez vlastního modelu: tip na favorita, důvěra = férová pravděpodobnost z kurzů."""
+    def score(rows: List[OddsRow], url: str) -> List[Tip]:
+        out = []
+        for h, a, lg, ko, odds in rows:
+            fav = favourite(h, a, odds, three_way)
+            if fav is None:
+                continue
+            name, price, p = fav
+            out.append(Tip(match=f"{h} – {a}", league=lg, market=f"{market} – {name}",
+                           confidence=int(round(100 * p)), window=window,
+                           reason=f"Tipsport mobil: {sport}, kurz {price:.2f} → {p:.0%} po odečtení marže.",
+                           odds=price, url=url, kickoff=ko, sport=sport))
+        return out
+    return score
+
+def _football_scorer(rows: List[Row], url: str) -> List[Tip]:
+    return _football_tips(rows)
+
+PLUGINS: Dict[str, SportPlugin] = {
+    "fotbal": SportPlugin("fotbal", "⚽", tipsport_rows, _football_scorer),
+    # hokej: kurzy v katalogu jsou 1X2 za základní hrací dobu
+    "hokej": SportPlugin("hokej", "🏒", tipsport_odds_rows, _favourite_scorer(
+        "hokej", "Vítěz v základní hrací době", "60 min", three_way=True)),
+    "basket": SportPlugin("basket", "🏀", tipsport_odds_rows, _favourite_scorer(
+        "basket", "Vítěz zápasu vč. prodloužení", "celý zápas")),
+    "tenis": SportPlugin("tenis", "🎾", tipsport_odds_rows, _favourite_scorer(
+        "tenis", "Vítěz zápasu", "celý zápas")),
+    "esport": SportPlugin("esport", "🎮", tipsport_odds_rows, _favourite_scorer(
+        "esport", "Vítěz zápasu", "celý zápas")),
+}
+
+def sport_emoji(sport: str) -> str:
+    p = PLUGINS.get(sport)
+    return p.emoji if p else "⚽"
+
+def _scan_one(plugin: SportPlugin, url: str, day_shift: int) -> List[Tip]:
+    base = datetime.now(timezone.utc).astimezone(TZ) + timedelta(days=day_shift)
+    html = get_text(_catalog_url(url, day_shift), timeout=TIMEOUT)
+    if not html:
+        return []
+    return plugin.score(plugin.parse(html, base), url)
+
+def scan_all_sports(limit: int = 10, hours_window: int = 24, min_conf: int = 0,
+                    sports: Optional[List[str]] = None) -> List[Tip]:
+    """
+    Paralelně stáhne a naparsuje všechny kategorie (dnes + zítra) a vrátí společný
+    žebříček: důvěra ↓, výkop ↑. Chyba jednoho sportu ostatní neshodí.
+    """
+    keys = [k for k in (sports or list(URL_MAP)) if k in PLUGINS and k in URL_MAP]
+    jobs: List[Tuple[SportPlugin, str, int]] = [(PLUGINS[k], URL_MAP[k], d) for k in keys for d in (0, 1)]
+
+    tips: List[Tip] = []
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as ex:
+        # každé vlákno dostane rozpočet příkazu; nestihnutý sport skončí v b.skipped
+        scan = deadline.bind(lambda p, u, d: deadline.attempt(f"{p.key} ({'zítra' if d else 'dnes'})",
+                                                              _scan_one, p, u, d, default=[]))
+        futs = [ex.submit(scan, *job) for job in jobs]
+        for f in futs:
+            try:
+                tips.extend(f.result())
+            except Exception:
+                pass
+
+    now = datetime.now(timezone.utc).astimezone(TZ)
+    until = now + timedelta(hours=max(1, min(72, hours_window)))
+    filtered = [t for t in tips if t.kickoff and now <= t.kickoff <= until and t.confidence >= min_conf]
+    filtered = _dedup_keep_best(filtered)
+    filtered.sort(key=lambda t: (-(t.confidence or 0), t.kickoff.timestamp() if t.kickoff else 1e15))
+    return filtered[:max(1, limit)]
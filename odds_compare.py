@@ -0,0 +1,324 @@
+# odds_compare.py — kurzy z víc sázkovek: sjednocení, odstranění marže, nejlepší cena, hrana
+# Feedy (soubor jako sources_files nebo HTTP) dají řádky (zápas, trh, kurz[, kurz protistrany]).
+# Zápas se páruje přes team_registry (ID týmů + výkop), trh přes MarketDef (kód i Tipsport text).
+# Všechno dál je sloupcově v numpy:
+#   • marže: skupina = sázkovka × zápas × trh (1X2 / přesný výsledek / HT-FT jako celek,
+#     dvoucestné trhy přes kurz protistrany); férová p = (1/kurz) / součet(1/kurz) ve skupině
+#     (bincount). Neúplná skupina → medián marže dané sázkovky.
+#   • nejlepší cena: max kurz na (zápas, trh) přes všechny sázkovky (maximum.at).
+#   • hrana: p modelu (market_pricer) − 1/nejlepší kurz; EV = p · kurz − 1.
+#
+#   ODDS_FEEDS=odds_tipsport.json,https://…/odds    ODDS_TTL_S=60
+#   Formát: {"bookmaker": "…", "rows": [{"home", "away", "ts_utc", "market", "odds", "against"?}]}
+#
+#   python odds_compare.py            – nejlepší hrany z ODDS_FEEDS nad dnešními zápasy
+#   python odds_compare.py bench [n]  – syntetický benchmark (n zápasů × 3 sázkovky)
+
+from __future__ import annotations
+import json, os, sys, time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from flamengo_strategy import MatchFacts, TipCandidate
+from market_pricer import ALIASES, price_facts
+from markets import find_market, get_market_by_code
+from team_registry import key_id
+
+FEEDS = [f.strip() for f in os.getenv("ODDS_FEEDS", "").split(",") if f.strip()]
+TTL_S = float(os.getenv("ODDS_TTL_S", "60"))
+MATCH_TOL_S = 3 * 3600        # tolerance výkopu mezi feedem a zápasem
+DEFAULT_MARGIN = 0.06         # když sázkovka nemá ani jednu úplnou skupinu
+_MULTI = ("1X2_", "EXACT_", "HTFT_")   # víccestné trhy – marže přes celou skupinu
+
+# (sázkovka, domácí, hosté, výkop ts, kód trhu, kurz, kurz protistrany | NaN)
+Quote = Tuple[str, str, str, int, str, float, float]
+
+# =============== FEEDY ===============
+class FileOddsFeed:
+    def __init__(self, path: str, book: Optional[str] = None):
+        self.path = path
+        self.book = book or os.path.splitext(os.path.basename(path))[0].replace("odds_", "")
+
+    def fetch(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+class HttpOddsFeed:
+    def __init__(self, url: str, book: Optional[str] = None):
+        self.url = url
+        self.book = book or url.split("//")[-1].split("/")[0]
+
+    def fetch(self) -> dict:
+        from fetch import get_text
+        text = get_text(self.url, ttl=0)
+        return json.loads(text) if text else {}
+
+def feeds_from_env(specs: Sequence[str] = FEEDS) -> list:
+    return [HttpOddsFeed(s) if s.startswith(("http://", "https://")) else FileOddsFeed(s) for s in specs]
+
+_CODE_CACHE: Dict[str, Optional[str]] = {}
+
+def market_code(text: str) -> Optional[str]:
+    """Kód nebo Tipsport text → kanonický kód MarketDef (aliasy z market_pricer)."""
+    code = _CODE_CACHE.get(text, "")
+    if code == "":
+        m = get_market_by_code(ALIASES.get(text, text)) or find_market(text)
+        code = _CODE_CACHE[text] = m.code if m else None
+    return code
+
+def quotes(feeds: Iterable) -> List[Quote]:
+    out: List[Quote] = []
+    for feed in feeds:
+        try:
+            raw = feed.fetch()
+        except Exception as e:
+            print(f"[WARN] odds feed {getattr(feed, 'path', getattr(feed, 'url', feed))}: {e}")
+            continue
+        book = raw.get("bookmaker") or feed.book
+        bad = 0
+        for r in raw.get("rows") or []:
+            try:
+                code = market_code(str(r.get("market", "")))
+                odds = float(r.get("odds") or 0)
+                if code is None or odds <= 1.0:
+                    continue
+                against = float(r.get("against") or "nan")
+                out.append((book, str(r["home"]), str(r["away"]), int(r["ts_utc"]), code, odds, against))
+            except (AttributeError, KeyError, TypeError, ValueError):
+                bad += 1                # vadný řádek feedu neshodí celou tabuli
+        if bad:
+            print(f"[WARN] odds feed {book}: přeskočeno {bad} vadných řádků")
+    return out
+
+# =============== TABULE KURZŮ ===============
+def _family(code: str) -> str:
+    for p in _MULTI:
+        if code.startswith(p):
+            return p
+    return code
+
+class OddsBoard:
+    """Sloupcová tabule: řádek = jedna cena jedné sázkovky; matice (zápas × trh) pro nejlepší ceny."""
+
+    def __init__(self, rows: Sequence[Quote]):
+        self.books: List[str] = []
+        self.codes: List[str] = []
+        self.matches: List[Tuple[int, int, int]] = []        # (ID domácích, ID hostů, výkop)
+        self._by_pair: Dict[Tuple[int, int], List[int]] = {}
+        bi: Dict[str, int] = {}
+        ci: Dict[str, int] = {}
+        fi: Dict[str, int] = {}
+        n = len(rows)
+        book = np.empty(n, np.int32)
+        code = np.empty(n, np.int32)
+        fam = np.empty(n, np.int32)
+        match = np.empty(n, np.int32)
+        odds = np.empty(n)
+        against = np.empty(n)
+        for k, (b, h, a, ts, c, o, ag) in enumerate(rows):
+            book[k] = bi.setdefault(b, len(bi))
+            code[k] = ci.setdefault(c, len(ci))
+            fam[k] = fi.setdefault(_family(c), len(fi))
+            match[k] = self._match_idx(key_id(h), key_id(a), ts)
+            odds[k], against[k] = o, ag
+        self.books = list(bi)
+        self.codes = list(ci)
+        self._code_idx = ci
+        self.book, self.code, self.match, self.odds = book, code, match, odds
+        multi = np.array([f in _MULTI for f in fi], bool)[fam] if n else np.zeros(0, bool)
+        self.fair, self.margin = self._remove_margin(book, fam, match, multi, odds, against)
+
+        shape = (len(self.matches), len(self.codes))
+        cell = match * shape[1] + code
+        best = np.full(shape[0] * shape[1], -np.inf)
+        np.maximum.at(best, cell, odds)
+        is_best = odds == best[cell]
+        best_book = np.full(best.size, -1, np.int32)
+        best_book[cell[is_best]] = book[is_best]
+        cnt = np.bincount(cell, minlength=best.size)
+        fair_sum = np.bincount(cell, weights=np.nan_to_num(self.fair), minlength=best.size)
+        fair_n = np.bincount(cell, weights=~np.isnan(self.fair), minlength=best.size)
+        self.best_odds = np.where(cnt > 0, best, np.nan).reshape(shape)
+        self.best_book = best_book.reshape(shape)
+        self.fair_p = np.divide(fair_sum, fair_n, out=np.full(best.size, np.nan), where=fair_n > 0).reshape(shape)
+
+    def __len__(self) -> int:
+        return len(self.odds)
+
+    def _match_idx(self, h: int, a: int, ts: int) -> int:
+        for i in self._by_pair.get((h, a), ()):
+            if abs(self.matches[i][2] - ts) <= MATCH_TOL_S:
+                return i
+        i = len(self.matches)
+        self.matches.append((h, a, ts))
+        self._by_pair.setdefault((h, a), []).append(i)
+        return i
+
+    def lookup(self, home: str, away: str, ts: int) -> Optional[int]:
+        for i in self._by_pair.get((key_id(home), key_id(away)), ()):
+            if abs(self.matches[i][2] - ts) <= MATCH_TOL_S:
+                return i
+        return None
+
+    @staticmethod
+    def _remove_margin(book, fam, match, multi, odds, against) -> Tuple[np.ndarray, np.ndarray]:
+        """Férové p a marže skupiny pro každý řádek (vše vektorově)."""
+        imp = 1.0 / odds
+        n = len(odds)
+        if n == 0:
+            return np.empty(0), np.empty(0)
+        # skupina víccestného trhu = (sázkovka, zápas, rodina); dvoucestné jsou skupinou samy
+        key = np.stack([book, match, np.where(multi, fam, -1 - np.arange(n))], axis=1)
+        _, grp = np.unique(key, axis=0, return_inverse=True)
+        grp = grp.reshape(-1)
+        over = np.bincount(grp, weights=imp)[grp]
+        size = np.bincount(grp)[grp]
+        two_way = ~multi & ~np.isnan(against)
+        over = np.where(two_way, imp + 1.0 / np.where(two_way, against, 1.0), over)
+        ok = (two_way | (multi & (size >= 2))) & (over >= 1.0)
+        # neúplné skupiny: medián marže sázkovky z úplných skupin
+        med = np.full(book.max() + 1, 1.0 + DEFAULT_MARGIN)
+        for b in np.unique(book[ok]):
+            med[b] = np.median(over[ok & (book == b)])
+        over = np.where(ok, over, med[book])
+        return imp / over, over - 1.0
+
+    def best(self, home: str, away: str, ts: int, code: str) -> Optional[Tuple[float, str, float]]:
+        """(nejlepší kurz, sázkovka, férová p konsenzu) pro trh zápasu; None = nikdo nevypisuje."""
+        i = self.lookup(home, away, ts)
+        j = self._code_idx.get(ALIASES.get(code, code))
+        if i is None or j is None or np.isnan(self.best_odds[i, j]):
+            return None
+        return float(self.best_odds[i, j]), self.books[self.best_book[i, j]], float(self.fair_p[i, j])
+
+# =============== HRANY ===============
+@dataclass
+class Edge:
+    facts: MatchFacts
+    code: str
+    p_model: float
+    odds: float                # nejlepší dostupný kurz
+    book: str
+    fair_p: float              # konsenzus sázkovek bez marže
+    edge: float                # p_model − 1/odds
+    ev: float                  # p_model · odds − 1
+
+def rank_edges(facts: Sequence[MatchFacts], board: OddsBoard, min_edge: float = 0.0,
+               limit: Optional[int] = None) -> List[Edge]:
+    """Všechny (zápas, trh) s cenou i oceněním modelu, seřazené podle hrany ↓."""
+    if not facts or not len(board):
+        return []
+    rows = np.array([board.lookup(f.home, f.away, f.ts_utc) for f in facts], dtype=object)
+    have = np.flatnonzero(rows != None)  # noqa: E711
+    if not have.size:
+        return []
+    sub = [facts[i] for i in have]
+    priced = price_facts(sub)
+    cols = [(j, c) for j, c in enumerate(board.codes) if ALIASES.get(c, c) in priced.codes]
+    if not cols:
+        return []
+    bj = np.array([j for j, _ in cols])
+    pm = priced.probs[:, [priced.codes.index(ALIASES.get(c, c)) for _, c in cols]]      # (zápasy, trhy)
+    mi = rows[have].astype(int)
+    best = board.best_odds[mi][:, bj]
+    edge = pm - 1.0 / best
+    ok = ~np.isnan(edge) & (edge > min_edge)
+    fi, cj = np.nonzero(ok)
+    order = np.argsort(-edge[fi, cj], kind="stable")[:limit]
+    out = []
+    for k in order:
+        f, c = fi[k], cj[k]
+        j = bj[c]
+        out.append(Edge(sub[f], board.codes[j], float(pm[f, c]), float(best[f, c]),
+                        board.books[board.best_book[mi[f], j]], float(board.fair_p[mi[f], j]),
+                        float(edge[f, c]), float(pm[f, c] * best[f, c] - 1.0)))
+    return out
+
+def best_prices(pairs: Sequence[Tuple[MatchFacts, TipCandidate]],
+                board: OddsBoard) -> List[Optional[Tuple[float, str, float]]]:
+    """Pro tipy z tip_engine: (nejlepší kurz, sázkovka, férová p) nebo None."""
+    return [board.best(m.home, m.away, m.ts_utc, t.market_code) for m, t in pairs]
+
+_BOARD: Tuple[float, Optional[OddsBoard]] = (0.0, None)
+
+def load_board(feeds: Optional[list] = None, ttl: float = TTL_S) -> Optional[OddsBoard]:
+    """Tabule z ODDS_FEEDS (cache na ttl s); bez feedů None."""
+    global _BOARD
+    if feeds is None:
+        if not FEEDS:
+            return None
+        ts, board = _BOARD
+        if board is not None and time.monotonic() - ts < ttl:
+            return board
+        feeds = feeds_from_env()
+    board = OddsBoard(quotes(feeds))
+    _BOARD = (time.monotonic(), board)
+    return board
+
+def format_edge(e: Edge) -> str:
+    f = e.facts
+    return (f"{f.home} – {f.away} | {e.code} @ {e.odds:.2f} ({e.book}) | model {e.p_model * 100:.1f} % "
+            f"vs. {100 / e.odds:.1f} % | hrana {e.edge * 100:+.1f} b. | EV {e.ev * 100:+.1f} %")
+
+# =============== BENCHMARK ===============
+def _synthetic(n: int, books: int = 3, seed: int = 4) -> Tuple[List[MatchFacts], List[Quote]]:
+    rng = np.random.default_rng(seed)
+    now = int(time.time())
+    facts, rows = [], []
+    codes2 = ["FT_OU_1_5", "FT_OU_2_5", "1H_GOAL_YES", "BTTS_YES", "HOME_OVER_1_5", "AWAY_OVER_1_5"]
+    for i in range(n):
+        f = MatchFacts(sport="football", league="Bench", home=f"BH{i}", away=f"BA{i}", ts_utc=now + 3600 * (i % 48),
+                       home_form10=None, away_form10=None, xg_per90_sum=float(rng.uniform(1.6, 3.4)),
+                       pace_hint=None, cards_avg=None, corners_avg=None, injuries_abs=None, notes="")
+        facts.append(f)
+        for b in range(books):
+            margin = 1.0 + rng.uniform(0.03, 0.08)
+            p = rng.dirichlet([4, 3, 3])
+            for c, q in zip(("1X2_HOME", "1X2_DRAW", "1X2_AWAY"), p):
+                rows.append((f"book{b}", f.home, f.away, f.ts_utc, c, round(1 / (q * margin), 2), np.nan))
+            for c in codes2:
+                q = rng.uniform(0.3, 0.8)
+                rows.append((f"book{b}", f.home, f.away, f.ts_utc, c, round(1 / (q * margin), 2),
+                             round(1 / ((1 - q) * margin), 2) if b else np.nan))
+    return facts, rows
+
+def _bench(n: int = 500) -> None:
+    import team_registry
+    with team_registry.scratch():               # syntetické týmy nepatří do registru
+        _bench_run(n)
+
+def _bench_run(n: int) -> None:
+    facts, rows = _synthetic(n)
+    t0 = time.perf_counter()
+    board = OddsBoard(rows)
+    t_board = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    edges = rank_edges(facts, board)
+    t_rank = time.perf_counter() - t0
+    print(f"{len(rows)} řádků kurzů ({n} zápasů × {len(board.books)} sázkovky × {len(board.codes)} trhů): "
+          f"tabule {t_board * 1000:.0f} ms, hrany {t_rank * 1000:.0f} ms; "
+          f"ø marže {np.mean(board.margin) * 100:.1f} %, kladných hran {len(edges)}")
+    for e in edges[:3]:
+        print("  " + format_edge(e))
+
+def main(argv: List[str]) -> int:
+    if argv and argv[0] == "bench":
+        _bench(int(argv[1]) if len(argv) > 1 else 500)
+        return 0
+    board = load_board()
+    if board is None:
+        print("ODDS_FEEDS není nastavené")
+        return 2
+    from sources_base import gather_from_sources
+    from sources_files import TipsportFixturesSource, FixturesSource, UnderstatSource, SofaScoreSource
+    facts = gather_from_sources([TipsportFixturesSource(), FixturesSource(), UnderstatSource(), SofaScoreSource()])
+    for e in rank_edges(facts, board, limit=20):
+        print(format_edge(e))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
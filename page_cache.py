@@ -0,0 +1,150 @@
+# page_cache.py — obsahově adresovaná cache naparsovaných stránek (disk, zlib)
+# Klíč = sha256(druh parseru, PARSER_VERSION, parametry parseru, tělo stránky).
+# Stejné bajty jako minule → naparsované řádky se načtou z disku a BeautifulSoup se vůbec
+# nespustí. Změna parseru = nová PARSER_VERSION → staré záznamy se prostě přestanou trefovat
+# a časem vypadnou přes LRU. Velikost na disku hlídá strop v bajtech (nejdéle nepoužité pryč).
+#
+# Adresář sdílí víc procesů (bot, parse pool, workqueue workery): pravdou je adresář, ne
+# paměť procesu. get() čte soubor i když ho zapsal jiný proces, zásah posune mtime (společné
+# LRU) a strop se počítá z adresáře – po každých SCAN_FRACTION stropu vlastních zápisů nebo
+# po CHECK_S. Přesah nad strop je tak nejvýš (procesů × strop/16), ne procesů × strop.
+#
+#   PAGE_CACHE_DIR=.page_cache   PAGE_CACHE_MAX_MB=64   (0 = vypnuto)
+
+from __future__ import annotations
+import hashlib, json, os, threading, time, zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+CACHE_DIR = os.getenv("PAGE_CACHE_DIR", ".page_cache")
+MAX_BYTES = int(float(os.getenv("PAGE_CACHE_MAX_MB", "64")) * 1024 * 1024)
+CHECK_S = 30.0            # jak často přepočítat velikost z adresáře (zápisy jiných procesů)
+SCAN_FRACTION = 1 / 16    # … nebo po zápisu takové části stropu z tohoto procesu
+_SUFFIX = ".z"
+
+Entry = Tuple[List[tuple], List[str]]     # (kompaktní řádky, odkazy)
+
+def key(*parts: Any, body: bytes) -> str:
+    h = hashlib.sha256()
+    h.update(repr(parts).encode("utf-8"))
+    h.update(b"\0")
+    h.update(body)
+    return h.hexdigest()
+
+class PageCache:
+    def __init__(self, path: str = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, int]" = OrderedDict()     # klíč → velikost (stav adresáře při scanu)
+        self.bytes = 0                                          # adresář při scanu + vlastní zápisy od té doby
+        self._scanned = 0.0
+        self._written = 0                                       # vlastní zápisy od scanu
+        self.hits = self.misses = self.evictions = 0
+        if self.enabled:
+            os.makedirs(path, exist_ok=True)
+            self._scan()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _file(self, k: str) -> str:
+        return os.path.join(self.path, k + _SUFFIX)
+
+    def _scan(self):
+        """
+        Velikost a LRU z adresáře (i záznamy jiných procesů; pořadí podle mtime – zásah ho
+        posouvá) a vyhození nejdéle nepoužitých nad strop. Volá se pod self._lock.
+        """
+        found = []
+        try:
+            for e in os.scandir(self.path):
+                if e.name.endswith(_SUFFIX) and e.is_file():
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue                        # mezitím smazal jiný proces
+                    found.append((st.st_mtime, e.name[:-len(_SUFFIX)], st.st_size))
+        except OSError:
+            return
+        found.sort()
+        total = sum(size for _, _, size in found)
+        i = 0
+        while total > self.max_bytes and i < len(found):
+            _, k, size = found[i]
+            total -= size
+            i += 1
+            self.evictions += 1
+            try:
+                os.remove(self._file(k))
+            except OSError:
+                pass
+        self._lru = OrderedDict((k, size) for _, k, size in found[i:])
+        self.bytes = total
+        self._scanned = time.monotonic()
+        self._written = 0
+
+    def get(self, k: str) -> Optional[Entry]:
+        if not self.enabled:
+            return None
+        try:
+            with open(self._file(k), "rb") as f:
+                blob = f.read()
+            raw = json.loads(zlib.decompress(blob))
+            os.utime(self._file(k))
+        except (OSError, ValueError, zlib.error):
+            with self._lock:
+                self.bytes -= self._lru.pop(k, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self._lru[k] = len(blob)
+            self._lru.move_to_end(k)
+            self.hits += 1
+        return [tuple(r) for r in raw["rows"]], raw["links"]
+
+    def put(self, k: str, rows: List[tuple], links: List[str]):
+        if not self.enabled:
+            return
+        blob = zlib.compress(json.dumps({"rows": rows, "links": links}, ensure_ascii=False,
+                                        separators=(",", ":")).encode("utf-8"), 6)
+        tmp = f"{self._file(k)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, self._file(k))
+        except OSError:
+            return
+        with self._lock:
+            self.bytes += len(blob) - self._lru.pop(k, 0)
+            self._lru[k] = len(blob)
+            self._written += len(blob)
+            if (self.bytes > self.max_bytes or self._written > self.max_bytes * SCAN_FRACTION
+                    or time.monotonic() - self._scanned > CHECK_S):
+                self._scan()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entries": len(self._lru), "bytes": self.bytes, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+_CACHE: Optional[PageCache] = None
+_init_lock = threading.Lock()
+
+def cache() -> PageCache:
+    global _CACHE
+    with _init_lock:
+        if _CACHE is None:
+            _CACHE = PageCache()
+        return _CACHE
+
+def format_stats() -> str:
+    s = cache().stats()
+    if not cache().enabled:
+        return "page cache: vypnuto"
+    return (f"page cache: {s['entries']} stránek, {s['bytes'] / 1024:.0f} kB, "
+            f"zásahy {s['hits']}/{s['hits'] + s['misses']} ({s['hit_rate'] * 100:.0f} %), "
+            f"vyhozeno {s['evictions']}")
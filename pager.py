@@ -0,0 +1,101 @@
+# pager.py — stránkování výsledků skenu přes inline klávesnici (callback_query)
+# Výsledek skenu se uloží pod krátký token; tlačítka nesou jen token + pohled
+# (offset, min. důvěra, liga), takže listování = řez z paměti + edit zprávy, žádný scraping.
+
+from __future__ import annotations
+import secrets, time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+PAGE_SIZE = 5
+TTL_S = 15 * 60           # jak dlouho tlačítka fungují
+MAX_SCANS = 200           # strop uložených skenů (nejstarší pryč)
+HIGH_CONF = 95            # filtr „jen ≥95 %“
+TOP_LEAGUES = 3           # kolik lig nabídnout jako filtr
+PREFIX = "pg"
+
+@dataclass
+class Scan:
+    tips: List
+    title: str
+    leagues: List[str]
+    created: float
+
+@dataclass(frozen=True)
+class View:
+    offset: int = 0
+    min_conf: int = 0
+    league: int = -1       # index do Scan.leagues, -1 = všechny
+
+_SCANS: "OrderedDict[str, Scan]" = OrderedDict()
+
+def _purge(now: float):
+    for k in [k for k, s in _SCANS.items() if now - s.created > TTL_S]:
+        del _SCANS[k]
+    while len(_SCANS) > MAX_SCANS:
+        _SCANS.popitem(last=False)
+
+def put(tips: List, title: str) -> str:
+    """Uloží výsledek skenu, vrátí token pro callback_data."""
+    now = time.time()
+    _purge(now)
+    counts = Counter(getattr(t, "league", "") for t in tips)
+    leagues = [lg for lg, _ in counts.most_common(TOP_LEAGUES) if lg]
+    token = secrets.token_urlsafe(6)
+    _SCANS[token] = Scan(list(tips), title, leagues, now)
+    return token
+
+def get(token: str) -> Optional[Scan]:
+    s = _SCANS.get(token)
+    if s is None or time.time() - s.created > TTL_S:
+        return None
+    return s
+
+def encode(token: str, v: View) -> str:
+    return f"{PREFIX}|{token}|{v.offset}|{v.min_conf}|{v.league}"   # < 64 B (limit Telegramu)
+
+def decode(data: str) -> Optional[Tuple[str, View]]:
+    try:
+        pfx, token, off, mc, lg = data.split("|")
+        if pfx != PREFIX:
+            return None
+        return token, View(max(0, int(off)), int(mc), int(lg))
+    except (ValueError, AttributeError):
+        return None
+
+def page(scan: Scan, v: View) -> Tuple[List, int]:
+    """(tipy na stránce, počet tipů po filtru)."""
+    league = scan.leagues[v.league] if 0 <= v.league < len(scan.leagues) else None
+    rows = [t for t in scan.tips
+            if int(getattr(t, "confidence", 0) or 0) >= v.min_conf
+            and (league is None or getattr(t, "league", "") == league)]
+    return rows[v.offset:v.offset + PAGE_SIZE], len(rows)
+
+def keyboard(token: str, scan: Scan, v: View, total: int) -> Optional[InlineKeyboardMarkup]:
+    rows: List[List[InlineKeyboardButton]] = []
+
+    nav = []
+    if v.offset > 0:
+        nav.append(InlineKeyboardButton("⬅️ Předchozí",
+                   callback_data=encode(token, View(max(0, v.offset - PAGE_SIZE), v.min_conf, v.league))))
+    if v.offset + PAGE_SIZE < total:
+        nav.append(InlineKeyboardButton(f"Další {PAGE_SIZE} ➡️",
+                   callback_data=encode(token, View(v.offset + PAGE_SIZE, v.min_conf, v.league))))
+    if nav:
+        rows.append(nav)
+
+    if v.min_conf >= HIGH_CONF:
+        rows.append([InlineKeyboardButton("Všechny důvěry", callback_data=encode(token, View(0, 0, v.league)))])
+    else:
+        rows.append([InlineKeyboardButton(f"Jen ≥{HIGH_CONF} %", callback_data=encode(token, View(0, HIGH_CONF, v.league)))])
+
+    if v.league >= 0:
+        rows.append([InlineKeyboardButton("Všechny ligy", callback_data=encode(token, View(0, v.min_conf, -1)))])
+    elif len(scan.leagues) > 1:
+        rows.append([InlineKeyboardButton(f"🏆 {lg[:24]}", callback_data=encode(token, View(0, v.min_conf, i)))
+                     for i, lg in enumerate(scan.leagues)])
+
+    return InlineKeyboardMarkup(rows) if rows else None
@@ -0,0 +1,242 @@
+# parse_pool.py — parsování HTML v procesním poolu (mimo GIL)
+# Stránka jde do workeru jako surové bajty, zpět přijdou jen kompaktní n-tice
+# (home, away, league, výkop ts) + odkazy na další stránky – žádné soup objekty.
+# Workery se při startu „zahřejí“ (import bs4/picks/sources + jeden parse ukázkové stránky
+# každým parserem), takže import a kompilace regexů se platí jednou na proces, ne na stránku.
+# Pool startuje přes forkserver (jinak spawn): bot má v době prvního crawlu už vlákna
+# (PTB, ASGI, fetch pool) a fork takového procesu může zdědit zamčené zámky.
+# Před odesláním do workeru se stránka hledá v page_cache (stejné bajty = bez parsování);
+# kešují se jen řádky nezávislé na čase parsování, výkop se dopočítá až tady (finish).
+#
+#   PARSE_WORKERS=1   → bez poolu, parsuje se v procesu (default); 0 = počet jader, N = N workerů
+#
+# Benchmark (50 stránek):  python parse_pool.py [adresář_s_html]
+
+from __future__ import annotations
+import multiprocessing as mp
+import os, sys, threading, time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from crawl import CRAWL_MAX_PAGES, follow_links
+import deadline
+import page_cache
+
+WORKERS = int(os.getenv("PARSE_WORKERS", "1")) or (os.cpu_count() or 1)
+TZ = timezone(timedelta(hours=1))
+PARSER_VERSION = 5          # zvýšit při změně parserů → stará page_cache se přestane trefovat
+
+Row = Tuple[str, str, str, Optional[datetime]]
+# tipsport: (home, away, league, hodina, minuta); tipsport_odds: totéž + (kurzy,);
+# zdroje: (home, away, league, výkop ts | None)
+Compact = tuple
+
+# =============== WORKER ===============
+def _tipsport(soup: BeautifulSoup, ctx: dict):
+    from picks import _iter_tipsport_raw
+    rows = _iter_tipsport_raw(soup, ctx.get("max_nodes"))
+    return islice(rows, ctx["max_rows"]) if ctx.get("max_rows") else rows
+
+def _tipsport_odds(soup: BeautifulSoup, ctx: dict):
+    from picks import _iter_tipsport_raw
+    rows = _iter_tipsport_raw(soup, ctx.get("max_nodes"), odds=True)
+    return islice(rows, ctx["max_rows"]) if ctx.get("max_rows") else rows
+
+def _eurofotbal(soup: BeautifulSoup, ctx: dict):
+    from sources import _iter_eurofotbal_rows
+    rows = _iter_eurofotbal_rows(soup, ctx.get("days", 2), ctx.get("max_rows"))
+    return ((h, a, lg, ko.timestamp() if ko else None) for h, a, lg, ko in rows)
+
+def _footystats(soup: BeautifulSoup, ctx: dict):
+    from sources import _iter_footystats_rows
+    rows = _iter_footystats_rows(soup, ctx.get("max_rows"))
+    return ((h, a, lg, ko.timestamp() if ko else None) for h, a, lg, ko in rows)
+
+PARSERS: Dict[str, Callable] = {"tipsport": _tipsport, "tipsport_odds": _tipsport_odds,
+                                 "eurofotbal": _eurofotbal, "footystats": _footystats}
+
+def parse_page(kind: str, html: bytes, url: str = "", scope: Optional[str] = None,
+               subpages: bool = True, ctx: Optional[dict] = None) -> Tuple[List[Compact], List[str]]:
+    """Jedna stránka → (řádky, odkazy). Běží ve workeru i v procesu (stejný výsledek)."""
+    soup = BeautifulSoup(html, "html.parser")
+    rows = list(PARSERS[kind](soup, ctx or {}))
+    links = follow_links(soup, url, scope, subpages) if scope else []
+    soup.decompose()
+    return rows, links
+
+# ukázková stránka, na které každý parser najde jeden řádek (projde celou svou cestou)
+_WARM_HTML = ("<html><body><h2>Liga</h2>"
+              "<div class='ev'><div><span>12:00</span> Alfa – Beta</div>"
+              "<div class='odds'><span>1.50</span><span>3.10</span><span>2.20</span></div></div>"
+              "<div id='content'><div class='matches'><h2>Dnes</h2><div class='match'>"
+              "<span class='team home'>Alfa</span><span class='team away'>Beta</span>"
+              "<span class='time'>12:00</span></div></div></div>"
+              "<table><tr><td>12:00 Alfa - Beta</td></tr></table></body></html>").encode()
+
+def _warm() -> Dict[str, int]:
+    """Initializer workeru: importy parserů + jeden parse každým z nich. Vrací řádky na parser."""
+    import bs4.builder._htmlparser, picks, sources, team_registry  # noqa: F401
+    return {kind: len(parse_page(kind, _WARM_HTML, ctx={"base": time.time()})[0]) for kind in PARSERS}
+
+def finish(kind: str, compact: List[Compact], ctx: dict) -> List[Row]:
+    """Kompaktní n-tice → Row (výkop jako datetime v CET; Tipsport vůči ctx["base"])."""
+    if kind == "tipsport":
+        from picks import _ko
+        base = datetime.fromtimestamp(ctx["base"], TZ)
+        return [(h, a, lg, _ko(hh, mm, base)) for h, a, lg, hh, mm in compact]
+    if kind == "tipsport_odds":
+        from picks import _ko
+        base = datetime.fromtimestamp(ctx["base"], TZ)
+        return [(h, a, lg, _ko(hh, mm, base), tuple(odds)) for h, a, lg, hh, mm, odds in compact]
+    return [(h, a, lg, datetime.fromtimestamp(ts, TZ) if ts is not None else None)
+            for h, a, lg, ts in compact]
+
+def _cache_ctx(kind: str, ctx: dict) -> tuple:
+    """Parametry, na kterých závisí kompaktní výstup (zdroje počítají datum z „dnes“)."""
+    if kind in ("tipsport", "tipsport_odds"):
+        return (ctx.get("max_nodes"), ctx.get("max_rows"))
+    return (ctx.get("days"), ctx.get("max_rows"), datetime.now(TZ).date().isoformat())
+
+# =============== POOL ===============
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+def enabled() -> bool:
+    return WORKERS > 1
+
+def _mp_context():
+    return mp.get_context("forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn")
+
+def pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers or WORKERS, mp_context=_mp_context(),
+                                        initializer=_warm)
+        return _pool
+
+def shutdown():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+def _parse_cached(kind: str, raw: bytes, url: str, scope: Optional[str], subpages: bool,
+                  ctx: dict) -> Tuple[List[Compact], List[str]]:
+    pc = page_cache.cache()
+    k = page_cache.key(kind, PARSER_VERSION, _cache_ctx(kind, ctx),
+                       (url, scope, subpages) if scope else None, body=raw)
+    hit = pc.get(k)
+    if hit is not None:
+        return hit
+    if enabled():
+        rows, links = pool().submit(parse_page, kind, raw, url, scope, subpages, ctx).result()
+    else:
+        rows, links = parse_page(kind, raw, url, scope, subpages, ctx)
+    pc.put(k, rows, links)
+    return rows, links
+
+def parse(kind: str, html: str, url: str = "", **ctx) -> List[Row]:
+    """Synchronní parse jedné stránky (z libovolného vlákna): cache → pool / v procesu."""
+    rows, _ = _parse_cached(kind, html.encode("utf-8"), url, None, True, ctx)
+    return finish(kind, rows, ctx)
+
+def tipsport_rows(html: str, base: datetime, max_nodes: int = 800, max_rows: int = 200):
+    """Náhrada picks._parse_tipsport_rows se stejnou signaturou (pro multisport pluginy)."""
+    return parse("tipsport", html, base=base.timestamp(), max_nodes=max_nodes, max_rows=max_rows)
+
+def tipsport_odds_rows(html: str, base: datetime, max_nodes: int = 800, max_rows: int = 200):
+    """Jako tipsport_rows, ale řádek má navíc n-tici vypsaných kurzů (1, 2 / 1, X, 2)."""
+    return parse("tipsport_odds", html, base=base.timestamp(), max_nodes=max_nodes, max_rows=max_rows)
+
+def crawl(kind: str, start_urls: List[str], fetch: Callable[[str], Optional[str]],
+          scope: Optional[str] = None, max_pages: int = CRAWL_MAX_PAGES, subpages: bool = True,
+          inflight: Optional[int] = None, **ctx) -> Iterator[Tuple[str, List[Row]]]:
+    """
+    BFS jako crawl.crawl_pages, ale stahování běží ve vláknech a parse v procesech;
+    v letu je až `inflight` stránek. Vrací (url, řádky) v pořadí dokončení.
+    """
+    inflight = inflight or max(2, 2 * WORKERS)
+    queue = deque(start_urls)
+    seen = set(queue)
+    scope = scope or (queue[0] if queue else "")
+    pages = 0
+
+    def job(url: str):
+        html = fetch(url)
+        if not html:
+            return url, [], []
+        rows, links = _parse_cached(kind, html.encode("utf-8"), url, scope, subpages, ctx)
+        return url, rows, links
+
+    job = deadline.bind(job)                # fetch ve vláknech vidí rozpočet příkazu
+    pending = set()
+    with ThreadPoolExecutor(max_workers=inflight) as io:
+        while queue or pending:
+            while queue and len(pending) < inflight and pages < max_pages:
+                pending.add(io.submit(job, queue.popleft()))
+                pages += 1
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                try:
+                    url, rows, links = f.result()
+                except Exception:
+                    continue
+                for link in links:
+                    if link not in seen:
+                        seen.add(link)
+                        queue.append(link)
+                yield url, finish(kind, rows, ctx)
+
+# =============== BENCHMARK ===============
+def _synthetic_pages(n: int = 50, rows: int = 400) -> List[bytes]:
+    out = []
+    for p in range(n):
+        body = "".join(
+            f"<div class='ev'><div><span>{(i % 24):02d}:{(i * 7) % 60:02d}</span> "
+            f"Home {p}-{i} – Away {p}-{i}</div><div class='odds'><span>1.{i % 90 + 10}</span>"
+            f"<span>3.{i % 50 + 10}</span><span>2.{i % 70 + 10}</span></div></div>"
+            for i in range(rows))
+        out.append(f"<html><body><h2>Liga {p}</h2>{body}</body></html>".encode())
+    return out
+
+def _bench(path: Optional[str] = None) -> None:
+    if path:
+        files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith((".html", ".htm")))[:50]
+        pages = [open(f, "rb").read() for f in files]
+    else:
+        pages = _synthetic_pages()
+    ctx = {"base": time.time()}
+    mb = sum(map(len, pages)) / 1e6
+
+    t0 = time.perf_counter()
+    n_rows = sum(len(parse_page("tipsport", p, ctx=ctx)[0]) for p in pages)
+    serial = time.perf_counter() - t0
+    print(f"{len(pages)} stránek ({mb:.1f} MB), {n_rows} řádků; jader {os.cpu_count()}")
+    print(f"  v procesu:  {serial:6.2f} s  ({len(pages) / serial:5.1f} str/s)")
+
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for w in counts:
+        ex = ProcessPoolExecutor(max_workers=w, mp_context=_mp_context(), initializer=_warm)
+        list(ex.map(_warm_noop, range(w)))            # start + warm-up mimo měření
+        t0 = time.perf_counter()
+        got = sum(len(r) for r, _ in ex.map(parse_page, ["tipsport"] * len(pages), pages,
+                                            [""] * len(pages), [None] * len(pages),
+                                            [True] * len(pages), [ctx] * len(pages)))
+        dt = time.perf_counter() - t0
+        ex.shutdown()
+        print(f"  pool {w:2d}:    {dt:6.2f} s  ({len(pages) / dt:5.1f} str/s, ×{serial / dt:.2f}) řádků {got}")
+
+def _warm_noop(_):
+    return None
+
+if __name__ == "__main__":
+    _bench(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -5,18 +5,19 @@ from __future__ import annotations
 import os, re, time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Iterable
+from itertools import islice
+from typing import List, Optional, Iterable, Iterator, Tuple
 
-import requests
 from bs4 import BeautifulSoup
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from fetch import get_text, TIMEOUT
+from crawl import CRAWL_MAX_PAGES, CRAWL_MODE, crawl_pages
+from team_registry import clean, match_key, plausible
+import deadline
+import parse_pool
 
 # =============== KONFIG ===============
-UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-      "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
 TZ = timezone(timedelta(hours=1))                       # CET/CEST
-TIMEOUT = (7, 14)
 
 # Tipsport fotbal katalog (mobil)
 TIPSPORT_URL_FOOT = os.getenv("TIPSPORT_URL_FOOT", "https://m.tipsport.cz/kurzy/fotbal-16")
@@ -44,24 +45,9 @@ class Tip:
     odds: Optional[float] = None
     url: Optional[str] = None
     kickoff: Optional[datetime] = None
+    sport: str = "fotbal"
 
 # =============== HELPERY ===============
-def _session() -> requests.Session:
-    s = requests.Session()
-    s.headers.update({
-        "User-Agent": UA,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "cs-CZ,cs;q=0.9,en-US;q=0.8",
-        "Cache-Control": "no-cache",
-        "Pragma": "no-cache",
-        "Connection": "close",
-        "Referer": "https://www.google.com/",
-    })
-    retry = Retry(total=3, backoff_factor=0.6, status_forcelist=[429, 500, 502, 503, 504])
-    s.mount("https://", HTTPAdapter(max_retries=retry))
-    s.mount("http://", HTTPAdapter(max_retries=retry))
-    return s
-
 def _within_preferred(league_text: str) -> bool:
     if not STRICT_LEAGUES:
         return True
@@ -82,35 +68,55 @@ def _window_from_avg(minute: float) -> str:
 def _dedup_keep_best(tips: Iterable[Tip]) -> List[Tip]:
     seen = {}
     for t in tips:
-        key = (t.match.lower().strip(), t.kickoff.strftime("%Y-%m-%d %H:%M") if t.kickoff else "")
+        key = (match_key(t.match), t.kickoff.strftime("%Y-%m-%d %H:%M") if t.kickoff else "")
         if key not in seen or t.confidence > seen[key].confidence:
             seen[key] = t
     return list(seen.values())
 
 # =============== TISPPORT SCRAPER (MOBIL) ===============
-def _scrape_tipsport_list(day_shift: int) -> List[Tip]:
-    """
-    Parsuje mobilní Tipsport katalog fotbalu.
-    day_shift: 0=dnes, 1=zítra (pokusný filtr ?timeFilter=tomorrow; když nefunguje, bereme vše)
-    """
-    base = datetime.now(timezone.utc).astimezone(TZ) + timedelta(days=day_shift)
-    url = TIPSPORT_URL_FOOT if day_shift == 0 else (TIPSPORT_URL_FOOT + "?timeFilter=tomorrow")
-
-    s = _session()
-    try:
-        r = s.get(url, timeout=TIMEOUT)
-        if r.status_code != 200:
-            return []
-        html = r.text
-    except Exception:
-        return []
+# (home, away, league, kickoff) – společný výstup parseru pro všechny sporty
+Row = Tuple[str, str, str, datetime]
 
+def _parse_tipsport_rows(html: str, base: datetime, max_nodes: int = 800,
+                         max_rows: int = 200) -> List[Row]:
+    """Řádky katalogu Tipsport (mobil): čas + dvojice týmů + soutěž poblíž. Sportově nezávislé."""
     soup = BeautifulSoup(html, "html.parser")
-    tips: List[Tip] = []
+    return list(islice(_iter_tipsport_rows(soup, base, max_nodes), max_rows))
+
+def _iter_tipsport_rows(soup: BeautifulSoup, base: datetime,
+                        max_nodes: Optional[int] = None) -> Iterator[Row]:
+    """Generátor řádků z jedné stránky; bez limitů pro crawl režim."""
+    for home, away, league, hh, mm in _iter_tipsport_raw(soup, max_nodes):
+        yield (home, away, league, _ko(hh, mm, base))
+
+_RX_TIME = re.compile(r"\d{1,2}:\d{2}")
+_RX_ODD = re.compile(r"(?<![\d:.,])(\d{1,3}[.,]\d{2})(?![\d:.]|,\d)")   # „20.10.“ (datum) není kurz
 
+def _row_odds(wrap) -> Tuple[float, ...]:
+    """
+    Kurzy řádku v pořadí nabídky (1, 2 nebo 1, X, 2; nejvýš tři). Hledá se v kontejneru
+    řádku a o úroveň výš, jen dokud v něm není jiný zápas (jiný čas výkopu).
+    """
+    box = wrap
+    for _ in range(2):
+        odds = [float(x.replace(",", ".")) for x in _RX_ODD.findall(box.get_text(" ", strip=True))]
+        odds = [o for o in odds if o > 1.0]
+        if len(odds) >= 2:
+            return tuple(odds[:3])
+        box = box.parent
+        if box is None or len(box.find_all(string=_RX_TIME)) > 1:
+            break
+    return ()
+
+def _iter_tipsport_raw(soup: BeautifulSoup, max_nodes: Optional[int] = None,
+                       odds: bool = False) -> Iterator[tuple]:
+    """
+    (home, away, league, hodina, minuta) – nezávislé na čase parsování (kešovatelné).
+    odds=True přidá n-tici vypsaných kurzů řádku (viz _row_odds; prázdná = nenalezeno).
+    """
     # Najdi řádky s časem a párem týmů v okolí
-    rows = soup.find_all(string=re.compile(r"\d{1,2}:\d{2}"))[:800]
-    for node in rows:
+    nodes = soup.find_all(string=_RX_TIME)
+    for node in (nodes[:max_nodes] if max_nodes else nodes):
         line = node if isinstance(node, str) else node.get_text(" ", strip=True)
 
         # vyšší kontejner pro název a soutěž
@@ -128,8 +134,10 @@ def _scrape_tipsport_list(day_shift: int) -> List[Tip]:
         mp = re.search(r"([^\n\-–]+?)\s*[–-]\s*([^\n]+)", text_blk)
         if not mp:
             continue
-        home = mp.group(1).strip()
-        away = mp.group(2).strip()
+        home = clean(mp.group(1))
+        away = clean(mp.group(2))
+        if not (plausible(home) and plausible(away)):
+            continue                    # slepený řádek / navigace – do registru týmů nepatří
 
         # soutěž poblíž
         league = "Tipsport"
@@ -140,15 +148,37 @@ def _scrape_tipsport_list(day_shift: int) -> List[Tip]:
                 if t and not re.fullmatch(r"[\d\.\s:]+", t):
                     league = t
 
+        if odds:
+            yield (home, away, league, hh, mm, _row_odds(wrap) if wrap else ())
+        else:
+            yield (home, away, league, hh, mm)
+
+def _catalog_url(url: str, day_shift: int) -> str:
+    return url if day_shift == 0 else (url + "?timeFilter=tomorrow")
+
+def _scrape_tipsport_list(day_shift: int) -> List[Tip]:
+    """
+    Parsuje mobilní Tipsport katalog fotbalu.
+    day_shift: 0=dnes, 1=zítra (pokusný filtr ?timeFilter=tomorrow; když nefunguje, bereme vše)
+    """
+    base = datetime.now(timezone.utc).astimezone(TZ) + timedelta(days=day_shift)
+    html = get_text(_catalog_url(TIPSPORT_URL_FOOT, day_shift), timeout=TIMEOUT)
+    if not html:
+        return []
+    return _football_tips(parse_pool.tipsport_rows(html, base))   # page_cache + pool
+
+def _football_tips(rows: Iterable[Row]) -> List[Tip]:
+    return list(_iter_football_tips(rows))
+
+def _iter_football_tips(rows: Iterable[Row]) -> Iterator[Tip]:
+    for home, away, league, ko in rows:
         if not _within_preferred(league):
             continue
 
-        ko = _ko(hh, mm, base)
-
         # jednoduché skóre důvěry pro „gól do poločasu“ (držíme >=90 %)
         # (dokud netaháme statistiky z detailu, držíme vysoké jen u vybraných soutěží)
         conf = 90
-        tip = Tip(
+        yield Tip(
             match=f"{home} – {away}",
             league=league,
             market="Gól v 1. poločase: ANO (Over 0.5 HT)",
@@ -159,14 +189,48 @@ def _scrape_tipsport_list(day_shift: int) -> List[Tip]:
             url=TIPSPORT_URL_FOOT,
             kickoff=ko,
         )
-        tips.append(tip)
-
-        if len(tips) >= 200:
-            break
 
-    return tips
+def crawl_tipsport(day_shift: int, url: str = TIPSPORT_URL_FOOT) -> Iterator[Row]:
+    """
+    Celý katalog: stránkování + podstránky lig, řádky odcházejí průběžně (bez stropů).
+    Odkazy se sledují jen z dnešního katalogu: podstránky filtr ?timeFilter nenesou, takže
+    se parsují s dnešní bází a zítřejší výkopy dopočte _ko. Ze zítřejšího filtru (day_shift=1)
+    se bere jen filtrovaná stránka sama – jinak by podstránky dostaly bázi +1 den.
+    """
+    base = datetime.now(timezone.utc).astimezone(TZ) + timedelta(days=day_shift)
+    max_pages = CRAWL_MAX_PAGES if day_shift == 0 else 1
+    if parse_pool.enabled():
+        # stahování ve vláknech, parse v procesech (víc jader)
+        for _, rows in parse_pool.crawl("tipsport", [_catalog_url(url, day_shift)],
+                                        fetch=lambda u: get_text(u, timeout=TIMEOUT),
+                                        scope=url, max_pages=max_pages, base=base.timestamp()):
+            yield from rows
+        return
+    for _, soup in crawl_pages([_catalog_url(url, day_shift)], scope=url, max_pages=max_pages):
+        yield from _iter_tipsport_rows(soup, base)
 
 # =============== HLAVNÍ FUNKCE ===============
+def iter_first_half_goal_candidates(hours_window: int = 24) -> Iterator[Tip]:
+    """
+    Crawl režim: projde celý katalog (dnes + zítra) a tipy, které projdou oknem
+    a MIN_CONF, pouští dál hned po naparsování své stránky. Duplicity přeskočí.
+    """
+    now = datetime.now(timezone.utc).astimezone(TZ)
+    until = now + timedelta(hours=max(1, min(72, hours_window)))
+    seen = set()
+    for day_shift in (0, 1):
+        try:
+            for t in _iter_football_tips(crawl_tipsport(day_shift)):
+                if not (t.kickoff and now <= t.kickoff <= until and t.confidence >= MIN_CONF):
+                    continue
+                key = (match_key(t.match), t.kickoff.strftime("%Y-%m-%d %H:%M"))
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield t
+        except Exception:
+            continue
+
 def find_first_half_goal_candidates(limit: int = 3, hours_window: int = 24) -> List[Tip]:
     """
     1) Natáhni Tipsport fotbal (dnes + zítra)
@@ -174,19 +238,19 @@ def find_first_half_goal_candidates(limit: int = 3, hours_window: int = 24) -> L
     3) Deduplikace, confidence >= MIN_CONF, seřadit, omezit na limit
     4) BEZ FALLBACKU – když nic, vrať [].
     """
+    tips: List[Tip] = []
+    if CRAWL_MODE:
+        tips = list(iter_first_half_goal_candidates(hours_window))
+    else:
+        tips += deadline.attempt("Tipsport dnes", _scrape_tipsport_list, 0, default=[])
+        tips += deadline.attempt("Tipsport zítra", _scrape_tipsport_list, 1, default=[])
+    return select_candidates(tips, limit, hours_window)
+
+def select_candidates(tips: Iterable[Tip], limit: int = 3, hours_window: int = 24) -> List[Tip]:
+    """Kroky 2–3 nad už staženými tipy (i z workqueue.py)."""
     now = datetime.now(timezone.utc).astimezone(TZ)
     until = now + timedelta(hours=max(1, min(72, hours_window)))
 
-    tips: List[Tip] = []
-    try:
-        tips += _scrape_tipsport_list(0)  # dnes
-    except Exception:
-        pass
-    try:
-        tips += _scrape_tipsport_list(1)  # zítra
-    except Exception:
-        pass
-
     # časové okno + min. confidence
     filtered: List[Tip] = []
     for t in tips:
@@ -0,0 +1,345 @@
+# prefs.py — předvolby chatů (ligy, trhy, min. důvěra, okna, max. tipů/den) + index pro rozesílání
+# Stejné předvolby má typicky hodně chatů → chaty se seskupí do profilů a index se staví
+# nad profily. Každý profil = jeden bit; pro ligu, trh, důvěru (0–100) a hodinu do výkopu
+# je předpočítaná maska profilů, které ji chtějí. Jeden tip = 4 lookupy + AND masek, takže
+# jedno kolo rozesílání projde tipy jednou pro všechny chaty, ne jednou na chat.
+#
+# Denní počty rozeslaných tipů (max. tipů/den) leží vedle předvoleb v <PREFS_PATH>.sent.json,
+# takže restart bota během dne strop nevynuluje.
+#
+#   PREFS_PATH=prefs.json   PUSH_INTERVAL_S=300   (0 = bez automatického rozesílání)
+#
+#   /prefs                          – ukázat
+#   /prefs conf 85 | max 5 | on | off | reset
+#   /prefs ligy Premier League, LaLiga     (- = všechny)
+#   /prefs trhy 1H_GOAL_YES, BTTS_YES      (- = všechny)
+#   /prefs okna 1-3, 8-12
+
+from __future__ import annotations
+import json, os, threading, time
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+PREFS_PATH = os.getenv("PREFS_PATH", "prefs.json")
+PUSH_INTERVAL_S = float(os.getenv("PUSH_INTERVAL_S", "300"))
+MAX_HOURS = 72                  # okna se počítají po celých hodinách 0..MAX_HOURS
+
+Window = Tuple[int, int]        # hodiny od teď [od, do)
+
+@dataclass(frozen=True)
+class Prefs:
+    leagues: FrozenSet[str] = frozenset()       # prázdné = všechny
+    markets: FrozenSet[str] = frozenset()       # kódy MarketDef; prázdné = všechny
+    min_conf: int = 90
+    windows: Tuple[Window, ...] = ((1, 3),)
+    max_per_day: int = 10
+    push: bool = False                          # automatické rozesílání
+
+    def accepts(self, tip, now: Optional[float] = None) -> bool:
+        """Jednotlivý tip (pro /tip – tam okno určuje příkaz, proto bez kontroly oken)."""
+        return ((not self.leagues or getattr(tip, "league", "") in self.leagues)
+                and (not self.markets or market_code(getattr(tip, "market", "")) in self.markets)
+                and int(getattr(tip, "confidence", 0) or 0) >= self.min_conf)
+
+DEFAULT = Prefs()
+
+@lru_cache(maxsize=1024)
+def market_code(market: str) -> str:
+    from settle import market_code as code
+    return code(market) or market
+
+# =============== ÚLOŽIŠTĚ ===============
+def _dump(p: Prefs) -> dict:
+    """Jen pole, která se liší od defaultu (krátké klíče)."""
+    out = {}
+    if p.leagues:
+        out["l"] = sorted(p.leagues)
+    if p.markets:
+        out["m"] = sorted(p.markets)
+    if p.min_conf != DEFAULT.min_conf:
+        out["c"] = p.min_conf
+    if p.windows != DEFAULT.windows:
+        out["w"] = [list(w) for w in p.windows]
+    if p.max_per_day != DEFAULT.max_per_day:
+        out["n"] = p.max_per_day
+    if p.push:
+        out["p"] = 1
+    return out
+
+def _load(d: dict) -> Prefs:
+    return Prefs(frozenset(d.get("l") or ()), frozenset(d.get("m") or ()), int(d.get("c", DEFAULT.min_conf)),
+                 tuple(tuple(w) for w in d["w"]) if d.get("w") else DEFAULT.windows,
+                 int(d.get("n", DEFAULT.max_per_day)), bool(d.get("p")))
+
+class PrefStore:
+    def __init__(self, path: Optional[str] = PREFS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._prefs: Dict[int, Prefs] = {}
+        self._sent: Dict[int, Tuple[date, int]] = {}     # chat → (den, počet rozeslaných)
+        self.version = 0
+        self._index: Optional[PrefIndex] = None
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._prefs = {int(k): _load(v) for k, v in json.load(f).items()}
+            except Exception as e:
+                print(f"[WARN] prefs {path}: {e}")
+        if self.sent_path and os.path.exists(self.sent_path):
+            try:
+                with open(self.sent_path, "r", encoding="utf-8") as f:
+                    self._sent = {int(k): (date.fromisoformat(d), int(n)) for k, (d, n) in json.load(f).items()}
+            except Exception as e:
+                print(f"[WARN] prefs {self.sent_path}: {e}")
+
+    @property
+    def sent_path(self) -> Optional[str]:
+        return os.path.splitext(self.path)[0] + ".sent.json" if self.path else None
+
+    def get(self, chat: int) -> Prefs:
+        return self._prefs.get(chat, DEFAULT)
+
+    def set(self, chat: int, p: Prefs):
+        with self._lock:
+            if p == DEFAULT:
+                self._prefs.pop(chat, None)
+            else:
+                self._prefs[chat] = p
+            self.version += 1
+            self._index = None
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        _write_json(self.path, {str(k): _dump(v) for k, v in self._prefs.items()})
+
+    def index(self) -> "PrefIndex":
+        with self._lock:
+            if self._index is None:
+                self._index = PrefIndex({c: p for c, p in self._prefs.items() if p.push})
+            return self._index
+
+    # ---------- denní strop ----------
+    def quota(self, chat: int, today: date) -> int:
+        d, n = self._sent.get(chat, (today, 0))
+        return self.get(chat).max_per_day - (n if d == today else 0)
+
+    def count(self, chat: int, today: date, n: int):
+        with self._lock:
+            d, old = self._sent.get(chat, (today, 0))
+            self._sent[chat] = (today, (old if d == today else 0) + n)
+            # starší dny už strop neovlivní → do souboru jen dnešek
+            self._sent = {c: dn for c, dn in self._sent.items() if dn[0] >= today}
+            if self.sent_path:
+                try:
+                    _write_json(self.sent_path, {str(c): [d.isoformat(), k] for c, (d, k) in self._sent.items()})
+                except OSError as e:
+                    print(f"[WARN] prefs {self.sent_path}: {e}")
+
+def _write_json(path: str, doc: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+# =============== INDEX ===============
+class PrefIndex:
+    """Profily (unikátní Prefs) jako bity; masky pro ligu, trh, důvěru a hodinu do výkopu."""
+
+    def __init__(self, chats: Dict[int, Prefs]):
+        self.profiles: List[Prefs] = []
+        self.chats: List[List[int]] = []
+        pid: Dict[Prefs, int] = {}
+        for chat, p in sorted(chats.items()):
+            i = pid.setdefault(p, len(pid))
+            if i == len(self.profiles):
+                self.profiles.append(p)
+                self.chats.append([])
+            self.chats[i].append(chat)
+
+        self.any_league = self.any_market = 0
+        self.by_league: Dict[str, int] = {}
+        self.by_market: Dict[str, int] = {}
+        self.by_conf = [0] * 101
+        self.by_hour = [0] * (MAX_HOURS + 1)
+        for i, p in enumerate(self.profiles):
+            bit = 1 << i
+            if p.leagues:
+                for lg in p.leagues:
+                    self.by_league[lg] = self.by_league.get(lg, 0) | bit
+            else:
+                self.any_league |= bit
+            if p.markets:
+                for m in p.markets:
+                    self.by_market[m] = self.by_market.get(m, 0) | bit
+            else:
+                self.any_market |= bit
+            for c in range(max(0, p.min_conf), 101):
+                self.by_conf[c] |= bit
+            for a, b in p.windows:
+                for h in range(max(0, a), min(b, MAX_HOURS + 1)):
+                    self.by_hour[h] |= bit
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    @property
+    def floor(self) -> int:
+        """Nejnižší min. důvěra přes profily – pod ni nemá smysl tipy z indexu vůbec tahat."""
+        return min((p.min_conf for p in self.profiles), default=100)
+
+    def mask(self, tip, now: float) -> int:
+        ko = getattr(tip, "kickoff", None)
+        if ko is None:
+            return 0
+        h = int((ko.timestamp() - now) // 3600)
+        if not 0 <= h <= MAX_HOURS:
+            return 0
+        conf = min(100, max(0, int(getattr(tip, "confidence", 0) or 0)))
+        return (self.by_hour[h] & self.by_conf[conf]
+                & (self.any_league | self.by_league.get(getattr(tip, "league", ""), 0))
+                & (self.any_market | self.by_market.get(market_code(getattr(tip, "market", "")), 0)))
+
+    def plan(self, tips: Iterable, now: Optional[float] = None) -> Dict[int, List]:
+        """Profil → tipy (výkop ↑ = nejnaléhavější první); každý tip se vyhodnotí jednou."""
+        now = time.time() if now is None else now
+        out: Dict[int, List] = {}
+        ordered = sorted((t for t in tips if getattr(t, "kickoff", None) is not None),
+                         key=lambda t: (t.kickoff.timestamp(), -(t.confidence or 0)))
+        for t in ordered:
+            m = self.mask(t, now)
+            while m:
+                low = m & -m
+                out.setdefault(low.bit_length() - 1, []).append(t)
+                m ^= low
+        return out
+
+def deliveries(store: PrefStore, tips: Iterable, seen, now: Optional[float] = None,
+               today: Optional[date] = None) -> List[Tuple[int, List]]:
+    """
+    Jedno kolo rozesílání: [(chat, tipy)] seřazené podle nejbližšího výkopu mezi chaty.
+    seen(chat, tip) → True = už odesláno (anti-dup volajícího, jen dotaz); denní strop
+    z předvoleb. Jen plán – nic neoznačí ani nezapočítá; po úspěšném odeslání volající
+    zavolá delivered(), neodeslané tipy tak přijdou v dalším kole.
+    """
+    now = time.time() if now is None else now
+    today = today or _day(now)
+    ix = store.index()
+    out = []
+    for pid, ptips in ix.plan(tips, now).items():
+        for chat in ix.chats[pid]:
+            left = store.quota(chat, today)
+            picked = []
+            for t in ptips:
+                if len(picked) >= left:
+                    break
+                if not seen(chat, t):
+                    picked.append(t)
+            if picked:
+                out.append((chat, picked))
+    out.sort(key=lambda ct: (ct[1][0].kickoff.timestamp(), ct[0]))
+    return out
+
+def delivered(store: PrefStore, chat: int, tips: List, now: Optional[float] = None):
+    """Tipy opravdu odešly → započítat do denního stropu chatu."""
+    store.count(chat, _day(time.time() if now is None else now), len(tips))
+
+def _day(now: float) -> date:
+    return datetime.fromtimestamp(now).date()
+
+# =============== /prefs ===============
+USAGE = ("/prefs conf 85 | max 5 | on | off | reset\n"
+         "/prefs ligy Premier League, LaLiga  (- = všechny)\n"
+         "/prefs trhy 1H_GOAL_YES, BTTS_YES  (- = všechny)\n"
+         "/prefs okna 1-3, 8-12")
+
+_KEYS = {"ligy": "leagues", "leagues": "leagues", "trhy": "markets", "markets": "markets",
+         "conf": "min_conf", "okna": "windows", "windows": "windows", "max": "max_per_day"}
+
+def apply_command(p: Prefs, args: List[str]) -> Prefs:
+    """Argumenty /prefs → nové předvolby; ValueError = chybný zápis (text pro uživatele)."""
+    if not args:
+        return p
+    cmd, rest = args[0].lower(), " ".join(args[1:]).strip()
+    if cmd in ("on", "off"):
+        return replace(p, push=cmd == "on")
+    if cmd == "reset":
+        return DEFAULT
+    key = _KEYS.get(cmd)
+    if key is None:
+        raise ValueError(f"neznámá volba „{cmd}“")
+    if key in ("leagues", "markets"):
+        items = frozenset() if rest in ("", "-") else frozenset(x.strip() for x in rest.split(",") if x.strip())
+        if key == "markets":
+            items = frozenset(market_code(x) if market_code(x) != x else x.upper() for x in items)
+        return replace(p, **{key: items})
+    if key == "windows":
+        wins = []
+        for part in rest.replace(" ", "").split(","):
+            a, _, b = part.partition("-")
+            if not (a.isdigit() and b.isdigit()) or not 0 <= int(a) < int(b) <= MAX_HOURS:
+                raise ValueError(f"okno „{part}“ (čekám např. 1-3)")
+            wins.append((int(a), int(b)))
+        return replace(p, windows=tuple(wins))
+    if not rest.isdigit():
+        raise ValueError(f"{cmd}: čekám číslo")
+    n = int(rest)
+    if key == "min_conf" and not 0 <= n <= 100:
+        raise ValueError("conf: 0–100")
+    return replace(p, **{key: n})
+
+def describe(p: Prefs) -> str:
+    wins = ", ".join(f"{a}–{b} h" for a, b in p.windows)
+    return (f"⚙️ Předvolby\n"
+            f"• ligy: {', '.join(sorted(p.leagues)) or 'všechny'}\n"
+            f"• trhy: {', '.join(sorted(p.markets)) or 'všechny'}\n"
+            f"• min. důvěra: {p.min_conf} %\n"
+            f"• okna: {wins}\n"
+            f"• max. tipů/den: {p.max_per_day}\n"
+            f"• rozesílání: {'zapnuto' if p.push else 'vypnuto'} (/prefs on|off)")
+
+_STORE: Optional[PrefStore] = None
+
+def store() -> PrefStore:
+    global _STORE
+    if _STORE is None:
+        _STORE = PrefStore()
+    return _STORE
+
+# =============== BENCHMARK ===============
+def _bench(chats: int = 20000, tips: int = 2000) -> None:
+    import random
+    from datetime import timedelta, timezone
+    from types import SimpleNamespace
+    rnd = random.Random(3)
+    tz = timezone(timedelta(hours=1))
+    leagues = [f"Liga {i}" for i in range(30)]
+    st = PrefStore(None)
+    for c in range(chats):
+        st._prefs[c] = Prefs(frozenset(rnd.sample(leagues, rnd.choice([0, 0, 1, 3]))), frozenset(),
+                             rnd.choice([80, 85, 90, 95]), rnd.choice([((1, 3),), ((1, 3), (8, 12)), ((0, 24),)]),
+                             push=True)
+    now = time.time()
+    ts = [SimpleNamespace(match=f"H{i} – A{i}", league=rnd.choice(leagues), market="Gól v 1. poločase: ANO",
+                          confidence=rnd.randint(70, 99),
+                          kickoff=datetime.fromtimestamp(now + rnd.uniform(0, 30 * 3600), tz)) for i in range(tips)]
+    t0 = time.perf_counter()
+    ix = st.index()
+    t_ix = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    plan = deliveries(st, ts, lambda c, t: False, now)
+    dt = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    naive = sum(1 for c, p in st._prefs.items() for t in ts
+                if p.accepts(t) and any(a <= (t.kickoff.timestamp() - now) // 3600 < b for a, b in p.windows))
+    t_naive = time.perf_counter() - t0
+    print(f"{chats} chatů → {len(ix)} profilů (index {t_ix * 1000:.0f} ms); {tips} tipů: "
+          f"rozpis {dt * 1000:.0f} ms pro {len(plan)} chatů; filtr po chatech {t_naive * 1000:.0f} ms "
+          f"({naive} shod)")
+
+if __name__ == "__main__":
+    import sys
+    _bench(*(int(a) for a in sys.argv[1:3]))
@@ -34,3 +34,53 @@ ANALYSIS_SCHEMA_EXAMPLE = {
     ],
     "decision": "SÁZET pouze BEZPEČNÝ pick (≥80 %)."
 }
+
+# ===== TIP → DOKUMENT ANALÝZY =====
+# Jeden dokument na zápas; víc tipů stejného zápasu = víc položek v "picks".
+# Statistiky ze "summary" tipy z picks/sources nenesou, takže zůstává jen okno a sport.
+from datetime import timedelta, timezone
+from itertools import groupby
+from typing import Iterable, Iterator, List
+
+from settle import market_code
+from team_registry import MATCH_SEP, match_key, slug
+
+SAFE_CONF = 80                  # hranice BEZPEČNÉ / RISK (viz "decision" v příkladu)
+_CET = timezone(timedelta(hours=1))
+
+def _pick(t) -> dict:
+    market = getattr(t, "market", "")
+    return {
+        "market_key": market_code(market) or slug(market),
+        "market_label": market,
+        "confidence_pct": int(t.confidence or 0),
+        "reason": getattr(t, "reason", ""),
+        "odds": getattr(t, "odds", None),
+        "bucket": "BEZPEČNÉ" if (t.confidence or 0) >= SAFE_CONF else "RISK",
+    }
+
+def analysis_from_tips(tips: List) -> dict:
+    """Tipy jednoho zápasu → dokument ve tvaru ANALYSIS_SCHEMA_EXAMPLE."""
+    first = tips[0]
+    ko = first.kickoff
+    picks = sorted((_pick(t) for t in tips), key=lambda p: -p["confidence_pct"])
+    safe = [p for p in picks if p["bucket"] == "BEZPEČNÉ"]
+    home, away = (MATCH_SEP.split(first.match, maxsplit=1) + [""])[:2]
+    return {
+        "match_id": f"{slug(home)}-{slug(away)}-{ko.astimezone(_CET):%Y%m%d%H%M}" if ko else slug(first.match),
+        "comp": getattr(first, "league", ""),
+        "kickoff_cet": ko.astimezone(_CET).isoformat() if ko else None,
+        "sources": {"tipsport": u for u in [getattr(first, "url", None)] if u},
+        "summary": {"window": getattr(first, "window", ""), "sport": getattr(first, "sport", "fotbal")},
+        "picks": picks,
+        "decision": (f"SÁZET pouze BEZPEČNÝ pick (≥{SAFE_CONF} %)." if safe
+                     else f"NESÁZET – žádný pick ≥{SAFE_CONF} %."),
+    }
+
+def iter_analyses(tips: Iterable) -> Iterator[dict]:
+    """Tipy (libovolné pořadí) → dokumenty po zápasech, seřazené podle výkopu."""
+    def k(t):
+        ko = getattr(t, "kickoff", None)
+        return (ko.timestamp() if ko else float("inf"), match_key(getattr(t, "match", "")))
+    for _, grp in groupby(sorted(tips, key=k), key=k):
+        yield analysis_from_tips(list(grp))
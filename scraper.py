@@ -1,14 +1,18 @@
 # scraper.py
 import re, time, random
-import requests
 from bs4 import BeautifulSoup
 
+from fetch import session
+
 HEADERS = {"User-Agent":"Mozilla/5.0 (compatible; FlamengoBot/1.0)"}
 
 def get_match_list(category_url:str)->list[dict]:
-    r = requests.get(category_url, headers=HEADERS, timeout=20)
+    r = session().get(category_url, headers=HEADERS, timeout=20)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "lxml")
+    return match_links(r.text)
+
+def match_links(html:str)->list[dict]:
+    soup = BeautifulSoup(html, "lxml")
     items = []
     for a in soup.select("a[href*='/kurzy/zapas/']"):
         href = a.get("href")
@@ -21,7 +25,7 @@ def get_match_list(category_url:str)->list[dict]:
 def tipsport_stats(match_url:str)->dict:
     # přepni na /statistiky
     stats_url = re.sub(r"/zapas/([^/]+)/(\d+).*", r"/zapas/\1/\2/statistiky", match_url)
-    r = requests.get(stats_url, headers=HEADERS, timeout=20)
+    r = session().get(stats_url, headers=HEADERS, timeout=20)
     r.raise_for_status()
     s = BeautifulSoup(r.text, "lxml")
     # příklady extrakcí – budeš doladit dle skutečné stránky
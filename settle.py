@@ -0,0 +1,69 @@
+# settle.py — vyhodnocení trhů podle výsledku zápasu (sdílí backtest.py, ledger.py, schema.py)
+# Jen výsledek a pravidla trhů, žádná strategie ani pipeline – import je levný, takže ledger
+# a schema nemusí tahat backtest (a přes něj tip_engine se všemi zdroji).
+#
+# Výsledek v JSON (stejný jako backtest.py, řádek historie):
+#   {"home":"Sevilla","away":"Getafe","ts_utc":1730186400,
+#    "result":{"ht":[1,0],"ft":[2,1],"corners":11,"cards":4}}
+
+from __future__ import annotations
+import json
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from markets import find_market, get_market_by_code
+
+CONF_BUCKETS: Tuple[int, ...] = (0, 50, 60, 70, 80, 90, 101)   # hranice pásem důvěry
+CORNERS_LINE = 9.5
+CARDS_LINE = 4.5
+
+@dataclass
+class Result:
+    ht: Tuple[int, int]
+    ft: Tuple[int, int]
+    corners: Optional[int] = None
+    cards: Optional[int] = None
+
+def result_from_json(res: dict) -> Result:
+    return Result(ht=tuple(res.get("ht", (0, 0))), ft=tuple(res.get("ft", (0, 0))),
+                  corners=res.get("corners"), cards=res.get("cards"))
+
+def load_results(path: str) -> List[Tuple[str, str, int, Result]]:
+    """JSON list řádků historie → (domácí, hosté, výkop ts, Result); řádky bez výsledku se přeskočí."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [(r["home"], r["away"], int(r["ts_utc"]), result_from_json(r["result"]))
+                for r in json.load(f) if r.get("result")]
+
+def settle_market(code: str, res: Result) -> Optional[bool]:
+    """True/False = výhra/prohra, None = nelze vyhodnotit (chybí data / neznámý trh)."""
+    hh, ha = res.ht
+    fh, fa = res.ft
+    if code in ("HT_GOAL_YES", "1H_GOAL_YES"):
+        return hh + ha > 0
+    if code == "FT_OU_1_5":
+        return fh + fa > 1.5
+    if code == "FT_OU_2_5":
+        return fh + fa > 2.5
+    if code == "BTTS_YES":
+        return fh > 0 and fa > 0
+    if code == "HOME_OVER_1_5":
+        return fh > 1.5
+    if code == "AWAY_OVER_1_5":
+        return fa > 1.5
+    if code == "CORNERS_OVER":
+        return None if res.corners is None else res.corners > CORNERS_LINE
+    if code == "CARDS_OVER":
+        return None if res.cards is None else res.cards > CARDS_LINE
+    return None
+
+def market_code(market: str) -> Optional[str]:
+    """Text trhu z tipu → kód pro settle_market (kód, Tipsport text nebo text z picks)."""
+    if get_market_by_code(market):
+        return market
+    m = find_market(market)
+    if m:
+        return m.code
+    low = market.lower()
+    if "1. poločas" in low and ("ano" in low or "over 0.5" in low):
+        return "HT_GOAL_YES"
+    return None
@@ -0,0 +1,394 @@
+# shm_catalog.py — sdílený katalog tipů pro víc procesů (mmap, pevné rozložení, bez kopírování)
+# Jeden refresher proces skenuje a publikuje; webhook workery (uvicorn --workers) jen mapují soubor
+# a čtou numpy pohledy přímo nad stránkami (žádné vlastní skenování, žádná kopie katalogu).
+# CatalogStore = totéž rozhraní pro dotazy jako TipStore (query/all/version), ale nad snímkem:
+# materializuje se jen to, co dotaz vrátí.
+#
+# Soubor (little-endian):
+#   hlavička  HEADER: magic, generace, čas vytvoření, počet tipů, počet řetězců, offsety
+#   tipy      TIP_DTYPE × n      – pevné záznamy; texty jsou indexy do tabulky řetězců
+#   řetězce   uint32 × (m + 1)   – offsety do UTF-8 blobu, pak blob (každý text jen jednou)
+#
+# Výměna verze: writer zapíše nový soubor vedle a os.replace() ho atomicky přejmenuje,
+# pak zvýší generaci v malém řídicím souboru (PATH.gen, 8 bajtů, taky mmap). Reader při
+# každém dotazu porovná generaci čtením z paměti (bez syscallu); když se změnila, namapuje
+# nový soubor. Starý mapping žije, dokud na něj drží odkaz rozpracované dotazy.
+#
+#   CATALOG_MODE=off|reader|writer   CATALOG_PATH=/dev/shm/flamengo_catalog   CATALOG_REFRESH_S=120
+#   WORKQUEUE=1 → refresher jen seeduje workqueue.py a skládá katalog z výsledků workerů
+#
+# Víc workerů (webhook přijímá kterýkoli, set_webhook + push/live smyčky jen vlastník zámku PATH.owner):
+#   CATALOG_MODE=writer python main.py                                          – jeden proces, publikuje sám
+#   python shm_catalog.py refresh &
+#   CATALOG_MODE=reader uvicorn main:asgi --factory --workers 4 --port $PORT    – readery
+# Stav v paměti procesu (listování /tip24, denní anti-dup, načtené /prefs) se mezi workery nesdílí.
+#
+#   python shm_catalog.py refresh    – refresher proces (smyčka)
+#   python shm_catalog.py bench      – publikace + čtení ve více procesech
+
+from __future__ import annotations
+import asyncio, fcntl, logging, mmap, os, struct, sys, tempfile, time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+log = logging.getLogger("kiki-catalog")
+
+MODE = os.getenv("CATALOG_MODE", "off").strip().lower()
+PATH = os.getenv("CATALOG_PATH") or os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "flamengo_catalog")
+REFRESH_S = float(os.getenv("CATALOG_REFRESH_S", "120"))
+
+MAGIC = b"FLCAT002"
+HEADER = struct.Struct("<8sQdIIQQQ")   # magic, gen, created, n_tips, n_str, tips_off, str_off, blob_off
+NONE = 0xFFFFFFFF                      # chybějící text
+SOURCES = ("picks", "sources")         # odkud tip pochází (picks = Tipsport sken, sources = /tip24)
+
+TIP_DTYPE = np.dtype([
+    ("kickoff", "<f8"), ("odds", "<f4"),
+    ("confidence", "<i2"), ("source", "u1"), ("_pad", "u1"),
+    ("match", "<u4"), ("league", "<u4"), ("market", "<u4"), ("window", "<u4"),
+    ("reason", "<u4"), ("url", "<u4"), ("sport", "<u4"),
+])
+_TEXT = ("match", "league", "market", "window", "reason", "url", "sport")
+
+# =============== WRITER ===============
+def _encode(tips: Iterable[Tuple[str, object]]) -> Tuple[np.ndarray, List[bytes]]:
+    strings: Dict[str, int] = {}
+    table: List[bytes] = []
+
+    def sid(s: Optional[str]) -> int:
+        if s is None:
+            return NONE
+        i = strings.get(s)
+        if i is None:
+            i = strings[s] = len(table)
+            table.append(s.encode("utf-8"))
+        return i
+
+    rows = []
+    for source, t in tips:
+        ko = getattr(t, "kickoff", None)
+        if ko is None:
+            continue
+        odds = getattr(t, "odds", None)
+        rows.append((ko.timestamp(), np.nan if odds is None else odds, int(t.confidence or 0),
+                     SOURCES.index(source), 0) + tuple(
+            sid(getattr(t, f, None) if f != "sport" else getattr(t, "sport", "fotbal")) for f in _TEXT))
+    return np.array(rows, dtype=TIP_DTYPE), table
+
+def publish(tips: Iterable[Tuple[str, object]], path: str = PATH) -> int:
+    """[(zdroj, Tip)] → nový soubor katalogu + posun generace. Vrací novou generaci."""
+    arr, table = _encode(tips)
+    offs = np.zeros(len(table) + 1, dtype="<u4")
+    np.cumsum([len(b) for b in table], out=offs[1:])
+    gen = _gen_file(path).next()
+
+    tips_off = _align(HEADER.size)
+    str_off = _align(tips_off + arr.nbytes)
+    blob_off = str_off + offs.nbytes
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, gen, time.time(), len(arr), len(table), tips_off, str_off, blob_off))
+        f.write(b"\0" * (tips_off - HEADER.size))
+        f.write(arr.tobytes())
+        f.write(b"\0" * (str_off - tips_off - arr.nbytes))
+        f.write(offs.tobytes())
+        f.write(b"".join(table))
+    os.replace(tmp, path)
+    _gen_file(path).set(gen)                  # až teď reader uvidí novou verzi
+    return gen
+
+def _align(n: int, to: int = 8) -> int:
+    return (n + to - 1) // to * to
+
+class _GenFile:
+    """8bajtový čítač generace v mmap (writer i readery sdílí stejné stránky)."""
+
+    def __init__(self, path: str):
+        fd = os.open(path + ".gen", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < 8:
+                os.ftruncate(fd, 8)
+            self._mm = mmap.mmap(fd, 8)
+        finally:
+            os.close(fd)
+        self._view = np.frombuffer(self._mm, dtype="<u8", count=1)
+
+    def get(self) -> int:
+        return int(self._view[0])
+
+    def next(self) -> int:
+        return self.get() + 1
+
+    def set(self, gen: int):
+        self._view[0] = gen
+
+_GENS: Dict[str, _GenFile] = {}
+
+def _gen_file(path: str) -> _GenFile:
+    g = _GENS.get(path)
+    if g is None:
+        g = _GENS[path] = _GenFile(path)
+    return g
+
+# =============== READER ===============
+class Snapshot:
+    """Jedna namapovaná verze katalogu; tips je numpy pohled přímo nad mmap."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.generation, self.created, n, m, tips_off, str_off, blob_off = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: není katalog")
+        self.tips = np.frombuffer(self._mm, dtype=TIP_DTYPE, count=n, offset=tips_off)
+        self._offs = np.frombuffer(self._mm, dtype="<u4", count=m + 1, offset=str_off)
+        self._blob = memoryview(self._mm)[blob_off:]
+        self._ids: Optional[Dict[str, int]] = None
+
+    def string_id(self, s: str) -> Optional[int]:
+        """Text → index v tabulce řetězců (pro filtr ligy/trhu); tabulka se dekóduje jednou za snímek."""
+        if self._ids is None:
+            self._ids = {self.string(i): i for i in range(len(self._offs) - 1)}
+        return self._ids.get(s)
+
+    def __len__(self) -> int:
+        return len(self.tips)
+
+    def string(self, i: int) -> Optional[str]:
+        if i == NONE:
+            return None
+        return bytes(self._blob[self._offs[i]:self._offs[i + 1]]).decode("utf-8")
+
+    def select(self, source: Optional[str] = None, t0: float = -np.inf, t1: float = np.inf,
+               min_conf: int = 0, **text: str) -> np.ndarray:
+        """Indexy záznamů podle filtru – vektorově nad pohledem, nic se nekopíruje.
+        text = rovnost textového sloupce (league=…, market=…)."""
+        t = self.tips
+        mask = (t["kickoff"] >= t0) & (t["kickoff"] < t1) & (t["confidence"] >= min_conf)
+        if source is not None:
+            mask &= t["source"] == SOURCES.index(source)
+        for col, val in text.items():
+            sid = self.string_id(val)
+            if sid is None:
+                return np.empty(0, dtype=np.intp)
+            mask &= t[col] == sid
+        return np.flatnonzero(mask)
+
+    def ranked(self, idx: np.ndarray) -> np.ndarray:
+        """Indexy v pořadí TipStore.query: důvěra ↓, výkop ↑."""
+        t = self.tips[idx]
+        return idx[np.lexsort((t["kickoff"], -t["confidence"].astype(np.int32)))]
+
+    def tip(self, i: int):
+        """Záznam → picks.Tip (materializuje se jen to, co se opravdu posílá)."""
+        from picks import Tip, TZ
+        r = self.tips[i]
+        odds = float(r["odds"])
+        return Tip(match=self.string(r["match"]), league=self.string(r["league"]) or "",
+                   market=self.string(r["market"]) or "", confidence=int(r["confidence"]),
+                   window=self.string(r["window"]) or "", reason=self.string(r["reason"]) or "",
+                   odds=None if np.isnan(odds) else round(odds, 2), url=self.string(r["url"]),
+                   kickoff=datetime.fromtimestamp(float(r["kickoff"]), TZ),
+                   sport=self.string(r["sport"]) or "fotbal")
+
+    def all(self, source: Optional[str] = None, limit: Optional[int] = None) -> List:
+        return [self.tip(i) for i in self.select(source)[:limit]]
+
+class CatalogReader:
+    def __init__(self, path: str = PATH):
+        self.path = path
+        self._gen = _gen_file(path)
+        self._snap: Optional[Snapshot] = None
+
+    @property
+    def generation(self) -> int:
+        return self._snap.generation if self._snap is not None else 0
+
+    def refresh(self) -> bool:
+        """Nová generace od writeru? → přemapuj. Jinak jen jedno čtení z paměti."""
+        if self._snap is not None and self._gen.get() == self._snap.generation:
+            return False
+        try:
+            snap = Snapshot(self.path)
+        except (OSError, ValueError):
+            return False
+        changed = self._snap is None or snap.generation != self._snap.generation
+        self._snap = snap
+        return changed
+
+    def snapshot(self) -> Optional[Snapshot]:
+        self.refresh()
+        return self._snap
+
+class CatalogStore:
+    """
+    Čtecí rozhraní TipStore (query, all, len, version, updated_at) nad aktuálním snímkem
+    readeru – worker si katalog nekopíruje do vlastních indexů, jen vybírá z mmap.
+    """
+    complete = True
+
+    def __init__(self, reader: CatalogReader, source: Optional[str] = "picks"):
+        self.reader = reader
+        self.source = source
+
+    def _snap(self) -> Optional[Snapshot]:
+        return self.reader._snap             # refresh() dělá volající (_refresh_store), dotaz jen čte
+
+    @property
+    def version(self) -> int:
+        return self.reader.generation
+
+    @property
+    def updated_at(self) -> float:
+        snap = self._snap()
+        return snap.created if snap is not None else 0.0
+
+    def __len__(self) -> int:
+        snap = self._snap()
+        return 0 if snap is None else len(snap.select(self.source))
+
+    def query(self, start: datetime, end: datetime, min_conf: int = 0, limit: Optional[int] = None,
+              league: Optional[str] = None, market: Optional[str] = None) -> List:
+        snap = self._snap()
+        if snap is None:
+            return []
+        text = {k: v for k, v in (("league", league), ("market", market)) if v is not None}
+        idx = snap.ranked(snap.select(self.source, start.timestamp(), end.timestamp(), min_conf, **text))
+        return [snap.tip(i) for i in idx[:limit]]
+
+    def all(self) -> List:
+        snap = self._snap()
+        return [] if snap is None else snap.all(self.source)
+
+_READER: Optional[CatalogReader] = None
+
+def reader() -> CatalogReader:
+    global _READER
+    if _READER is None:
+        _READER = CatalogReader()
+    return _READER
+
+_OWNER_FD: Optional[int] = None
+
+def claim_owner(path: str = PATH) -> bool:
+    """
+    Je tento proces vlastník (set_webhook, rozesílání, live)? Neblokující flock na PATH.owner;
+    zámek drží otevřený deskriptor do konce procesu, po pádu ho převezme další start.
+    """
+    global _OWNER_FD
+    if _OWNER_FD is not None:
+        return True
+    fd = os.open(path + ".owner", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _OWNER_FD = fd
+    return True
+
+# =============== REFRESHER ===============
+def scan() -> List[Tuple[str, object]]:
+    """Totéž, co by jinak každý worker skenoval sám: kandidáti pro /tip* i zdroje pro /tip24."""
+    import workqueue
+    from crawl import CRAWL_MODE
+    if workqueue.ENABLED:
+        # crawl dělají workery (python workqueue.py work); tady jen seed a složení výsledků
+        q = workqueue.WorkQueue()
+        q.enqueue(workqueue.seeds(crawl=CRAWL_MODE))
+        return workqueue.catalog(q, limit=48)
+    from picks import find_first_half_goal_candidates
+    from sources import analyze_sources
+    out: List[Tuple[str, object]] = []
+    try:
+        out += [("picks", t) for t in find_first_half_goal_candidates(limit=48, hours_window=36) or []]
+    except Exception as e:
+        print(f"[WARN] catalog picks: {e}")
+    try:
+        out += [("sources", t) for t in analyze_sources(limit=60) or []]
+    except Exception as e:
+        print(f"[WARN] catalog sources: {e}")
+    return out
+
+def run_refresher(interval: float = REFRESH_S, path: str = PATH):
+    """Samostatný proces (python shm_catalog.py refresh)."""
+    while True:
+        t0 = time.perf_counter()
+        tips = scan()
+        gen = publish(tips, path)
+        print(f"catalog v{gen}: {len(tips)} tipů ({time.perf_counter() - t0:.1f} s)")
+        time.sleep(max(1.0, interval - (time.perf_counter() - t0)))
+
+async def run(interval: float = REFRESH_S, path: str = PATH):
+    """Totéž jako asyncio task v procesu bota (CATALOG_MODE=writer, z post_init)."""
+    while True:
+        t0 = time.perf_counter()
+        try:
+            tips = await asyncio.to_thread(scan)
+            gen = await asyncio.to_thread(publish, tips, path)
+            log.info("catalog v%d: %d tipů (%.1f s)", gen, len(tips), time.perf_counter() - t0)
+        except Exception as e:
+            log.warning("catalog refresh: %s", e)
+        await asyncio.sleep(max(1.0, interval - (time.perf_counter() - t0)))
+
+# =============== BENCHMARK ===============
+def _bench(n: int = 20000, readers: int = 4) -> None:
+    import multiprocessing as mp
+    from datetime import timedelta
+    from types import SimpleNamespace
+    from picks import TZ
+
+    path = os.path.join(tempfile.gettempdir(), f"flcat_bench_{os.getpid()}")
+    now = datetime.now(TZ)
+    tips = [("picks" if i % 3 else "sources",
+             SimpleNamespace(match=f"Home {i % 900} – Away {i % 700}", league=f"Liga {i % 40}",
+                             market="Gól v 1. poločase: ANO (Over 0.5 HT)", confidence=60 + i % 40,
+                             window="1-3 h", reason="bench", odds=1.3 + (i % 50) / 100, url=None,
+                             kickoff=now + timedelta(minutes=i % 2000), sport="fotbal"))
+            for i in range(n)]
+    t0 = time.perf_counter()
+    gen = publish(tips, path)
+    size = os.path.getsize(path)
+    print(f"publikace {n} tipů: {(time.perf_counter() - t0) * 1000:.0f} ms, {size / 1e6:.2f} MB, v{gen}")
+
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    q = ctx.Queue()
+    procs = [ctx.Process(target=_bench_reader, args=(path, gen + 1, q)) for _ in range(readers)]
+    for p in procs:
+        p.start()
+    time.sleep(0.5)
+    t_pub = time.time()
+    publish(tips[: n // 2], path)                      # readery musí přepnout na novou generaci
+    for p in procs:
+        p.join()
+    lat = [q.get() - t_pub for _ in procs]
+    print(f"{readers} readerů přepnulo na v{gen + 1} za max {max(lat) * 1000:.1f} ms; "
+          f"dotaz ≥90 % nad {n // 2} záznamy ~{q_time(path) * 1e6:.0f} µs")
+    for f in (path, path + ".gen"):
+        os.remove(f)
+
+def _bench_reader(path: str, want: int, q):
+    r = CatalogReader(path)
+    while True:
+        r.refresh()
+        if r.generation >= want:
+            q.put(time.time())
+            return
+        time.sleep(0.001)
+
+def q_time(path: str, reps: int = 200) -> float:
+    snap = CatalogReader(path).snapshot()
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        snap.select("picks", min_conf=90)
+    return (time.perf_counter() - t0) / reps
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "bench"
+    if cmd == "refresh":
+        run_refresher()
+    else:
+        _bench()
@@ -3,16 +3,25 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
-import requests
 from bs4 import BeautifulSoup
 
+from fetch import get_text
+from crawl import CRAWL_MODE, crawl_pages
+from team_registry import clean, match_key, plausible
+import deadline
+import parse_pool
+
 UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
       "(KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36")
 TIMEOUT = (7, 12)
 TZ = timezone(timedelta(hours=1))  # CET/CEST
 
+EUROFOTBAL_URL = "https://www.eurofotbal.cz/zapasy/"
+FOOTYSTATS_URL = "https://footystats.org/cz/tomorrow/"
+MAX_ROWS = 160     # strop řádků na blok/stránku v rychlém režimu (crawl režim bez stropu)
+
 @dataclass
 class Tip:
     match: str
@@ -25,17 +34,17 @@ class Tip:
     url: Optional[str] = None
     kickoff: Optional[datetime] = None
 
+# (home, away, league, kickoff) – výstup parserů stránek; Tip se z něj skládá až potom
+Row = Tuple[str, str, str, Optional[datetime]]
+
+def _not_blocked(text: str) -> bool:
+    # Cloudflare / blokace
+    low = text.lower()
+    return "cf-chl" not in low and "attention required" not in low
+
 def _req(url: str) -> Optional[str]:
-    try:
-        r = requests.get(url, headers={"User-Agent": UA}, timeout=TIMEOUT)
-        if r.status_code != 200:
-            return None
-        # Cloudflare / blokace
-        if "cf-chl" in r.text.lower() or "attention required" in r.text.lower():
-            return None
-        return r.text
-    except Exception:
-        return None
+    """Stránka zdroje; blokace se počítá do breakeru hostu (fetch → breaker.py)."""
+    return get_text(url, timeout=TIMEOUT, headers={"User-Agent": UA}, valid=_not_blocked)
 
 # --- heuristiky pro skórování gólů do 1H ---
 def _win(avg_first_goal_min: float) -> str:
@@ -49,13 +58,15 @@ def _conf(rate: float, pace: float) -> int:
 
 # ---------- EUROFOTBAL: dnešek + zítřek ----------
 def _eurofotbal_list(days: int = 2) -> List[Tip]:
-    url = "https://www.eurofotbal.cz/zapasy/"
-    html = _req(url)
-    out: List[Tip] = []
+    html = _req(EUROFOTBAL_URL)
     if not html:
-        return out
+        return []
+    return [_eurofotbal_tip(r) for r in parse_pool.parse("eurofotbal", html, days=days, max_rows=MAX_ROWS)]
+
+def _iter_eurofotbal(soup: BeautifulSoup, days: int = 2, max_rows: Optional[int] = None) -> Iterator[Tip]:
+    return map(_eurofotbal_tip, _iter_eurofotbal_rows(soup, days, max_rows))
 
-    soup = BeautifulSoup(html, "html.parser")
+def _iter_eurofotbal_rows(soup: BeautifulSoup, days: int = 2, max_rows: Optional[int] = None) -> Iterator[Row]:
     blocks = soup.select("div#content div.matches") or [soup]
 
     now = datetime.now(timezone.utc).astimezone(TZ)
@@ -87,7 +98,7 @@ def _eurofotbal_list(days: int = 2) -> List[Tip]:
             continue  # jen dnes/zítra
 
         rows = blk.select("div.match")
-        for r in rows[:160]:
+        for r in (rows[:max_rows] if max_rows else rows):
             home = (r.select_one(".team.home") or r.select_one(".home") or r.select_one(".team-home"))
             away = (r.select_one(".team.away") or r.select_one(".away") or r.select_one(".team-away"))
             home = home.get_text(strip=True) if home else ""
@@ -107,45 +118,50 @@ def _eurofotbal_list(days: int = 2) -> List[Tip]:
                     ko = datetime(block_date.year, block_date.month, block_date.day,
                                   hh, mm, tzinfo=TZ)
 
-            if not home or not away:
+            if not (plausible(home) and plausible(away)):
                 continue
 
-            match = f"{home} – {away}"
-            out.append(Tip(
-                match=match,
-                league=league,
-                market="Gól v 1. poločase: ANO (Over 0.5 HT)",
-                confidence=_conf(0.74, 1.10),
-                window=_win(20),
-                reason="Eurofotbal (program) – vhodný profil na brzký gól.",
-                odds=None,
-                url="https://www.eurofotbal.cz/zapasy/",
-                kickoff=ko,
-            ))
-
-    return out
+            yield (home, away, league, ko)
+
+def _eurofotbal_tip(row: Row) -> Tip:
+    home, away, league, ko = row
+    return Tip(
+        match=f"{home} – {away}",
+        league=league,
+        market="Gól v 1. poločase: ANO (Over 0.5 HT)",
+        confidence=_conf(0.74, 1.10),
+        window=_win(20),
+        reason="Eurofotbal (program) – vhodný profil na brzký gól.",
+        odds=None,
+        url=EUROFOTBAL_URL,
+        kickoff=ko,
+    )
 
 # ---------- FOOTYSTATS: zítřek (tomorrow) ----------
 def _footystats_tomorrow() -> List[Tip]:
-    url = "https://footystats.org/cz/tomorrow/"
-    html = _req(url)
-    out: List[Tip] = []
+    html = _req(FOOTYSTATS_URL)
     if not html:
-        return out
+        return []
+    return [_footystats_tip(r, FOOTYSTATS_URL) for r in parse_pool.parse("footystats", html, max_rows=MAX_ROWS)]
 
-    soup = BeautifulSoup(html, "html.parser")
+def _iter_footystats(soup: BeautifulSoup, url: str, max_rows: Optional[int] = None) -> Iterator[Tip]:
+    return (_footystats_tip(r, url) for r in _iter_footystats_rows(soup, max_rows))
+
+def _iter_footystats_rows(soup: BeautifulSoup, max_rows: Optional[int] = None) -> Iterator[Row]:
     rows = soup.select("table tr") or soup.select(".match-row")
     now = datetime.now(timezone.utc).astimezone(TZ)
 
-    for row in rows[:160]:
+    for row in (rows[:max_rows] if max_rows else rows):
         text = row.get_text(" ", strip=True)
         if " - " not in text:
             continue
         m = re.search(r"(.+?)\s*-\s*(.+)", text)
         if not m:
             continue
-        home = m.group(1).strip()
-        away = m.group(2).strip()
+        home = clean(m.group(1))
+        away = clean(m.group(2))
+        if not (plausible(home) and plausible(away)):
+            continue
 
         tm = re.search(r"(\d{1,2}):(\d{2})", text)
         if tm:
@@ -157,35 +173,72 @@ def _footystats_tomorrow() -> List[Tip]:
         z = (now + timedelta(days=1)).date()
         ko = datetime(z.year, z.month, z.day, hh, mm, tzinfo=TZ)
 
-        out.append(Tip(
-            match=f"{home} – {away}",
-            league="FootyStats",
-            market="Gól v 1. poločase: ANO (Over 0.5 HT)",
-            confidence=_conf(0.76, 1.15),
-            window=_win(19),
-            reason="FootyStats (tomorrow) – datový výběr na rychlý gól.",
-            odds=None,
-            url=url,
-            kickoff=ko,
-        ))
-    return out
+        yield (home, away, "FootyStats", ko)
+
+def _footystats_tip(row: Row, url: str) -> Tip:
+    home, away, league, ko = row
+    return Tip(
+        match=f"{home} – {away}",
+        league=league,
+        market="Gól v 1. poločase: ANO (Over 0.5 HT)",
+        confidence=_conf(0.76, 1.15),
+        window=_win(19),
+        reason="FootyStats (tomorrow) – datový výběr na rychlý gól.",
+        odds=None,
+        url=url,
+        kickoff=ko,
+    )
+
+# ---------- CRAWL: všechny stránky, tipy odcházejí průběžně ----------
+def crawl_eurofotbal(days: int = 2) -> Iterator[Tip]:
+    if parse_pool.enabled():
+        for _, rows in parse_pool.crawl("eurofotbal", [EUROFOTBAL_URL], fetch=_req, subpages=False, days=days):
+            yield from map(_eurofotbal_tip, rows)
+        return
+    for _, soup in crawl_pages([EUROFOTBAL_URL], subpages=False, fetch=_req):
+        yield from _iter_eurofotbal(soup, days)
+
+def crawl_footystats() -> Iterator[Tip]:
+    if parse_pool.enabled():
+        for url, rows in parse_pool.crawl("footystats", [FOOTYSTATS_URL], fetch=_req, subpages=False):
+            yield from (_footystats_tip(r, url) for r in rows)
+        return
+    for url, soup in crawl_pages([FOOTYSTATS_URL], subpages=False, fetch=_req):
+        yield from _iter_footystats(soup, url)
+
+def iter_sources(days: int = 2) -> Iterator[Tip]:
+    """Crawl obou zdrojů bez stropů; duplicity (zápas + výkop) se přeskočí."""
+    seen = set()
+    for name, gen in (("Eurofotbal", crawl_eurofotbal(days)), ("FootyStats", crawl_footystats())):
+        b = deadline.current()
+        if b is not None and b.expired:
+            b.skip(name)
+            continue
+        try:
+            for t in gen:
+                key = (match_key(t.match), t.kickoff.isoformat() if t.kickoff else "")
+                if key not in seen:
+                    seen.add(key)
+                    yield t
+        except Exception:
+            continue
 
 # ---------- PUBLIC ----------
 def analyze_sources(limit: int = 5) -> List[Tip]:
     tips: List[Tip] = []
-    try:
-        tips.extend(_eurofotbal_list(days=2))   # dnes + zítra
-    except Exception:
-        pass
-    try:
-        tips.extend(_footystats_tomorrow())     # zítřek (datový doplněk)
-    except Exception:
-        pass
-
+    if CRAWL_MODE:
+        tips.extend(iter_sources(days=2))
+    else:
+        # pod rozpočtem (deadline.budget) se zdroj, na který nezbyl čas, přeskočí
+        tips.extend(deadline.attempt("Eurofotbal", _eurofotbal_list, days=2, default=[]))   # dnes + zítra
+        tips.extend(deadline.attempt("FootyStats", _footystats_tomorrow, default=[]))       # zítřek
+    return dedup_sorted(tips, limit)
+
+def dedup_sorted(tips: List[Tip], limit: int = 5) -> List[Tip]:
     # deduplikace + seřazení (dřívější výkop, vyšší confidence)
     uniq = {}
     for t in tips:
-        key = (t.match.lower(), t.kickoff.isoformat() if t.kickoff else "")
+        key = (match_key(t.match), t.kickoff.isoformat() if t.kickoff else "")
         if key not in uniq:
             uniq[key] = t
 
@@ -1,17 +1,14 @@
 # sources_base.py — agregace a slučování víc zdrojů
 from typing import Iterable, Dict, Tuple
 from flamengo_strategy import MatchFacts
-import unicodedata, re
+import team_registry
+from team_registry import similar, team_id
 
 TIME_TOL_MIN = 120  # větší rozptyl = 2 hodiny
 
-def _slug(x: str) -> str:
-    x = unicodedata.normalize("NFKD", x).encode("ascii","ignore").decode()
-    return re.sub(r"[^a-zA-Z0-9]+", "", x).lower()
-
-def _fuzzy_key(m: MatchFacts) -> Tuple[str,str,str]:
-    # klíč bez času – pro seskupení „Sevilla–Getafe“ napříč zdroji
-    return (m.sport, _slug(m.home), _slug(m.away))
+def _fuzzy_key(m: MatchFacts) -> Tuple[str,int,int]:
+    # klíč bez času – pro seskupení „Sevilla–Getafe“ napříč zdroji (ID týmů z registru)
+    return (m.sport, team_id(m.home), team_id(m.away))
 
 def _merge(a: MatchFacts, b: MatchFacts) -> MatchFacts:
     # sloučí informace; čas vezmeme blíže reálnému (ponecháme a.ts pokud už je z Tipsportu)
@@ -45,6 +42,9 @@ def gather_from_sources(sources: Iterable) -> list[MatchFacts]:
         except Exception as e:
             print(f"[WARN] Source {getattr(s,'name',s)} failed: {e}")
 
+    # 1b) stejný čas + jeden tým shodný, druhý jinak pojmenovaný → alias (naučí se do registru)
+    buckets = _learn_aliases(buckets)
+
     # 2) v každém bucketu vybereme „hlavní čas“ (preferuj Tipsport)
     out: list[MatchFacts] = []
     for _, arr in buckets.items():
@@ -58,3 +58,43 @@ def gather_from_sources(sources: Iterable) -> list[MatchFacts]:
                 merged = _merge(merged, x)
         out.append(merged)
     return out
+
+def _learn_aliases(buckets: Dict[tuple, list[MatchFacts]]) -> Dict[tuple, list[MatchFacts]]:
+    """
+    Bucket, který se od jiného liší jen jedním týmem a má blízký čas, je možná tentýž zápas
+    („Man Utd“ vs. „Manchester United“). Sloučí se jen když sedí i druhá strana: jeden tým
+    podle ID a druhý podle jména (team_registry.similar – stejné značky B/U21/ženy, podobný
+    slug). Neshodné ID se naučí jako alias (buď ID z Tipsportu, jinak ID bucketu s víc
+    záznamy) a zapíše do registru s důvodem – jde vypsat a vrátit (team_registry.py unlearn).
+    """
+    by_side: Dict[tuple, list[tuple]] = {}
+    for key in buckets:
+        sport, h, a = key
+        by_side.setdefault((sport, 0, h), []).append(key)
+        by_side.setdefault((sport, 1, a), []).append(key)
+
+    def rank(key):
+        arr = buckets[key]
+        return (any("tipsport" in (x.notes or "") for x in arr), len(arr))
+
+    for keys in by_side.values():
+        if len(keys) < 2:
+            continue
+        keys = sorted(keys, key=rank, reverse=True)
+        main = keys[0]
+        for other in keys[1:]:
+            if other not in buckets or main not in buckets or other == main:
+                continue
+            if not _time_close(buckets[main][0].ts_utc, buckets[other][0].ts_utc):
+                continue
+            side = 2 if main[1] == other[1] else 1      # index týmu, který se liší
+            a, b = buckets[main][0], buckets[other][0]
+            name_main, name_other = (a.away, b.away) if side == 2 else (a.home, b.home)
+            if not similar(name_main, name_other):
+                continue
+            why = (f"{b.home} – {b.away} ≈ {a.home} – {a.away} "
+                   f"({getattr(b, 'notes', '') or '?'} / {getattr(a, 'notes', '') or '?'}, Δ "
+                   f"{abs(int(a.ts_utc) - int(b.ts_utc)) // 60} min)")
+            if team_registry.REGISTRY.learn(other[side], main[side], why):
+                buckets[main].extend(buckets.pop(other))
+    return buckets
@@ -0,0 +1,124 @@
+# staking.py — rozdělení bankrollu mezi víc tipů (frakční Kelly + stropy)
+# Vstup = celá sada kandidátů (pravděpodobnost modelu, kurz, zápas). Vše jsou operace nad
+# numpy poli: Kelly pro každý tip, součty na zápas přes bincount, škálování stropů.
+#   • frakční Kelly (KELLY_FRACTION) – plný Kelly je na odhadnuté p příliš agresivní
+#   • strop na zápas – tipy na stejný zápas jsou silně korelované (HT gól ~ Over 1.5),
+#     dohromady nesmí přesáhnout nejsilnější z nich ani MAX_MATCH_SHARE bankrollu
+#   • strop celkové expozice – MAX_EXPOSURE bankrollu na všechny tipy najednou (od nejlepší hrany)
+#
+# Benchmark:  python staking.py [počet_kandidátů]
+
+from __future__ import annotations
+import os, sys, time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from flamengo_strategy import MatchFacts, TipCandidate
+from market_pricer import price_facts
+from team_registry import key_id
+
+# ------- Parametry -------
+BANKROLL = float(os.getenv("BANKROLL", "2000"))               # Kč
+KELLY_FRACTION = float(os.getenv("KELLY_FRACTION", "0.25"))
+MAX_EXPOSURE = float(os.getenv("MAX_EXPOSURE", "0.25"))       # podíl bankrollu na všechny tipy
+MAX_MATCH_SHARE = float(os.getenv("MAX_MATCH_SHARE", "0.06")) # podíl bankrollu na jeden zápas
+STAKE_UNIT = 10.0                                             # zaokrouhlení sázky (Kč)
+
+@dataclass(frozen=True)
+class StakeParams:
+    bankroll: float = BANKROLL
+    fraction: float = KELLY_FRACTION
+    max_exposure: float = MAX_EXPOSURE
+    max_match: float = MAX_MATCH_SHARE
+    unit: float = STAKE_UNIT
+
+DEFAULT_PARAMS = StakeParams()
+
+def kelly(p, odds) -> np.ndarray:
+    """Plný Kelly podíl f* = (p·o − 1) / (o − 1); záporná hrana / chybějící kurz → 0."""
+    p = np.asarray(p, float)
+    o = np.asarray(odds, float)
+    b = o - 1.0
+    ok = (b > 0) & ~np.isnan(p) & ~np.isnan(o)
+    f = np.divide(p * o - 1.0, b, out=np.zeros_like(p), where=ok)
+    return np.clip(f, 0.0, 1.0)
+
+def allocate(p, odds, match_ids, params: StakeParams = DEFAULT_PARAMS) -> np.ndarray:
+    """
+    Sázky v Kč pro všechny kandidáty najednou.
+    match_ids = celá čísla 0..m-1 (stejné číslo = stejný zápas).
+    """
+    f = kelly(p, odds) * params.fraction
+    if not f.size:
+        return f
+    g = np.asarray(match_ids, dtype=np.intp)
+    m = int(g.max()) + 1
+
+    # korelace: součet na zápas ≤ min(nejsilnější tip zápasu, strop na zápas)
+    per_match = np.bincount(g, weights=f, minlength=m)
+    strongest = np.zeros(m)
+    np.maximum.at(strongest, g, f)
+    cap = np.minimum(strongest, params.max_match)
+    scale = np.divide(cap, per_match, out=np.ones(m), where=per_match > cap)
+    f = f * scale[g]
+
+    # celková expozice: plní se od nejsilnější hrany (poměrné krácení stovek tipů
+    # by po zaokrouhlení na STAKE_UNIT dalo samé nuly); tip na hraně dostane zbytek
+    if f.sum() > params.max_exposure:
+        order = np.argsort(-f, kind="stable")
+        before = np.cumsum(f[order]) - f[order]
+        f[order] = np.clip(params.max_exposure - before, 0.0, f[order])
+
+    stakes = np.floor(f * params.bankroll / params.unit) * params.unit
+    return stakes
+
+def _match_ids(matches: Sequence[MatchFacts]) -> np.ndarray:
+    keys = np.array([(key_id(m.home), key_id(m.away), int(m.ts_utc)) for m in matches],
+                    dtype=np.int64).reshape(-1, 3)
+    _, inv = np.unique(keys, axis=0, return_inverse=True)
+    return inv.reshape(-1)
+
+def model_probs(pairs: Sequence[Tuple[MatchFacts, TipCandidate]]) -> np.ndarray:
+    """Pravděpodobnost modelu (market_pricer) pro každý tip; trh bez ocenění → confidence/100."""
+    p = np.array([t.confidence / 100.0 for _, t in pairs], float)
+    if not pairs:
+        return p
+    uniq: dict = {}
+    for m, _ in pairs:
+        uniq.setdefault(id(m), (len(uniq), m))
+    batch = price_facts([m for _, m in uniq.values()])
+    for i, (m, t) in enumerate(pairs):
+        try:
+            v = batch.get(t.market_code)[uniq[id(m)][0]]
+        except ValueError:
+            continue
+        if not np.isnan(v):
+            p[i] = v
+    return p
+
+def stakes_for(pairs: Sequence[Tuple[MatchFacts, TipCandidate]],
+               params: StakeParams = DEFAULT_PARAMS) -> List[float]:
+    """Sázky (Kč) pro (zápas, tip) páry z tip_engine; bez kurzu → 0."""
+    if not pairs:
+        return []
+    odds = np.array([t.est_odds if t.est_odds else np.nan for _, t in pairs], float)
+    stakes = allocate(model_probs(pairs), odds, _match_ids([m for m, _ in pairs]), params)
+    return stakes.tolist()
+
+# =============== BENCHMARK ===============
+def _bench(n: int = 500, rounds: int = 200) -> None:
+    rng = np.random.default_rng(5)
+    p = rng.uniform(0.4, 0.9, n)
+    odds = np.round(1.0 / p * rng.uniform(0.9, 1.15, n), 2)
+    g = rng.integers(0, max(1, n // 3), n)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        s = allocate(p, odds, g)
+    dt = (time.perf_counter() - t0) / rounds
+    print(f"{n} kandidátů: {dt * 1e6:.0f} µs / alokace; vsazeno {s.sum():.0f} Kč "
+          f"z {BANKROLL:.0f} ({(s > 0).sum()} tipů se sázkou)")
+
+if __name__ == "__main__":
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
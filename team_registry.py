@@ -0,0 +1,388 @@
+# team_registry.py — kanonická ID týmů (název / alias → int)
+# Normalizace (NFKD + regex) proběhne pro každý surový název jen jednou; dál se všude
+# (slučování zdrojů, dedup, ověření na Tipsportu, anti-dup) porovnávají celá čísla.
+#
+# Registr je SQLite (TEAM_REGISTRY_PATH): každé nové ID se zapíše hned při přidělení
+# v transakci (BEGIN IMMEDIATE), takže pád procesu nic neztratí a víc procesů (katalog,
+# workqueue workery, parse pool) sdílí jedno číslování místo „poslední zápis vyhrává“.
+# In-process slovníky jsou jen cache; změny od jiných procesů se projeví do REFRESH_S.
+#
+# Do registru jdou jen názvy, které projdou plausible() (délka, písmena, žádný čas/kurz).
+# Ostatní dostanou dočasné záporné ID odvozené ze slugu – stabilní, ale neukládá se.
+# Zapisuje jen team_id() (slučování zdrojů, učení aliasů); čtecí cesty (match_key, key_id:
+# API, katalog, kurzy, anti-dup) ID nezakládají – neznámý tým = dočasné ID.
+#
+# Naučené aliasy (sloučení dvou ID ze slučování zdrojů) jsou v tabulce learned s důvodem;
+# jdou vypsat a vrátit zpět. Vrácené sloučení se už znovu nenaučí.
+#
+#   TEAM_REGISTRY_PATH=team_registry.sqlite3   (prázdné = jen v paměti)
+#
+#   python team_registry.py aliases            – naučené aliasy
+#   python team_registry.py unlearn N          – vrátit sloučení č. N
+#   python team_registry.py import soubor.json – převzít starý JSON registr
+
+from __future__ import annotations
+import json, os, re, sqlite3, sys, threading, time, unicodedata, zlib
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+REGISTRY_PATH = os.getenv("TEAM_REGISTRY_PATH", "team_registry.sqlite3")
+REFRESH_S = 5.0                 # jak často se kontrolují změny od jiných procesů
+MATCH_SEP = re.compile(r"\s+[–—-]\s+|\s+vs\.?\s+", re.I)
+
+MatchKey = Tuple[int, int]    # (domácí ID, hosté ID)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,      -- AUTOINCREMENT: ID se nikdy nepoužije znovu
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    slug TEXT PRIMARY KEY,
+    team_id INTEGER NOT NULL REFERENCES teams(id)
+);
+CREATE TABLE IF NOT EXISTS learned (
+    id INTEGER PRIMARY KEY,
+    alias_id INTEGER NOT NULL,
+    canonical_id INTEGER NOT NULL,
+    slugs TEXT NOT NULL,                       -- JSON: slugy přesunuté pod canonical_id
+    evidence TEXT NOT NULL DEFAULT '',
+    created REAL NOT NULL,
+    reverted REAL                              -- NULL = platí
+);
+"""
+
+@lru_cache(maxsize=8192)
+def slug(name: str) -> str:
+    """„Atlético Madrid“ → „atleticomadrid“."""
+    x = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-zA-Z0-9]+", "", x).lower()
+
+_RX_TIME = re.compile(r"\d{1,2}:\d{2}")
+_RX_ODDS = re.compile(r"\d+[.,]\d{2}")
+_RX_LETTER = re.compile(r"[^\W\d_]")
+
+def clean(name: str) -> str:
+    """Název z řádku katalogu bez času výkopu („21:30 Sparta“ → „Sparta“)."""
+    return " ".join(_RX_TIME.sub(" ", name or "").split())
+
+def plausible(name: str) -> bool:
+    """Vypadá text jako název týmu? (ne čas, kurz, navigace ani slepený řádek)"""
+    s = (name or "").strip()
+    if not 2 <= len(s) <= 50 or len(s.split()) > 6:
+        return False
+    if not _RX_LETTER.search(s) or _RX_TIME.search(s) or _RX_ODDS.search(s):
+        return False
+    return len(slug(s)) >= 2
+
+# rezervy, mládež, ženy – „Sparta“ a „Sparta B“ jsou různé týmy, i když se jmenují skoro stejně
+_MARKERS = {"b", "c", "ii", "iii", "u17", "u18", "u19", "u20", "u21", "u23", "w", "women", "zeny",
+            "reserves", "res", "youth", "junior", "juniori", "dorost", "fem", "femenino", "feminine"}
+
+def _markers(name: str) -> frozenset:
+    x = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode().lower()
+    return frozenset(t for t in re.findall(r"[a-z0-9]+", x) if t in _MARKERS)
+
+def similar(a: str, b: str, ratio: float = 0.75) -> bool:
+    """Dva zápisy téhož týmu? Shodné značky (B, U21, ženy…) a podobný slug."""
+    if _markers(a) != _markers(b):
+        return False
+    sa, sb = slug(a), slug(b)
+    if not sa or not sb:
+        return False
+    short, long_ = sorted((sa, sb), key=len)
+    if len(short) >= 4 and short in long_:
+        return True
+    return SequenceMatcher(None, sa, sb).ratio() >= ratio
+
+def _ephemeral(s: str) -> int:
+    """Záporné ID pro neuložené názvy – stejné ve všech procesech, nekoliduje s registrem."""
+    return -(zlib.crc32(s.encode()) & 0x7FFFFFFF) - 1
+
+class TeamRegistry:
+    """
+    slug → ID (víc slugů = aliasy jednoho týmu), ID → kanonický název; vše v SQLite.
+    Surové názvy se kešují zvlášť (dict), aby šla cache po změně aliasů jednoduše zahodit.
+    """
+
+    def __init__(self, path: Optional[str] = REGISTRY_PATH):
+        self.path = path or ":memory:"
+        self._lock = threading.RLock()
+        self._by_slug: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._raw: Dict[str, int] = {}
+        self._keys: Dict[str, int] = {}         # key_id: i dočasná ID (team_id je nesmí převzít)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        self._version = -1
+        self._checked = 0.0
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(DISTINCT team_id) FROM aliases").fetchone()[0]
+
+    # ---------- DB ----------
+    def _db(self) -> sqlite3.Connection:
+        """Spojení pro tento proces (po forku parse poolu se otevře nové)."""
+        if self._conn is None or self._pid != os.getpid():
+            c = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            if self.path != ":memory:":
+                c.execute("PRAGMA journal_mode=WAL")
+                c.execute("PRAGMA synchronous=NORMAL")
+            c.executescript(_SCHEMA)
+            self._conn, self._pid = c, os.getpid()
+        return self._conn
+
+    def _refresh(self):
+        """Jiný proces mohl sloučit/vrátit aliasy → zahodit cache (nejvýš jednou za REFRESH_S)."""
+        now = time.monotonic()
+        if now - self._checked < REFRESH_S:
+            return
+        self._checked = now
+        v = self._db().execute("PRAGMA data_version").fetchone()[0]
+        if v != self._version:
+            self._version = v
+            self._forget()
+
+    def _forget(self):
+        self._by_slug.clear()
+        self._raw.clear()
+        self._keys.clear()
+        _match_key.cache_clear()
+
+    # ---------- ID ----------
+    def team_id(self, name: str) -> int:
+        """ID týmu; neznámý plausible název dostane nové (hned uložené) ID. Prázdný název → 0."""
+        self._refresh()
+        tid = self._raw.get(name)
+        if tid is not None:
+            return tid
+        s = slug(name)
+        if not s:
+            return 0
+        with self._lock:
+            tid = self._by_slug.get(s)
+            if tid is None:
+                tid = self._resolve(s, name)
+            self._raw[name] = tid
+        return tid
+
+    def _resolve(self, s: str, name: str) -> int:
+        c = self._db()
+        row = c.execute("SELECT team_id FROM aliases WHERE slug=?", (s,)).fetchone()
+        if row is None:
+            if not plausible(name):
+                return _ephemeral(s)
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                # mezitím ho mohl založit jiný proces
+                row = c.execute("SELECT team_id FROM aliases WHERE slug=?", (s,)).fetchone()
+                if row is None:
+                    tid = c.execute("INSERT INTO teams (name) VALUES (?)", (name.strip(),)).lastrowid
+                    c.execute("INSERT INTO aliases (slug, team_id) VALUES (?, ?)", (s, tid))
+                    row = (tid,)
+                    self._keys.clear()          # dočasné ID názvu na čtecích cestách už neplatí
+                    _match_key.cache_clear()
+                c.execute("COMMIT")
+            except BaseException:
+                c.execute("ROLLBACK")
+                raise
+        self._by_slug[s] = row[0]
+        return row[0]
+
+    def lookup(self, name: str) -> Optional[int]:
+        """Jako team_id, ale bez zakládání nového ID."""
+        self._refresh()
+        tid = self._raw.get(name)
+        if tid is not None:
+            return tid
+        s = slug(name)
+        tid = self._by_slug.get(s)
+        if tid is None:
+            with self._lock:
+                row = self._db().execute("SELECT team_id FROM aliases WHERE slug=?", (s,)).fetchone()
+                if row:
+                    tid = self._by_slug[s] = row[0]
+        return tid
+
+    def key_id(self, name: str) -> int:
+        """
+        ID pro porovnávání na čtecích cestách (API, katalog, kurzy, anti-dup): známý tým →
+        jeho ID, neznámý → dočasné záporné ID ze slugu. Nic nezakládá ani nezapisuje.
+        """
+        tid = self._keys.get(name)
+        if tid is None:
+            tid = self.lookup(name)
+            if tid is None:
+                s = slug(name)
+                tid = _ephemeral(s) if s else 0
+            self._keys[name] = tid
+        return tid
+
+    def name(self, tid: int) -> str:
+        n = self._names.get(tid)
+        if n is None:
+            with self._lock:
+                row = self._db().execute("SELECT name FROM teams WHERE id=?", (tid,)).fetchone()
+            n = self._names[tid] = row[0] if row else ""
+        return n
+
+    def aliases(self, tid: int) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._db().execute(
+                "SELECT slug FROM aliases WHERE team_id=? ORDER BY slug", (tid,))]
+
+    # ---------- naučené aliasy ----------
+    def learn(self, alias_id: int, canonical_id: int, evidence: str = "") -> int:
+        """
+        Sloučí dvě ID (stejný tým pod jiným názvem v jiném zdroji): slugy alias_id přejdou
+        pod canonical_id a do learned se zapíše záznam pro kontrolu / vrácení.
+        Vrací číslo záznamu, 0 = nic se nezměnilo (i když bylo totéž sloučení dřív vráceno).
+        """
+        if alias_id <= 0 or canonical_id <= 0 or alias_id == canonical_id:
+            return 0
+        with self._lock:
+            c = self._db()
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                if c.execute("SELECT 1 FROM learned WHERE alias_id=? AND canonical_id=? AND reverted IS NOT NULL",
+                             (alias_id, canonical_id)).fetchone():
+                    c.execute("ROLLBACK")
+                    return 0
+                moved = [r[0] for r in c.execute("SELECT slug FROM aliases WHERE team_id=?", (alias_id,))]
+                if not moved:
+                    c.execute("ROLLBACK")
+                    return 0
+                c.execute("UPDATE aliases SET team_id=? WHERE team_id=?", (canonical_id, alias_id))
+                entry = c.execute("INSERT INTO learned (alias_id, canonical_id, slugs, evidence, created) "
+                                  "VALUES (?, ?, ?, ?, ?)", (alias_id, canonical_id, json.dumps(moved),
+                                                             evidence, time.time())).lastrowid
+                c.execute("COMMIT")
+            except BaseException:
+                c.execute("ROLLBACK")
+                raise
+            self._forget()
+        return entry
+
+    def unlearn(self, entry: int) -> bool:
+        """Vrátí sloučení: slugy se vrátí pod původní ID (to se nikdy nesmazalo)."""
+        with self._lock:
+            c = self._db()
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                row = c.execute("SELECT alias_id, canonical_id, slugs FROM learned WHERE id=? AND reverted IS NULL",
+                                (entry,)).fetchone()
+                if row is None:
+                    c.execute("ROLLBACK")
+                    return False
+                alias_id, canonical_id, slugs = row
+                c.executemany("UPDATE aliases SET team_id=? WHERE slug=? AND team_id=?",
+                              [(alias_id, s, canonical_id) for s in json.loads(slugs)])
+                c.execute("UPDATE learned SET reverted=? WHERE id=?", (time.time(), entry))
+                c.execute("COMMIT")
+            except BaseException:
+                c.execute("ROLLBACK")
+                raise
+            self._forget()
+        return True
+
+    def learned(self, all_: bool = False) -> List[tuple]:
+        """[(č., alias_id, canonical_id, slugy, důvod, vytvořeno, vráceno)]"""
+        sql = "SELECT id, alias_id, canonical_id, slugs, evidence, created, reverted FROM learned"
+        with self._lock:
+            return self._db().execute(sql + ("" if all_ else " WHERE reverted IS NULL") + " ORDER BY id").fetchall()
+
+    # ---------- převod starého JSON ----------
+    def import_json(self, path: str) -> int:
+        """Starý team_registry.json (teams + aliases) → DB; existující slugy se nepřepíšou."""
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        names = {int(k): v for k, v in (raw.get("teams") or {}).items()}
+        groups: Dict[int, List[str]] = {}
+        for s, tid in (raw.get("aliases") or {}).items():
+            groups.setdefault(int(tid), []).append(s)
+        n = 0
+        with self._lock:
+            c = self._db()
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                for old, slugs in groups.items():
+                    name = names.get(old) or slugs[0]
+                    if not plausible(name):
+                        continue
+                    have = c.execute("SELECT team_id FROM aliases WHERE slug IN (%s)" % ",".join("?" * len(slugs)),
+                                     slugs).fetchone()
+                    tid = have[0] if have else c.execute("INSERT INTO teams (name) VALUES (?)", (name,)).lastrowid
+                    n += c.executemany("INSERT OR IGNORE INTO aliases (slug, team_id) VALUES (?, ?)",
+                                       [(s, tid) for s in slugs]).rowcount
+                c.execute("COMMIT")
+            except BaseException:
+                c.execute("ROLLBACK")
+                raise
+            self._forget()
+        return n
+
+REGISTRY = TeamRegistry()
+
+@contextmanager
+def scratch():
+    """Dočasný registr jen v paměti (benchmarky se syntetickými názvy nesmí psát do souboru)."""
+    global REGISTRY
+    old, REGISTRY = REGISTRY, TeamRegistry(None)
+    _match_key.cache_clear()
+    try:
+        yield REGISTRY
+    finally:
+        REGISTRY = old
+        _match_key.cache_clear()
+
+def team_id(name: str) -> int:
+    """Zakládající varianta – jen pro slučování zdrojů / učení aliasů (sources_base)."""
+    return REGISTRY.team_id(name)
+
+def key_id(name: str) -> int:
+    return REGISTRY.key_id(name)
+
+def split_match(match: str) -> Tuple[str, str]:
+    """„Sevilla – Getafe“ → („Sevilla“, „Getafe“). Bez oddělovače → (celý text, "")."""
+    parts = MATCH_SEP.split(match or "", maxsplit=1)
+    return (parts[0], parts[1]) if len(parts) == 2 else (match or "", "")
+
+def match_key(match: str) -> MatchKey:
+    """
+    „Sevilla – Getafe“ → (id, id). Bez oddělovače → (id celého textu, 0). Nezakládá ID
+    (key_id); cache se zahodí, když jiný proces změní registr (_refresh → _forget).
+    """
+    REGISTRY._refresh()
+    return _match_key(match)
+
+@lru_cache(maxsize=8192)
+def _match_key(match: str) -> MatchKey:
+    home, away = split_match(match)
+    return REGISTRY.key_id(home), (REGISTRY.key_id(away) if away else 0)
+
+def match_slugs(match: str) -> Tuple[str, str]:
+    """„Sevilla – Getafe“ → („sevilla“, „getafe“) – trvalý klíč nezávislý na číslování registru."""
+    home, away = split_match(match)
+    return slug(home), slug(away)
+
+def slug_variants(name: str) -> List[str]:
+    """Slug názvu + slugy všech aliasů jeho ID (bez zakládání nového ID)."""
+    s = slug(name)
+    tid = REGISTRY.lookup(name)
+    return sorted({s, *REGISTRY.aliases(tid)}) if tid and tid > 0 else [s]
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "aliases"
+    if cmd == "aliases":
+        for i, a, cid, slugs, why, ts, rev in REGISTRY.learned(all_="--all" in sys.argv):
+            state = f" (vráceno {time.strftime('%d.%m. %H:%M', time.localtime(rev))})" if rev else ""
+            print(f"#{i} {REGISTRY.name(a)!r} → {REGISTRY.name(cid)!r} [{', '.join(json.loads(slugs))}] "
+                  f"{time.strftime('%d.%m. %H:%M', time.localtime(ts))} {why}{state}")
+    elif cmd == "unlearn":
+        print("vráceno" if REGISTRY.unlearn(int(sys.argv[2])) else "záznam nenalezen / už vrácen")
+    elif cmd == "import":
+        print(f"převzato aliasů: {REGISTRY.import_json(sys.argv[2])}")
+    else:
+        print("python team_registry.py aliases [--all] | unlearn N | import soubor.json")
@@ -1,11 +1,15 @@
 # tip_engine.py — Flamengo výběr nad Tipsport-first pipeline
 # Filtry: jen zápasy z Tipsportu, start do 3 hodin, 1–10 tipů
 from typing import List, Tuple
+from dataclasses import replace
+from fractions import Fraction
 import time
 from flamengo_strategy import MatchFacts, TipCandidate, propose_football_tips
 from sources_base import gather_from_sources
 from sources_files import TipsportFixturesSource, FixturesSource, UnderstatSource, SofaScoreSource
 from tipsport_check import exists_on_tipsport
+from staking import model_probs, stakes_for, BANKROLL, DEFAULT_PARAMS
+import odds_compare
 
 # ------- Parametry -------
 MIN_ODDS = 1.3
@@ -15,44 +19,81 @@ MIN_CONF_PRIMARY = 20       # hlavní práh
 MIN_CONF_FALLBACK = 20      # nouzový práh, když nic nesplní 90
 KICKOFF_WINDOW_H = 8        # jen zápasy, které začnou do 3 hodin
 MAX_COUNT = 10              # vezmeme max. 10 tipů
-STAKE_BASE = 100            # modelová vsazená částka (Kč)
+STAKE_BASE = 100            # modelová sázka, když alokace nejde spočítat (Kč)
 
-def _odds_pass(odds: float | None) -> bool:
+def _odds_pass(odds: float | None, lo: float | None = None, hi: float | None = None,
+               allow: float | None = None) -> bool:
+    lo = MIN_ODDS if lo is None else lo
+    hi = MAX_ODDS if hi is None else hi
+    allow = MAX_ALLOW if allow is None else allow
     if odds is None: return True
-    if MIN_ODDS <= odds <= MAX_ODDS: return True
-    if MAX_ODDS < odds <= MAX_ALLOW: return True
+    if lo <= odds <= hi: return True
+    if hi < odds <= allow: return True
     return False
 
-def _payout(odds: float | None) -> str:
+def _payout(odds: float | None, stake: float = STAKE_BASE) -> str:
     if not odds: return "—"
-    gross = STAKE_BASE * odds
-    net = STAKE_BASE * (odds - 1.0)
-    return f"výplata ~{gross:.0f} Kč (zisk ~{net:.0f} Kč)"
-
-def _format_line(m: MatchFacts, t: TipCandidate) -> str:
-    odds_txt = f" ~{t.est_odds:.2f}" if t.est_odds else ""
+    if stake <= 0: return "bez sázky (model nevidí hranu)"
+    gross = stake * odds
+    net = stake * (odds - 1.0)
+    return f"vklad {stake:.0f} Kč → výplata ~{gross:.0f} Kč (zisk ~{net:.0f} Kč)"
+
+def _format_line(m: MatchFacts, t: TipCandidate, stake: float = STAKE_BASE, book: str = "",
+                 edge: float = float("nan")) -> str:
+    odds_txt = (f" @ {t.est_odds:.2f} ({book})" if book else f" ~{t.est_odds:.2f}") if t.est_odds else ""
+    edge_txt = f" | hrana {edge * 100:+.1f} b." if edge == edge else ""
     when = time.strftime("%H:%M", time.gmtime(m.ts_utc)) + " UTC"
     return (
         f"🏟 {m.league}: {m.home} – {m.away} • výkop {when}\n"
         f"• Sázka: {t.selection} — {t.market_code}{odds_txt}\n"
-        f"• Procenta možné výhry: {t.confidence}%\n"
-        f"• {_payout(t.est_odds)}\n"
+        f"• Procenta možné výhry: {t.confidence}%{edge_txt}\n"
+        f"• {_payout(t.est_odds, stake)}\n"
         f"ℹ️ {t.rationale}\n"
     )
 
-def _within_window(ts_utc: int, now: float) -> bool:
-    return ts_utc >= now and ts_utc <= now + KICKOFF_WINDOW_H * 3600
+def _window_slice(matches: List[MatchFacts], now: float) -> List[MatchFacts]:
+    """Zápasy v okně výkopu – jeden lineární průchod (pořadí řeší až _price)."""
+    end = now + KICKOFF_WINDOW_H * 3600
+    return [m for m in matches if now <= m.ts_utc <= end]
 
 def _pick_candidates(matches: List[MatchFacts], min_conf: int) -> List[Tuple[MatchFacts, TipCandidate]]:
+    """Kandidáti nad prahem důvěry; kurz se filtruje až po dosazení nejlepší ceny (_price)."""
     cands: List[Tuple[MatchFacts, TipCandidate]] = []
     for m in matches:
         if m.sport != "football":
             continue
         for t in propose_football_tips(m):
-            if t.confidence >= min_conf and _odds_pass(t.est_odds):
+            if t.confidence >= min_conf:
                 cands.append((m, t))
     return cands
 
+def _price(pairs: List[Tuple[MatchFacts, TipCandidate]]) -> List[Tuple[MatchFacts, TipCandidate, str, float]]:
+    """
+    Nejlepší kurz přes sázkovky z ODDS_FEEDS místo odhadu (když ho někdo vypisuje), pak filtr
+    kurzů a hrana = p modelu − 1/kurz. Vrací (zápas, tip, sázkovka, hrana) seřazené hrana ↓,
+    důvěra ↓, výkop ↑; tip bez kurzu (hrana NaN) až za oceněnými.
+    """
+    pairs = list(pairs)
+    books = [""] * len(pairs)
+    try:
+        board = odds_compare.load_board()
+    except Exception:
+        board = None
+    if board is not None and pairs:
+        for i, best in enumerate(odds_compare.best_prices(pairs, board)):
+            if best is not None:
+                m, t = pairs[i]
+                pairs[i] = (m, replace(t, est_odds=best[0]))
+                books[i] = best[1]
+    keep = [i for i, (_, t) in enumerate(pairs) if _odds_pass(t.est_odds)]
+    pairs = [pairs[i] for i in keep]
+    books = [books[i] for i in keep]
+    p = model_probs(pairs)
+    out = [(m, t, b, float(p[i] - 1.0 / t.est_odds) if t.est_odds else float("nan"))
+           for i, ((m, t), b) in enumerate(zip(pairs, books))]
+    out.sort(key=lambda r: (r[3] != r[3], -r[3] if r[3] == r[3] else 0.0, -r[1].confidence, r[0].ts_utc))
+    return out
+
 def suggest_today() -> str:
     # 1) Primárně Tipsport → aby šly vsadit
     matches: List[MatchFacts] = gather_from_sources([
@@ -64,7 +105,7 @@ def suggest_today() -> str:
 
     # 2) Jen zápasy, které začínají do 3 hodin
     now = time.time()
-    matches = [m for m in matches if _within_window(m.ts_utc, now)]
+    matches = _window_slice(matches, now)
 
     if not matches:
         return f"Do {KICKOFF_WINDOW_H} hodin nemám žádné zápasy v Tipsport nabídce."
@@ -93,11 +134,18 @@ def suggest_today() -> str:
             f"v kurzech {MIN_ODDS}–{MAX_ODDS} (výjimečně ≤ {MAX_ALLOW})."
         )
 
-    # 6) Seřadit: důvěra ↓, kurz ↑ (preferuj nižší), výkop ↑
-    verified.sort(key=lambda mt: (-mt[1].confidence, mt[1].est_odds or 99.0, mt[0].ts_utc))
+    # 6) Nejlepší kurz → filtr kurzů → seřadit podle hrany (p modelu − 1/kurz) ↓
+    ranked = _price(verified)
+    if not ranked:
+        return (
+            f"V Tipsport nabídce do {KICKOFF_WINDOW_H} h teď nic neprošlo filtrem kurzů "
+            f"{MIN_ODDS}–{MAX_ODDS} (výjimečně ≤ {MAX_ALLOW})."
+        )
 
     # 7) Omezit na 1–10 tipů
-    shown = verified[:MAX_COUNT]
+    shown = [(m, t) for m, t, _, _ in ranked[:MAX_COUNT]]
+    books = [b for _, _, b, _ in ranked[:MAX_COUNT]]
+    edges = [e for _, _, _, e in ranked[:MAX_COUNT]]
 
     # 8) Výstup
     header = "🔎 Dnešní TOP návrhy (Tipsport → Flamengo, výkop ≤ 3 h)\n"
@@ -106,10 +154,19 @@ def suggest_today() -> str:
     else:
         header += f"✅ Vše s ≥{MIN_CONF_PRIMARY} % důvěrou.\n\n"
 
-    lines = [_format_line(m, t) for m, t in shown]
+    # 9) Vklady: frakční Kelly přes všechny ověřené tipy (stropy na zápas a celkem), pak řez
+    #     na zobrazené – s nejlepším kurzem Kelly sám ukáže, jestli cena za sázku stojí (0 = bez hrany)
+    try:
+        stakes = stakes_for([(m, t) for m, t, _, _ in ranked])[:len(shown)]
+    except Exception:
+        stakes = [STAKE_BASE] * len(shown)
+    kelly_txt = f"{Fraction(DEFAULT_PARAMS.fraction).limit_denominator(100)} Kelly"
+
+    lines = [_format_line(m, t, s, b, e) for (m, t), s, b, e in zip(shown, stakes, books, edges)]
     tail = (
         f"Pravidla Flamengo: fakta (xG/forma/tempo), filtr kurzů {MIN_ODDS}–{MAX_ODDS} "
-        f"(výjimečně až do {MAX_ALLOW}). Vstup = zápasy dostupné na Tipsportu."
+        f"(výjimečně až do {MAX_ALLOW}). Vstup = zápasy dostupné na Tipsportu.\n"
+        f"Vklady: {kelly_txt} z bankrollu {BANKROLL:.0f} Kč, celkem vsazeno {sum(stakes):.0f} Kč."
     )
     return header + "\n".join(lines) + "\n" + tail
     # tip_engine.py
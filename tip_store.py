@@ -0,0 +1,258 @@
+# tip_store.py — in-memory úložiště aktuálních tipů s indexy (výkop, liga, trh, důvěra)
+# Každý index = důvěra (0–100) → seznam seřazený podle výkopu. Dotaz „1–3 h, ≥90 %, top 5“
+# projde úrovně důvěry shora (max. 101 konstantně), v každé udělá bisect okna a vezme
+# jen tolik, kolik chybí do limitu → O(log n + k). Pořadí výsledku je stejné jako dřív
+# v main: důvěra ↓, výkop ↑.
+#
+# Neúplný sken (vypršel rozpočet) nic neodebere podle sebe sama, jen klíče, které žádný sken
+# neviděl déle než STORE_STALE_S – jinak by se při trvale uťatých skenech store nikdy nečistil.
+#
+#   STORE_STALE_S=1800
+
+from __future__ import annotations
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import os, threading, time
+
+from team_registry import MatchKey, match_key
+
+Key = Tuple[MatchKey, float, str]     # ((ID domácích, ID hostů), výkop ts, trh)
+Entry = Tuple[float, Key]             # (výkop ts, klíč) – řazení podle výkopu
+
+STALE_S = float(os.getenv("STORE_STALE_S", "1800"))   # neviděno žádným skenem → pryč i bez úplného
+
+def tip_key(t) -> Optional[Key]:
+    ko = getattr(t, "kickoff", None)
+    if ko is None:
+        return None
+    return (match_key(getattr(t, "match", "")), ko.timestamp(), getattr(t, "market", ""))
+
+class _ConfIndex:
+    """Úrovně důvěry → výkopem seřazené záznamy."""
+
+    def __init__(self):
+        self.levels: Dict[int, List[Entry]] = {}
+        self.confs: List[int] = []            # vzestupně; dotaz jde odzadu
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.levels.values())
+
+    def add(self, conf: int, entry: Entry):
+        lst = self.levels.get(conf)
+        if lst is None:
+            lst = self.levels[conf] = []
+            insort(self.confs, conf)
+        insort(lst, entry)
+
+    def remove(self, conf: int, entry: Entry):
+        lst = self.levels.get(conf)
+        if not lst:
+            return
+        i = bisect_left(lst, entry)
+        if i < len(lst) and lst[i] == entry:
+            del lst[i]
+        if not lst:
+            del self.levels[conf]
+            self.confs.remove(conf)
+
+    def query(self, t0: float, t1: float, min_conf: int = 0, limit: Optional[int] = None) -> Iterator[Key]:
+        """Klíče s výkopem v [t0, t1) a důvěrou ≥ min_conf; důvěra ↓, výkop ↑."""
+        left = limit if limit is not None else -1
+        for conf in reversed(self.confs):
+            if conf < min_conf or left == 0:
+                return
+            lst = self.levels[conf]
+            i = bisect_left(lst, (t0,))
+            j = bisect_left(lst, (t1,))
+            if left > 0:
+                j = min(j, i + left)
+                left -= j - i
+            for k in range(i, j):
+                yield lst[k][1]
+
+class TipStore:
+    """
+    Aktuální kandidáti (picks.Tip / sources.Tip) + indexy.
+    sync() porovná nový seznam s uloženým a změní jen rozdíl; version roste při každé změně.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._tips: Dict[Key, object] = {}
+        self._conf: Dict[Key, int] = {}
+        self._all = _ConfIndex()
+        self._by_league: Dict[str, _ConfIndex] = {}
+        self._by_market: Dict[str, _ConfIndex] = {}
+        self._seen_at: Dict[Key, float] = {}    # kdy klíč naposled vrátil sken
+        self.version = 0
+        self.updated_at = 0.0       # time.time() posledního sync (i neúplného)
+        self.complete = False       # byl poslední sync úplný?
+
+    def __len__(self) -> int:
+        return len(self._tips)
+
+    # ---------- zápis ----------
+    def _indexes(self, t) -> List[_ConfIndex]:
+        lg = self._by_league.setdefault(getattr(t, "league", ""), _ConfIndex())
+        mk = self._by_market.setdefault(getattr(t, "market", ""), _ConfIndex())
+        return [self._all, lg, mk]
+
+    def _add(self, key: Key, t):
+        conf = int(getattr(t, "confidence", 0) or 0)
+        self._tips[key] = t
+        self._conf[key] = conf
+        for ix in self._indexes(t):
+            ix.add(conf, (key[1], key))
+
+    def _remove(self, key: Key):
+        t = self._tips.pop(key)
+        conf = self._conf.pop(key)
+        self._seen_at.pop(key, None)
+        for ix in self._indexes(t):
+            ix.remove(conf, (key[1], key))
+        for d, name in ((self._by_league, getattr(t, "league", "")), (self._by_market, getattr(t, "market", ""))):
+            if name in d and not d[name].levels:
+                del d[name]
+
+    def add(self, t) -> bool:
+        key = tip_key(t)
+        if key is None:
+            return False
+        with self._lock:
+            if key in self._tips:
+                self._remove(key)
+            self._add(key, t)
+            self._seen_at[key] = time.time()
+            self.version += 1
+        return True
+
+    def remove(self, t) -> bool:
+        key = tip_key(t)
+        with self._lock:
+            if key is None or key not in self._tips:
+                return False
+            self._remove(key)
+            self.version += 1
+        return True
+
+    def sync(self, tips: Iterable, prune: bool = True) -> Tuple[int, int]:
+        """
+        Nahradí obsah novým seznamem inkrementálně. Vrací (přidáno/změněno, odebráno).
+        prune=False (neúplný sken, např. po vypršení rozpočtu): odeberou se jen klíče, které
+        žádný sken neviděl déle než STALE_S, a complete=False (volající zkusí dřív znovu).
+        """
+        fresh: Dict[Key, object] = {}
+        for t in tips:
+            key = tip_key(t)
+            if key is not None:
+                old = fresh.get(key)
+                if old is None or t.confidence > old.confidence:
+                    fresh[key] = t
+        now = time.time()
+        with self._lock:
+            self._seen_at.update(dict.fromkeys(fresh, now))
+            gone = self._gone(fresh, prune, now)
+            for k in gone:
+                self._remove(k)
+            changed = 0
+            for k, t in fresh.items():
+                cur = self._tips.get(k)
+                if cur is t:
+                    continue
+                if cur is not None:
+                    if cur == t:
+                        continue
+                    self._remove(k)
+                self._add(k, t)
+                changed += 1
+            if gone or changed:
+                self.version += 1
+            self.updated_at, self.complete = now, prune
+        return changed, len(gone)
+
+    def _gone(self, seen, complete: bool, now: float) -> List[Key]:
+        if complete:
+            return [k for k in self._tips if k not in seen]
+        return [k for k, ts in self._seen_at.items() if ts < now - STALE_S and k not in seen]
+
+    def sync_stream(self, tips: Iterable, prune: Union[bool, Callable[[], bool]] = True) -> Tuple[int, int]:
+        """
+        Jako sync(), ale pro generátor (crawl): každý tip je v indexech hned po naparsování,
+        zastaralé klíče se odeberou až po doběhnutí celého proudu. prune může být funkce –
+        vyhodnotí se až po proudu (zda byl kompletní).
+        """
+        seen = set()
+        changed = 0
+        for t in tips:
+            key = tip_key(t)
+            if key is None:
+                continue
+            with self._lock:
+                cur = self._tips.get(key)
+                if key in seen and cur is not None and t.confidence <= cur.confidence:
+                    continue
+                seen.add(key)
+                self._seen_at[key] = time.time()
+                if cur is not None and (cur is t or cur == t):
+                    continue
+                if cur is not None:
+                    self._remove(key)
+                self._add(key, t)
+                self.version += 1
+                changed += 1
+        complete = bool(prune() if callable(prune) else prune)
+        now = time.time()
+        with self._lock:
+            gone = self._gone(seen, complete, now)
+            for k in gone:
+                self._remove(k)
+            if gone:
+                self.version += 1
+            self.updated_at, self.complete = now, complete
+        return changed, len(gone)
+
+    def clear(self):
+        with self._lock:
+            self.sync([])
+
+    # ---------- čtení ----------
+    def query(self, start: datetime, end: datetime, min_conf: int = 0, limit: Optional[int] = None,
+              league: Optional[str] = None, market: Optional[str] = None) -> List:
+        """Tipy s výkopem v [start, end), důvěra ≥ min_conf; seřazeno důvěra ↓, výkop ↑."""
+        with self._lock:
+            if league is not None and market is not None:
+                # dva indexy – projdi menší a filtruj druhou podmínkou
+                a, b = self._by_league.get(league), self._by_market.get(market)
+                if a is None or b is None:
+                    return []
+                ix, attr, val = (a, "market", market) if len(a) <= len(b) else (b, "league", league)
+                out = []
+                for k in ix.query(start.timestamp(), end.timestamp(), min_conf):
+                    t = self._tips[k]
+                    if getattr(t, attr, None) == val:
+                        out.append(t)
+                        if limit is not None and len(out) >= limit:
+                            break
+                return out
+            if league is not None:
+                ix = self._by_league.get(league)
+            elif market is not None:
+                ix = self._by_market.get(market)
+            else:
+                ix = self._all
+            if ix is None:
+                return []
+            return [self._tips[k] for k in ix.query(start.timestamp(), end.timestamp(), min_conf, limit)]
+
+    def leagues(self) -> List[str]:
+        with self._lock:
+            return sorted(self._by_league)
+
+    def markets(self) -> List[str]:
+        with self._lock:
+            return sorted(self._by_market)
+
+    def all(self) -> List:
+        with self._lock:
+            return list(self._tips.values())
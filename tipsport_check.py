@@ -6,7 +6,9 @@
 
 from dataclasses import dataclass
 from typing import Optional
-import unicodedata, re, json, time, os
+import json, time, os
+
+from team_registry import key_id
 
 @dataclass
 class TipsportEvent:
@@ -15,11 +17,6 @@ class TipsportEvent:
     away: str
     ts_utc: int
 
-def _slug(x: str) -> str:
-    x = unicodedata.normalize("NFKD", x).encode("ascii", "ignore").decode()
-    x = re.sub(r"[^a-zA-Z0-9]+", "", x).lower()
-    return x
-
 def _load_events() -> list[TipsportEvent]:
     # 1) DEMO: načteme ze souboru (když není, vrátíme prázdno)
     path = "tipsport_today.json"
@@ -39,9 +36,9 @@ def exists_on_tipsport(league: str, home: str, away: str, ts_utc: int, time_tol_
         # Pokud nemáme feed, povolíme „best effort“ a nerozbijeme běh
         return True
 
-    sh, sa = _slug(home), _slug(away)
+    sh, sa = key_id(home), key_id(away)
     for e in evs:
-        if _slug(e.home) == sh and _slug(e.away) == sa:
+        if key_id(e.home) == sh and key_id(e.away) == sa:
             if abs(e.ts_utc - ts_utc) <= time_tol_min * 60:
                 return True
     return False
@@ -0,0 +1,339 @@
+# web.py — jediný HTTP server bota (čisté ASGI pod uvicornem): webhook, health, metriky, read API
+# Nahrazuje run_webhook (tornado) i Flask keep_alive.py: jeden port, jeden event loop s PTB.
+#   GET  / , HEAD /         – „alive“ pro pingery (dřív keep_alive.py)
+#   GET  /health            – JSON: běží PTB?, velikost a stáří store; 503 když bot neběží
+#   POST {SECRET_PATH}      – update od Telegramu → app.update_queue (jako run_webhook)
+#   GET  /api/analyses      – NDJSON proud: jeden dokument (schema.py) na řádek, generátorem
+#   GET  /api/tips?window=1-3&league=…&market=…&min_conf=80&limit=50
+#                           – dotaz na indexy TipStore, JSON
+#   GET  /metrics           – Prometheus text: požadavky/latence po routách, RSS, store, breakery
+# Read API nikdy nespouští scrape – čte jen to, co už je v paměti (STORE), i když je starší.
+# Proud se posílá po kusech (~CHUNK bajtů), takže tisíce analýz neleží v paměti najednou.
+# HTTP keep-alive drží uvicorn (WEB_KEEPALIVE_S, víc než idle timeout proxy před botem).
+#
+#   WEB_KEEPALIVE_S=75
+#
+#   python web.py [n]         – benchmark read API bez sítě
+#   python footprint.py       – paměť + latence: tento server vs. run_webhook + Flask
+
+from __future__ import annotations
+import asyncio, json, logging, os, time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from telegram import Update
+from telegram.ext import Application
+
+import breaker
+from schema import analysis_from_tips, iter_analyses
+from tip_store import TipStore
+
+log = logging.getLogger("kiki-web")
+
+TZ = timezone(timedelta(hours=1))
+CHUNK = 64 * 1024
+MAX_BODY = 1024 * 1024          # Telegram update je pár kB
+MAX_LIMIT = 1000
+KEEPALIVE_S = int(os.getenv("WEB_KEEPALIVE_S", "75"))
+
+class BadRequest(ValueError):
+    pass
+
+def _json_line(doc: dict) -> bytes:
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+def ndjson_chunks(docs: Iterable[dict], chunk: int = CHUNK) -> Iterator[bytes]:
+    """Dokumenty → NDJSON po kusech o velikosti ~chunk (méně volání send než řádek po řádku)."""
+    buf: List[bytes] = []
+    size = 0
+    for doc in docs:
+        line = _json_line(doc)
+        buf.append(line)
+        size += len(line)
+        if size >= chunk:
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+def _window(raw: str) -> Tuple[float, float]:
+    """„1-3“ → hodiny od teď (od, do); „3“ = 0–3 h."""
+    lo, _, hi = raw.partition("-")
+    try:
+        a, b = (float(lo), float(hi)) if hi else (0.0, float(lo))
+    except ValueError:
+        raise BadRequest(f"window: {raw}")
+    if b <= a:
+        raise BadRequest(f"window: {raw}")
+    return a, b
+
+def query_tips(store: TipStore, params: dict, now: Optional[datetime] = None) -> dict:
+    """Filtrovaný dotaz (window, league, market, min_conf, limit) → JSON dokument."""
+    now = now or datetime.now(TZ)
+    a, b = _window(params.get("window", "0-36"))
+    try:
+        min_conf = int(params.get("min_conf", 0))
+        limit = min(int(params.get("limit", 100)), MAX_LIMIT)
+    except ValueError as e:
+        raise BadRequest(str(e))
+    tips = store.query(now + timedelta(hours=a), now + timedelta(hours=b), min_conf=min_conf, limit=limit,
+                       league=params.get("league") or None, market=params.get("market") or None)
+    return {
+        "version": store.version,
+        "updated_at": store.updated_at,
+        "count": len(tips),
+        # jeden záznam na tip (pořadí důvěra ↓, výkop ↑ z indexu se zachová)
+        "items": [analysis_from_tips([t]) for t in tips],
+    }
+
+class WebApp:
+    """
+    ASGI aplikace. Lifespan startuje a zastavuje PTB Application (včetně post_init/post_stop,
+    které run_webhook volá sám) a nastaví webhook u Telegramu.
+    """
+
+    def __init__(self, app: Application, store: TipStore, secret_path: str, webhook_url: str = "",
+                 secret_token: Optional[str] = None, allowed_updates: Optional[List[str]] = None):
+        self.app = app
+        self.store = store
+        self.secret_path = secret_path
+        self.webhook_url = webhook_url
+        self.secret_token = secret_token or None
+        self.allowed_updates = allowed_updates
+        self.stats: dict[str, List[float]] = {}      # routa → [počet, součet sekund, chyby]
+        self.routes: dict[Tuple[str, str], Callable] = {
+            ("GET", "/"): self.alive,
+            ("HEAD", "/"): self.alive,
+            ("GET", "/health"): self.health,
+            ("POST", secret_path): self.webhook,
+            ("GET", "/api/analyses"): self.analyses,
+            ("GET", "/api/tips"): self.tips,
+            ("GET", "/metrics"): self.metrics,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+        handler = self.routes.get((scope["method"], scope["path"]))
+        if handler is None:
+            return await _send(send, 404, b"not found")
+        t0 = time.perf_counter()
+        failed = 0
+        started = False
+
+        async def tracked(msg):
+            nonlocal started
+            started = started or msg["type"] == "http.response.start"
+            await send(msg)
+        try:
+            await handler(scope, receive, tracked)
+        except Exception as e:
+            failed = int(not isinstance(e, BadRequest))
+            if failed:
+                log.exception("web %s: %s", scope["path"], e)
+            if not started:
+                await (_send_json(send, 400, {"error": str(e)}) if not failed else _send(send, 500, b"error"))
+            else:
+                # hlavička už odešla (stream) – druhý start nejde, jen ukončit tělo
+                log.warning("web %s: chyba po začátku odpovědi, uzavírám", scope["path"])
+                try:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+                except Exception:
+                    pass
+        finally:
+            # tajná cesta webhooku se do metrik nepropisuje
+            st = self.stats.setdefault("webhook" if handler == self.webhook else scope["path"], [0, 0.0, 0])
+            st[0] += 1
+            st[1] += time.perf_counter() - t0
+            st[2] += failed
+
+    # ---------- lifespan ----------
+    async def lifespan(self, receive, send):
+        while True:
+            msg = await receive()
+            if msg["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    log.exception("startup: %s", e)
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif msg["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def startup(self):
+        await self.app.initialize()
+        if self.app.post_init:
+            await self.app.post_init(self.app)
+        await self.app.start()
+        if self.webhook_url:
+            await self.app.bot.set_webhook(self.webhook_url, secret_token=self.secret_token,
+                                           allowed_updates=self.allowed_updates, drop_pending_updates=True)
+        log.info("Web server běží, webhook %s", self.webhook_url or "(nenastaven)")
+
+    async def shutdown(self):
+        if self.app.running:
+            await self.app.stop()
+        if self.app.post_stop:
+            await self.app.post_stop(self.app)
+        await self.app.shutdown()
+
+    # ---------- routy ----------
+    async def alive(self, scope, receive, send):
+        await _send(send, 200, b"flamengo-bot alive")
+
+    async def health(self, scope, receive, send):
+        running = bool(self.app is not None and self.app.running)
+        await _send_json(send, 200 if running else 503, {
+            "ok": running,
+            "tips": len(self.store),
+            "version": self.store.version,
+            "store_age_s": round(time.time() - self.store.updated_at, 1) if self.store.updated_at else None,
+        })
+
+    async def webhook(self, scope, receive, send):
+        if self.secret_token and _header(scope, b"x-telegram-bot-api-secret-token") != self.secret_token:
+            return await _send(send, 403, b"forbidden")
+        body = await _read_body(receive)
+        try:
+            data = json.loads(body)
+            if not isinstance(data, dict):          # platný JSON, ale ne objekt (např. [])
+                raise ValueError(type(data).__name__)
+            update = Update.de_json(data, self.app.bot)
+        except (ValueError, TypeError, AttributeError, KeyError):
+            raise BadRequest("invalid update")
+        await self.app.update_queue.put(update)
+        await _send(send, 200, b"ok")
+
+    async def analyses(self, scope, receive, send):
+        tips = self.store.all()           # snímek referencí; dokumenty se staví až při posílání
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/x-ndjson; charset=utf-8"),
+            (b"x-store-version", str(self.store.version).encode()),
+        ]})
+        # kusy se staví ve vlákně, aby velký proud neblokoval event loop bota
+        chunks = ndjson_chunks(iter_analyses(tips))
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def tips(self, scope, receive, send):
+        await _send_json(send, 200, query_tips(self.store, _query(scope)))
+
+    async def metrics(self, scope, receive, send):
+        out = ["# TYPE flamengo_http_requests_total counter",
+               "# TYPE flamengo_http_request_seconds_total counter",
+               "# TYPE flamengo_http_errors_total counter"]
+        for route, (n, sec, err) in sorted(self.stats.items()):
+            lbl = f'{{route="{route}"}}'
+            out += [f"flamengo_http_requests_total{lbl} {n}",
+                    f"flamengo_http_request_seconds_total{lbl} {sec:.6f}",
+                    f"flamengo_http_errors_total{lbl} {err}"]
+        out += ["# TYPE flamengo_process_rss_bytes gauge", f"flamengo_process_rss_bytes {rss_bytes()}",
+                "# TYPE flamengo_store_tips gauge", f"flamengo_store_tips {len(self.store)}",
+                "# TYPE flamengo_store_version counter", f"flamengo_store_version {self.store.version}"]
+        body = "\n".join(out) + "\n" + breaker.prometheus()
+        await _send(send, 200, body.encode("utf-8"), b"text/plain; version=0.0.4; charset=utf-8")
+
+def rss_bytes(pid: str = "self") -> int:
+    """Aktuální RSS procesu (Linux /proc); jinde špička z getrusage."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+# =============== ASGI HELPERY ===============
+def _header(scope, name: bytes) -> Optional[str]:
+    for k, v in scope.get("headers") or []:
+        if k == name:
+            return v.decode("latin-1")
+    return None
+
+def _query(scope) -> dict:
+    return dict(parse_qsl(scope.get("query_string", b"").decode("utf-8")))
+
+async def _read_body(receive) -> bytes:
+    parts, size = [], 0
+    while True:
+        msg = await receive()
+        chunk = msg.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY:
+            raise BadRequest("body too large")
+        parts.append(chunk)
+        if not msg.get("more_body"):
+            return b"".join(parts)
+
+async def _send(send, status: int, body: bytes, ctype: bytes = b"text/plain; charset=utf-8"):
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", ctype), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+async def _send_json(send, status: int, doc: dict):
+    await _send(send, status, json.dumps(doc, ensure_ascii=False, default=str).encode("utf-8"),
+                b"application/json; charset=utf-8")
+
+def server(web: WebApp, host: str = "0.0.0.0", port: int = 10000):
+    """uvicorn.Server s produkčním nastavením; await server.serve() běží v aktuální smyčce."""
+    import uvicorn
+    return uvicorn.Server(uvicorn.Config(web, host=host, port=port, lifespan="on", log_level="warning",
+                                         access_log=False, timeout_keep_alive=KEEPALIVE_S))
+
+def serve(web: WebApp, host: str = "0.0.0.0", port: int = 10000):
+    """Blokující běh pod uvicornem (jeden proces; PTB i read API sdílí event loop)."""
+    server(web, host, port).run()
+
+# =============== BENCHMARK ===============
+def _bench(n: int = 5000) -> None:
+    """Proud n analýz přes ASGI bez sítě: čas do prvního kusu a celkový čas."""
+    import team_registry
+    with team_registry.scratch():               # syntetické týmy nepatří do registru
+        _bench_run(n)
+
+def _bench_run(n: int) -> None:
+    from types import SimpleNamespace
+
+    now = datetime.now(TZ)
+    store = TipStore()
+    store.sync(SimpleNamespace(match=f"Home {i} – Away {i}", league=f"Liga {i % 20}",
+                               market="Gól v 1. poločase: ANO (Over 0.5 HT)", confidence=60 + i % 40,
+                               window="1-3 h", reason="bench", odds=1.4, url=None,
+                               kickoff=now + timedelta(minutes=i % 2000)) for i in range(n))
+    web = WebApp(None, store, "/hook")  # type: ignore[arg-type]
+    stats = {"chunks": 0, "bytes": 0, "first": None}
+
+    async def run():
+        t0 = time.perf_counter()
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(msg):
+            if msg["type"] == "http.response.body" and msg.get("body"):
+                stats["chunks"] += 1
+                stats["bytes"] += len(msg["body"])
+                if stats["first"] is None:
+                    stats["first"] = time.perf_counter() - t0
+
+        await web({"type": "http", "method": "GET", "path": "/api/analyses", "headers": []}, receive, send)
+        total = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        await web({"type": "http", "method": "GET", "path": "/api/tips",
+                   "query_string": b"window=1-3&min_conf=90&limit=50", "headers": []}, receive, lambda m: asyncio.sleep(0))
+        return total, time.perf_counter() - t1
+
+    total, q = asyncio.run(run())
+    print(f"{n} analýz: první kus po {stats['first'] * 1000:.1f} ms, celkem {total * 1000:.0f} ms, "
+          f"{stats['chunks']} kusů / {stats['bytes'] / 1e6:.1f} MB; /api/tips {q * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    import sys
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
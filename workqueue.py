@@ -0,0 +1,337 @@
+# workqueue.py — fronta crawl úloh pro víc procesů / strojů (SQLite, bez brokeru)
+# Úloha = (druh, URL). Workery si úlohy pronajímají (lease): kdo lease nestihne dokončit
+# (pád, restart), tomu úloha po LEASE_S propadne a vezme ji jiný. Chyba → nový pokus
+# s backoffem, po MAX_ATTEMPTS stav failed. URL je ve frontě jednou (UNIQUE druh+URL),
+# takže odkazy nalezené víc workery se nestahují dvakrát; hotová úloha se znovu pustí až
+# při dalším seed/odkazu po REFRESH_S. Výsledky (kompaktní řádky parserů) jdou do tabulky
+# results ve stejné DB → shm_catalog.scan (WORKQUEUE=1) z nich skládá katalog místo scrapu.
+#
+# Druhy úloh nad stávajícími scrapery:
+#   tipsport    – stránka katalogu (parse_pool, jako _scrape_tipsport_list); crawl → stránkování
+#                 a ligy, details → detaily zápasů jako úlohy „stats“
+#   stats       – scraper.tipsport_stats(detail zápasu)
+#   eurofotbal, footystats – parsery sources.py (přes sources._req → breaker, blokace)
+#
+#   WORKQUEUE=0  WORKQUEUE_PATH=workqueue.sqlite3  WORKQUEUE_LEASE_S=300
+#   WORKQUEUE_REFRESH_S=120  WORKQUEUE_ATTEMPTS=4  WORKQUEUE_RESULT_TTL_S=7200
+#
+#   python workqueue.py seed [--crawl] [--details]
+#   python workqueue.py work [--procs N] [--once]      (na každém stroji nad sdíleným souborem)
+#   python workqueue.py stats
+#   python workqueue.py bench [procesy]
+
+from __future__ import annotations
+import json, os, socket, sqlite3, sys, threading, time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+ENABLED = os.getenv("WORKQUEUE", "0") == "1"
+DB_PATH = os.getenv("WORKQUEUE_PATH", "workqueue.sqlite3")
+LEASE_S = float(os.getenv("WORKQUEUE_LEASE_S", "300"))
+REFRESH_S = float(os.getenv("WORKQUEUE_REFRESH_S", "120"))
+MAX_ATTEMPTS = int(os.getenv("WORKQUEUE_ATTEMPTS", "4"))
+RESULT_TTL_S = float(os.getenv("WORKQUEUE_RESULT_TTL_S", "7200"))
+BACKOFF_S = 5.0
+IDLE_S = 0.2
+TZ = timezone(timedelta(hours=1))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    ctx TEXT NOT NULL DEFAULT '{}',
+    state TEXT NOT NULL DEFAULT 'queued',      -- queued | leased | done | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    lease_until REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    error TEXT,
+    updated REAL NOT NULL,
+    UNIQUE (kind, url)
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, not_before);
+CREATE TABLE IF NOT EXISTS results (
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    fetched REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, url)
+);
+"""
+
+Link = Tuple[str, str, dict]                    # (druh, URL, ctx)
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    url: str
+    ctx: dict
+    attempts: int
+
+class WorkQueue:
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            c = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = c
+        return c
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE: zápisový zámek hned, ať se dva workery nepřetahují o stejné řádky."""
+        c = self._conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            yield c
+        except BaseException:
+            c.execute("ROLLBACK")
+            raise
+        c.execute("COMMIT")
+
+    # ---------- plnění ----------
+    def enqueue(self, links: Iterable[Link], refresh_s: float = REFRESH_S, c=None) -> int:
+        """Nové URL do fronty; hotové/neúspěšné starší než refresh_s znovu. Vrací počet změn."""
+        now = time.time()
+        rows = [(k, u, json.dumps(ctx or {}, sort_keys=True), now, now - refresh_s) for k, u, ctx in links]
+        sql = ("INSERT INTO jobs (kind, url, ctx, updated) VALUES (?, ?, ?, ?) "
+               "ON CONFLICT (kind, url) DO UPDATE SET state='queued', attempts=0, not_before=0, "
+               "ctx=excluded.ctx, error=NULL, updated=excluded.updated "
+               "WHERE state IN ('done', 'failed') AND updated < ?")
+        if c is not None:
+            before = c.total_changes
+            c.executemany(sql, rows)
+            return c.total_changes - before
+        with self._tx() as c:
+            before = c.total_changes
+            c.executemany(sql, rows)
+            return c.total_changes - before
+
+    # ---------- lease ----------
+    def lease(self, worker: str, n: int = 1, lease_s: float = LEASE_S) -> List[Job]:
+        """
+        Až n připravených úloh (včetně propadlých lease) pro workera. Propadlý lease se počítá
+        jako pokus: úloha, která už MAX_ATTEMPTS× shodila workera, jde do failed.
+        """
+        now = time.time()
+        with self._tx() as c:
+            c.execute("UPDATE jobs SET state='failed', error=?, updated=? "
+                      "WHERE state='leased' AND lease_until<? AND attempts>=?",
+                      (f"lease propadl {MAX_ATTEMPTS}× (pád / zaseknutí workera)", now, now, MAX_ATTEMPTS))
+            rows = c.execute(
+                "SELECT id, kind, url, ctx, attempts FROM jobs "
+                "WHERE (state='queued' AND not_before<=?) OR (state='leased' AND lease_until<?) "
+                "ORDER BY not_before, id LIMIT ?", (now, now, n)).fetchall()
+            c.executemany("UPDATE jobs SET state='leased', worker=?, lease_until=?, attempts=attempts+1, "
+                          "updated=? WHERE id=?", [(worker, now + lease_s, now, r[0]) for r in rows])
+        return [Job(i, k, u, json.loads(ctx), a + 1) for i, k, u, ctx, a in rows]
+
+    def complete(self, job: Job, worker: str, data, links: Iterable[Link] = ()) -> bool:
+        """Výsledek + nalezené odkazy v jedné transakci; False = lease mezitím propadl jinému."""
+        now = time.time()
+        with self._tx() as c:
+            cur = c.execute("UPDATE jobs SET state='done', error=NULL, updated=? "
+                            "WHERE id=? AND worker=? AND state='leased'", (now, job.id, worker))
+            if cur.rowcount == 0:
+                return False
+            c.execute("INSERT OR REPLACE INTO results (kind, url, fetched, data) VALUES (?, ?, ?, ?)",
+                      (job.kind, job.url, now, json.dumps(data, ensure_ascii=False, separators=(",", ":"))))
+            self.enqueue(links, c=c)
+        return True
+
+    def fail(self, job: Job, worker: str, error: str):
+        now = time.time()
+        final = job.attempts >= MAX_ATTEMPTS
+        with self._tx() as c:
+            c.execute("UPDATE jobs SET state=?, not_before=?, error=?, updated=? "
+                      "WHERE id=? AND worker=? AND state='leased'",
+                      ("failed" if final else "queued", now + BACKOFF_S * 2 ** (job.attempts - 1),
+                       error[:300], now, job.id, worker))
+
+    # ---------- čtení ----------
+    def results(self, kind: str, max_age: float = RESULT_TTL_S) -> List[Tuple[str, object]]:
+        rows = self._conn().execute("SELECT url, data FROM results WHERE kind=? AND fetched>=?",
+                                    (kind, time.time() - max_age)).fetchall()
+        return [(u, json.loads(d)) for u, d in rows]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        out: Dict[str, Dict[str, int]] = {}
+        for kind, state, n in self._conn().execute("SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state"):
+            out.setdefault(kind, {})[state] = n
+        return out
+
+    def pending(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'leased')").fetchone()[0]
+
+# =============== DRUHY ÚLOH ===============
+def _base(ctx: dict) -> float:
+    return (datetime.now(TZ) + timedelta(days=ctx.get("day", 0))).timestamp()
+
+def _tipsport(url: str, ctx: dict):
+    from fetch import TIMEOUT, get_text
+    import parse_pool, picks, scraper
+    html = get_text(url, timeout=TIMEOUT)
+    if not html:
+        raise IOError("stránka nedostupná")
+    base = _base(ctx)
+    scope = picks.TIPSPORT_URL_FOOT if ctx.get("crawl") else None
+    rows, links = parse_pool._parse_cached("tipsport", html.encode("utf-8"), url, scope, True, {"base": base})
+    # podstránky filtr ?timeFilter nenesou → odkazy jen z dnešního katalogu (viz picks.crawl_tipsport)
+    out: List[Link] = [("tipsport", l, ctx) for l in links] if not ctx.get("day") else []
+    if ctx.get("details"):
+        out += [("stats", m["url"], {}) for m in scraper.match_links(html)]
+    return {"base": base, "rows": rows}, out
+
+def _sources(kind: str):
+    def run(url: str, ctx: dict):
+        import parse_pool, sources
+        html = sources._req(url)
+        if not html:
+            raise IOError("stránka nedostupná / blokace")
+        scope = url if ctx.get("crawl") else None
+        rows, links = parse_pool._parse_cached(kind, html.encode("utf-8"), url, scope, False, ctx)
+        return {"rows": rows}, [(kind, l, ctx) for l in links]
+    return run
+
+def _stats(url: str, ctx: dict):
+    from scraper import tipsport_stats
+    return tipsport_stats(url), []
+
+HANDLERS: Dict[str, Callable[[str, dict], Tuple[object, List[Link]]]] = {
+    "tipsport": _tipsport,
+    "stats": _stats,
+    "eurofotbal": _sources("eurofotbal"),
+    "footystats": _sources("footystats"),
+}
+
+def seeds(crawl: bool = False, details: bool = False) -> List[Link]:
+    """Startovní URL: Tipsport dnes + zítra a oba rozšířené zdroje."""
+    from picks import TIPSPORT_URL_FOOT, _catalog_url
+    from sources import EUROFOTBAL_URL, FOOTYSTATS_URL
+    out = [("tipsport", _catalog_url(TIPSPORT_URL_FOOT, d), {"day": d, "crawl": crawl, "details": details})
+           for d in (0, 1)]
+    out += [("eurofotbal", EUROFOTBAL_URL, {"days": 2, "crawl": crawl}),
+            ("footystats", FOOTYSTATS_URL, {"crawl": crawl})]
+    return out
+
+# =============== WORKER ===============
+def work(q: Optional[WorkQueue] = None, worker: str = "", once: bool = False, batch: int = 1,
+         stop: Optional[threading.Event] = None) -> int:
+    """Smyčka workera; once=True skončí, když je fronta prázdná. Vrací počet hotových úloh."""
+    q = q or WorkQueue()
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    done = 0
+    while stop is None or not stop.is_set():
+        jobs = q.lease(worker, batch)
+        if not jobs:
+            if once and q.pending() == 0:
+                return done
+            time.sleep(IDLE_S)
+            continue
+        for job in jobs:
+            handler = HANDLERS.get(job.kind)
+            try:
+                if handler is None:
+                    raise KeyError(f"neznámý druh {job.kind}")
+                data, links = handler(job.url, job.ctx)
+            except Exception as e:
+                q.fail(job, worker, f"{type(e).__name__}: {e}")
+                continue
+            if q.complete(job, worker, data, links):
+                done += 1
+    return done
+
+def _work_proc(path: str, once: bool):
+    work(WorkQueue(path), once=once)
+
+def work_procs(n: int, path: str = DB_PATH, once: bool = False):
+    import multiprocessing as mp
+    procs = [mp.Process(target=_work_proc, args=(path, once)) for _ in range(n)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+# =============== VÝSLEDKY → TIPY ===============
+def catalog(q: Optional[WorkQueue] = None, limit: int = 48, hours_window: int = 36) -> List[Tuple[str, object]]:
+    """Totéž jako shm_catalog.scan, ale ze sdílených výsledků místo vlastního scrapu."""
+    import parse_pool, picks, sources
+    q = q or WorkQueue()
+    rows = []
+    for _, r in q.results("tipsport"):
+        rows += parse_pool.finish("tipsport", r["rows"], {"base": r["base"]})
+    out: List[Tuple[str, object]] = [("picks", t) for t in
+                                     picks.select_candidates(picks._iter_football_tips(rows), limit, hours_window)]
+    src = []
+    for _, r in q.results("eurofotbal"):
+        src += map(sources._eurofotbal_tip, parse_pool.finish("eurofotbal", r["rows"], {}))
+    for url, r in q.results("footystats"):
+        src += (sources._footystats_tip(row, url) for row in parse_pool.finish("footystats", r["rows"], {}))
+    out += [("sources", t) for t in sources.dedup_sorted(src, limit=60)]
+    return out
+
+def format_stats(q: Optional[WorkQueue] = None) -> str:
+    st = (q or WorkQueue()).stats()
+    if not st:
+        return "Fronta: prázdná"
+    return "Fronta: " + "; ".join(f"{k} " + ", ".join(f"{s} {n}" for s, n in sorted(v.items()))
+                                   for k, v in sorted(st.items()))
+
+# =============== BENCHMARK ===============
+SIM_PAGES = 120
+SIM_LATENCY_S = 0.05
+
+def _sim(url: str, ctx: dict):
+    """Stránka i odkazuje na 2i+1, 2i+2 a zpět na rodiče (duplicity) – síť = sleep."""
+    i = int(url.rsplit("/", 1)[1])
+    time.sleep(SIM_LATENCY_S)
+    links = [("sim", f"sim://p/{j}", {}) for j in (2 * i + 1, 2 * i + 2, (i - 1) // 2) if 0 <= j < SIM_PAGES]
+    return {"page": i, "pid": os.getpid()}, links
+
+HANDLERS["sim"] = _sim
+
+def _bench(max_procs: int = 4) -> None:
+    import tempfile
+    for n in sorted({1, 2, max_procs}):
+        path = os.path.join(tempfile.gettempdir(), f"wq_bench_{os.getpid()}_{n}.sqlite3")
+        q = WorkQueue(path)
+        q.enqueue([("sim", "sim://p/0", {})])
+        t0 = time.perf_counter()
+        work_procs(n, path, once=True)
+        dt = time.perf_counter() - t0
+        fetched = q._conn().execute("SELECT SUM(attempts), COUNT(*) FROM jobs").fetchone()
+        pids = {d["pid"] for _, d in q.results("sim")}
+        print(f"{n} proc.: {SIM_PAGES} stránek za {dt:.2f} s ({SIM_PAGES / dt:.0f}/s), "
+              f"stažení {fetched[0]} na {fetched[1]} URL, workerů s prací {len(pids)}")
+        for f in (path, path + "-wal", path + "-shm"):
+            if os.path.exists(f):
+                os.remove(f)
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    args = sys.argv[2:]
+    if cmd == "seed":
+        n = WorkQueue().enqueue(seeds(crawl="--crawl" in args, details="--details" in args))
+        print(f"do fronty: {n}")
+    elif cmd == "work":
+        procs = int(args[args.index("--procs") + 1]) if "--procs" in args else 1
+        if procs > 1:
+            work_procs(procs, once="--once" in args)
+        else:
+            print(f"hotovo: {work(once='--once' in args)}")
+    elif cmd == "stats":
+        print(format_stats())
+    elif cmd == "bench":
+        _bench(int(args[0]) if args else 4)
+    else:
+        print("python workqueue.py seed|work|stats|bench")